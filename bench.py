@@ -0,0 +1,293 @@
+"""
+감지 경로 마이크로벤치마크 (창/오디오 없이 실행)
+
+  python bench.py                     # 실행 -> bench_results.json, bench_baseline.json이 있으면 비교
+  python bench.py --save-baseline     # 이번 결과를 기준선으로 저장
+  python bench.py --only match,parse  # 일부 그룹만 (match / rebuild / state / parse)
+  python bench.py --quick             # 반복 횟수 줄여서 빠르게
+
+기준선 비교: median이 기준선보다 threshold(기본 15%) 넘게 느리고, 차이가 NOISE_FLOOR_US보다 크면 회귀 -> exit 1
+기준선 파일의 "thresholds"에 {"이름 접두어": 비율}을 넣으면 그 그룹만 따로 기준을 줄 수 있음
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+
+import main as app
+
+RESULTS_PATH = "bench_results.json"
+BASELINE_PATH = "bench_baseline.json"
+DEFAULT_THRESHOLD = 0.15
+NOISE_FLOOR_US = 5.0
+GROUPS = ("match", "rebuild", "state", "parse")
+
+# =============================
+# Timing
+# =============================
+def measure(fn, repeat, number=1, warmup=3):
+    """fn을 number번 호출하는 구간을 repeat번 재서 1회당 µs 통계"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter_ns()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter_ns() - t0) / number / 1000.0)
+    samples.sort()
+    return {
+        "median_us": round(samples[len(samples) // 2], 3),
+        "p90_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.9))], 3),
+        "min_us": round(samples[0], 3),
+        "calls": repeat * number,
+    }
+
+# =============================
+# Inputs
+# =============================
+def load_base_templates():
+    """templates/ 가 있으면 실제 템플릿, 없으면 같은 구성(등급별 개수)의 합성 템플릿"""
+    try:
+        return app.load_templates(), "templates/"
+    except FileNotFoundError:
+        pass
+    cv2, np = app.cv2, app.np
+    base = {}
+    for grade, paths in app.TEMPLATES.items():
+        imgs = []
+        for i, _ in enumerate(paths):
+            img = np.full((56, 56), 30 + 20 * i, dtype=np.uint8)
+            cv2.putText(img, grade[0], (12, 44), cv2.FONT_HERSHEY_SIMPLEX, 1.5, 230, 3, cv2.LINE_AA)
+            imgs.append(img)
+        base[grade] = imgs
+    return base, "synthetic"
+
+def synthetic_roi(tmpls, roi_w, roi_h, seed=0):
+    """노이즈 위에 S 템플릿 하나를 가운데 붙인 ROI (실제 매칭과 비슷한 점수 분포)"""
+    np = app.np
+    rng = np.random.default_rng(seed)
+    roi = rng.integers(0, 80, size=(roi_h, roi_w), dtype=np.uint8)
+    t = tmpls.get("S", [None])[0]
+    if t is not None and t.shape[0] <= roi_h and t.shape[1] <= roi_w:
+        y = (roi_h - t.shape[0]) // 2
+        x = (roi_w - t.shape[1]) // 2
+        roi[y:y + t.shape[0], x:x + t.shape[1]] = t
+    return roi
+
+def roi_size(scale):
+    return (max(20, int(round(app.ROI_W_BASE * scale))),
+            max(20, int(round(app.ROI_H_BASE * scale))))
+
+def synthetic_traces(frames):
+    """(이름, [(raw_grade, now)]) - 프레임 간격 20ms"""
+    rnd = random.Random(1234)
+    order = app.GRADE_ORDER
+
+    steady = [("S", i * 0.02) for i in range(frames)]
+
+    ramp = []
+    for i in range(frames):
+        ramp.append((order[min(len(order) - 1, (i // 40) % (len(order) + 3))], i * 0.02))
+
+    noisy, cur = [], 0
+    for i in range(frames):
+        if rnd.random() < 0.03:
+            cur = max(0, min(len(order) - 1, cur + rnd.choice([-3, -2, -1, 1, 1, 2])))
+        g = order[cur] if rnd.random() > 0.1 else rnd.choice(order)
+        noisy.append((g, i * 0.02))
+
+    return [("steady", steady), ("ramp", ramp), ("noisy", noisy)]
+
+def synthetic_allgamedata(n_events, seed=0):
+    """Live Client allgamedata 모양의 payload (10명, 이벤트 n_events개, 마지막 근처에 내 펜타)"""
+    rnd = random.Random(seed)
+    names = [f"Player{i}" for i in range(10)]
+    champs = ["Samira", "Ahri", "LeeSin", "Thresh", "Jinx", "Garen", "Lux", "Yasuo", "Ezreal", "Leona"]
+    players = []
+    for i, name in enumerate(names):
+        players.append({
+            "summonerName": name,
+            "riotId": f"{name}#KR1",
+            "championName": champs[i],
+            "rawChampionName": f"game_character_displayname_{champs[i]}",
+            "team": "ORDER" if i < 5 else "CHAOS",
+            "level": rnd.randint(1, 18),
+            "isDead": False,
+            "items": [{"itemID": 1000 + k, "slot": k, "count": 1, "displayName": f"Item {k}"} for k in range(6)],
+            "scores": {"kills": rnd.randint(0, 20), "deaths": rnd.randint(0, 10), "assists": rnd.randint(0, 20),
+                       "creepScore": rnd.randint(0, 300), "wardScore": rnd.random() * 40},
+            "summonerSpells": {"summonerSpellOne": {"displayName": "Flash"}, "summonerSpellTwo": {"displayName": "Heal"}},
+        })
+    events = []
+    for eid in range(n_events):
+        if eid == n_events - 2:
+            events.append({"EventID": eid, "EventName": "Multikill", "EventTime": eid * 3.0,
+                           "KillerName": names[0], "KillStreak": 5})
+        else:
+            events.append({"EventID": eid, "EventName": "ChampionKill", "EventTime": eid * 3.0,
+                           "KillerName": rnd.choice(names), "VictimName": rnd.choice(names), "Assisters": []})
+    data = {
+        "activePlayer": {"summonerName": names[0], "riotId": f"{names[0]}#KR1", "level": 12,
+                         "championStats": {"attackDamage": 150.0, "attackSpeed": 1.4}},
+        "allPlayers": players,
+        "events": {"Events": events},
+        "gameData": {"gameMode": "CLASSIC", "gameTime": n_events * 3.0, "mapName": "Map11"},
+    }
+    return json.dumps(data).encode("utf-8")
+
+# =============================
+# Benchmarks
+# =============================
+def bench_match(results, base, repeat):
+    cv2 = app.cv2
+    for preset in app.anchor_presets:
+        scale = app.resolution_scale(preset["resolution"])
+        rw, rh = roi_size(scale)
+        app.tmpl_imgs = app._build_scaled_templates(base, scale)
+        roi = synthetic_roi(app.tmpl_imgs, rw, rh)
+        scores = {}
+        app.detect_grade_fn(roi, scores)
+        r = measure(lambda: app.detect_grade_fn(roi), repeat)
+        r["matches"] = scores["matches"]
+        r["roi"] = [rw, rh]
+        results[f"match.frame@{preset['label'].replace(' ', '')}"] = r
+
+    # 템플릿 하나씩 (기준 해상도)
+    scale = app.resolution_scale(app.TEMPLATE_BASE_RESOLUTION)
+    rw, rh = roi_size(scale)
+    app.tmpl_imgs = app._build_scaled_templates(base, scale)
+    roi = synthetic_roi(app.tmpl_imgs, rw, rh)
+    for grade, tmpls in app.tmpl_imgs.items():
+        for i, tmpl in enumerate(tmpls):
+            def one(t=tmpl):
+                cv2.minMaxLoc(cv2.matchTemplate(roi, t, cv2.TM_CCOEFF_NORMED))
+            r = measure(one, repeat, number=5)
+            r["shape"] = list(tmpl.shape)
+            results[f"match.template.{grade}[{i}]"] = r
+
+def bench_rebuild(results, base, repeat):
+    scales = sorted({round(app.resolution_scale(p["resolution"]), 4) for p in app.anchor_presets})
+    for scale in scales:
+        results[f"rebuild.scale@{scale:.4f}"] = measure(lambda: app._build_scaled_templates(base, scale), repeat)
+
+def bench_state(results, frames, repeat):
+    for name, trace in synthetic_traces(frames):
+        def run(trace=trace):
+            machine = app.GradeStateMachine()
+            step = machine.step
+            for g, now in trace:
+                step(g, now)
+        r = measure(run, max(3, repeat // 5), warmup=1)
+        r["frames"] = len(trace)
+        r["frames_per_sec"] = round(len(trace) / (r["median_us"] / 1e6))
+        results[f"state.{name}"] = r
+
+def bench_parse(results, repeat):
+    for n_events in (20, 300, 2000):
+        raw = synthetic_allgamedata(n_events)
+        data = json.loads(raw)
+        results[f"parse.json_loads@{n_events}ev"] = dict(measure(lambda: json.loads(raw), repeat), bytes=len(raw))
+        results[f"parse.is_samira@{n_events}ev"] = measure(lambda: app.is_samira_in_data(data), repeat, number=20)
+        results[f"parse.scan_pentakill@{n_events}ev"] = measure(lambda: app.scan_pentakill(data, -1), repeat, number=5)
+
+# =============================
+# Baseline compare
+# =============================
+def threshold_for(name, thresholds, default):
+    best, best_len = default, -1
+    for prefix, value in thresholds.items():
+        if name.startswith(prefix) and len(prefix) > best_len:
+            best, best_len = value, len(prefix)
+    return best
+
+def compare(results, baseline, default_threshold):
+    if baseline.get("meta", {}).get("templates") != results["meta"]["templates"]:
+        print("[BENCH] baseline used different templates -> match.* not compared")
+    thresholds = baseline.get("thresholds", {})
+    regressions = []
+    print(f"{'benchmark':44} {'base us':>10} {'now us':>10} {'ratio':>7}")
+    for name, cur in results["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        if name.startswith("match.") and baseline.get("meta", {}).get("templates") != results["meta"]["templates"]:
+            continue
+        b, c = base["median_us"], cur["median_us"]
+        ratio = c / b if b > 0 else 1.0
+        limit = threshold_for(name, thresholds, default_threshold)
+        bad = ratio > 1.0 + limit and (c - b) > NOISE_FLOOR_US
+        mark = "  REGRESSION" if bad else ""
+        print(f"{name:44} {b:10.2f} {c:10.2f} {ratio:7.2f}{mark}")
+        if bad:
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Samira Sound Tool detection benchmarks")
+    parser.add_argument("--only", default=",".join(GROUPS), help="쉼표로 구분: " + " / ".join(GROUPS))
+    parser.add_argument("--quick", action="store_true", help="반복 횟수를 줄임 (추세 확인용)")
+    parser.add_argument("--out", default=RESULTS_PATH)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="허용 느려짐 비율 (0.15 = 15%%)")
+    args = parser.parse_args()
+
+    groups = [g.strip() for g in args.only.split(",") if g.strip()]
+    repeat = 10 if args.quick else 50
+    frames = 2000 if args.quick else 10000
+
+    app.import_cv()
+    base, tmpl_source = load_base_templates()
+
+    results = {}
+    t0 = time.perf_counter()
+    if "match" in groups:
+        bench_match(results, base, repeat)
+    if "rebuild" in groups:
+        bench_rebuild(results, base, repeat)
+    if "state" in groups:
+        bench_state(results, frames, repeat)
+    if "parse" in groups:
+        bench_parse(results, repeat)
+
+    out = {
+        "meta": {
+            "created_at": time.time(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": app.np.__version__,
+            "opencv": app.cv2.__version__,
+            "opencv_threads": app.cv2.getNumThreads(),
+            "templates": tmpl_source,
+            "quick": args.quick,
+            "elapsed_sec": round(time.perf_counter() - t0, 2),
+        },
+        "results": results,
+    }
+    app.safe_write_json(args.out, out)
+
+    regressions = []
+    baseline = app.safe_read_json(args.baseline) if os.path.exists(args.baseline) else None
+    if baseline:
+        regressions = compare(out, baseline, args.threshold)
+    else:
+        for name, r in results.items():
+            print(f"{name:44} {r['median_us']:10.2f} us")
+
+    if args.save_baseline:
+        if baseline and "thresholds" in baseline:
+            out["thresholds"] = baseline["thresholds"]
+        app.safe_write_json(args.baseline, out)
+
+    if regressions:
+        print(f"[BENCH] {len(regressions)} regression(s):", ", ".join(regressions))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
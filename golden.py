@@ -0,0 +1,242 @@
+"""
+등급 감지 정확도 회귀 러너 (golden frame 코퍼스)
+
+코퍼스 구조 (라벨은 경로로):
+  golden/<W>x<H>[@<인터페이스 크기>]/<등급>/<이름>.png
+  예) golden/3440x1440@25/S/0001.png, golden/1920x1080@50/None/cooltime_03.png
+  이미지는 감지 ROI 크롭 (컬러/그레이 모두 가능). 등급 폴더는 GRADE_ORDER 중 하나.
+
+  python golden.py                          # 모든 매처 설정 x 모든 프레임 -> golden_report.json
+  python golden.py --configs my.json        # 설정 목록 직접 지정 ([{"name":..., "scale_offsets":[...], "score_threshold":...}])
+  python golden.py --baseline golden_baseline.json   # 맞던 프레임이 틀리면 exit 1
+  python golden.py add shot.png --grade S --resolution 3440x1440 --ui-scale 25
+                                            # 전체 화면 스크린샷에서 앵커 ROI를 잘라 코퍼스에 추가
+
+템플릿은 main.py와 같은 경로로 만듦: TEMPLATES -> load_templates -> rebuild_templates(scale) -> tmpl_imgs
+-> detect_grade_fn. 더 빠른 매처를 넣어도 같은 코퍼스/같은 리포트로 동등성을 확인할 수 있음.
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import multiprocessing
+
+import main as app
+
+CORPUS_DIR = "golden"
+REPORT_PATH = "golden_report.json"
+GROUP_RE = re.compile(r"^(\d+)x(\d+)(?:@(\d+))?$")
+
+DEFAULT_CONFIGS = [
+    {"name": "default", "scale_offsets": list(app.TEMPLATE_SCALE_OFFSETS), "score_threshold": app.SCORE_THRESHOLD},
+    {"name": "single_scale", "scale_offsets": [1.0], "score_threshold": app.SCORE_THRESHOLD},
+    {"name": "wide_scale", "scale_offsets": [0.94, 0.97, 1.0, 1.03, 1.06], "score_threshold": app.SCORE_THRESHOLD},
+]
+
+# =============================
+# Corpus
+# =============================
+def scan_corpus(root):
+    """-> [{"group", "resolution", "ui_scale", "frames": [(path, label), ...]}]"""
+    groups = []
+    if not os.path.isdir(root):
+        return groups
+    for name in sorted(os.listdir(root)):
+        m = GROUP_RE.match(name)
+        if not m:
+            continue
+        frames = []
+        for grade in app.GRADE_ORDER:
+            d = os.path.join(root, name, grade)
+            if not os.path.isdir(d):
+                continue
+            for fn in sorted(os.listdir(d)):
+                if fn.lower().endswith((".png", ".jpg", ".bmp")):
+                    frames.append((os.path.join(d, fn), grade))
+        if frames:
+            groups.append({
+                "group": name,
+                "resolution": (int(m.group(1)), int(m.group(2))),
+                "ui_scale": int(m.group(3)) if m.group(3) else None,
+                "frames": frames,
+            })
+    return groups
+
+def add_to_corpus(args):
+    """전체 화면 스크린샷 -> 해당 해상도 앵커 ROI 크롭 저장"""
+    app.import_cv()
+    cv2 = app.cv2
+    w, h = (int(v) for v in args.resolution.lower().split("x"))
+    preset = next((p for p in app.anchor_presets if tuple(p["resolution"]) == (w, h)), None)
+    if preset is None:
+        sys.exit(f"no anchor preset for {w}x{h}")
+    img = cv2.imread(args.screenshot, cv2.IMREAD_COLOR)
+    if img is None:
+        sys.exit(f"cannot read {args.screenshot}")
+    app.set_anchor_index(app.anchor_presets.index(preset), update_ui=False)
+    mon = app.monitor
+    crop = img[mon["top"]:mon["top"] + mon["height"], mon["left"]:mon["left"] + mon["width"]]
+    group = f"{w}x{h}" + (f"@{args.ui_scale}" if args.ui_scale else "")
+    out_dir = os.path.join(args.corpus, group, args.grade)
+    os.makedirs(out_dir, exist_ok=True)
+    out = os.path.join(out_dir, os.path.splitext(os.path.basename(args.screenshot))[0] + ".png")
+    cv2.imwrite(out, crop)
+    print("[GOLDEN] added", out, crop.shape)
+
+# =============================
+# Worker (프로세스마다 템플릿 1회 로드)
+# =============================
+_base = None
+
+def _init_worker():
+    global _base
+    app.import_cv()
+    app.cv2.setNumThreads(1)  # 프로세스 단위로 병렬 -> OpenCV 내부 스레드는 끔
+    _base = app.load_templates()
+
+def _run_task(task):
+    cfg, group = task
+    cv2 = app.cv2
+    app.TEMPLATE_SCALE_OFFSETS = cfg["scale_offsets"]
+    app.tmpl_imgs_base = _base
+    app.rebuild_templates(app.resolution_scale(group["resolution"]))
+    threshold = cfg.get("score_threshold", app.SCORE_THRESHOLD)
+
+    preds = []
+    detect_sec = 0.0
+    for path, label in group["frames"]:
+        img = cv2.imread(path, cv2.IMREAD_COLOR)
+        if img is None:
+            preds.append((path, label, "ERROR", 0.0))
+            continue
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        t0 = time.perf_counter()
+        grade, score = app.detect_grade_fn(gray)
+        detect_sec += time.perf_counter() - t0
+        if grade is None or score < threshold:
+            grade = "None"
+        preds.append((path, label, grade, float(score)))
+    return cfg["name"], group["group"], preds, detect_sec
+
+# =============================
+# Report
+# =============================
+def summarize(configs, groups, outputs, wall_sec, workers):
+    labels = list(app.GRADE_ORDER) + ["ERROR"]
+    report = {"workers": workers, "wall_sec": round(wall_sec, 3), "frames": sum(len(g["frames"]) for g in groups),
+              "configs": {}}
+    for cfg in configs:
+        confusion = {a: {b: 0 for b in labels} for a in app.GRADE_ORDER}
+        per_group = {}
+        frames = {}
+        correct = total = 0
+        detect_sec = 0.0
+        for (name, group, preds, sec) in outputs:
+            if name != cfg["name"]:
+                continue
+            detect_sec += sec
+            g_ok = 0
+            for path, label, pred, score in preds:
+                confusion[label][pred] += 1
+                ok = pred == label
+                g_ok += ok
+                frames[path.replace(os.sep, "/")] = {"label": label, "pred": pred, "score": round(score, 4)}
+            per_group[group] = round(g_ok / max(1, len(preds)), 4)
+            correct += g_ok
+            total += len(preds)
+        report["configs"][cfg["name"]] = {
+            "config": cfg,
+            "accuracy": round(correct / max(1, total), 4),
+            "per_group": per_group,
+            "confusion": confusion,
+            "detect_ms_per_frame": round(detect_sec / max(1, total) * 1000.0, 3),
+            "frames_per_sec": round(total / detect_sec, 1) if detect_sec > 0 else None,
+            "frames": frames,
+        }
+    return report
+
+def print_report(report):
+    print(f"[GOLDEN] {report['frames']} frames, {report['workers']} workers, {report['wall_sec']} s")
+    for name, r in report["configs"].items():
+        print(f"  {name:16} acc {r['accuracy'] * 100:6.2f}%  {r['detect_ms_per_frame']:7.3f} ms/frame  "
+              + "  ".join(f"{g}={a * 100:.1f}%" for g, a in r["per_group"].items()))
+    for name, r in report["configs"].items():
+        print(f"\n  confusion [{name}] (rows = label, cols = pred)")
+        cols = [c for c in app.GRADE_ORDER + ["ERROR"] if any(row[c] for row in r["confusion"].values())]
+        print("  " + " " * 6 + "".join(f"{c:>6}" for c in cols))
+        for label, row in r["confusion"].items():
+            if sum(row.values()):
+                print(f"  {label:>6}" + "".join(f"{row[c]:6d}" for c in cols))
+
+def compare_baseline(report, baseline):
+    """baseline에서 맞던 프레임이 지금 틀리면 회귀"""
+    regressions = []
+    for name, r in report["configs"].items():
+        base = baseline.get("configs", {}).get(name)
+        if not base:
+            continue
+        for path, f in base["frames"].items():
+            now = r["frames"].get(path)
+            if now and f["pred"] == f["label"] and now["pred"] != now["label"]:
+                regressions.append(f"{name}: {path} {f['label']} -> {now['pred']}")
+        print(f"[GOLDEN] {name}: accuracy {base['accuracy'] * 100:.2f}% -> {r['accuracy'] * 100:.2f}%")
+    return regressions
+
+def run(args):
+    groups = scan_corpus(args.corpus)
+    if not groups:
+        sys.exit(f"no labeled frames under {args.corpus}/<W>x<H>[@ui]/<grade>/")
+
+    configs = app.safe_read_json(args.configs) if args.configs else DEFAULT_CONFIGS
+    if not isinstance(configs, list) or not configs:
+        sys.exit("configs must be a non-empty JSON list")
+
+    tasks = [(cfg, g) for cfg in configs for g in groups]
+    workers = max(1, min(args.jobs or os.cpu_count() or 1, len(tasks)))
+
+    t0 = time.perf_counter()
+    if workers == 1:
+        _init_worker()
+        outputs = [_run_task(t) for t in tasks]
+    else:
+        with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+            outputs = pool.map(_run_task, tasks)
+    wall = time.perf_counter() - t0
+
+    report = summarize(configs, groups, outputs, wall, workers)
+    app.safe_write_json(args.out, report)
+    print_report(report)
+
+    if args.baseline and os.path.exists(args.baseline):
+        regressions = compare_baseline(report, app.safe_read_json(args.baseline) or {})
+        if regressions:
+            print(f"[GOLDEN] {len(regressions)} regression(s)")
+            for line in regressions[:50]:
+                print("  ", line)
+            sys.exit(1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Samira Sound Tool golden-frame accuracy runner")
+    parser.add_argument("--corpus", default=CORPUS_DIR)
+    sub = parser.add_subparsers(dest="command")
+
+    p_add = sub.add_parser("add", help="스크린샷에서 ROI를 잘라 코퍼스에 추가")
+    p_add.add_argument("screenshot")
+    p_add.add_argument("--grade", required=True, choices=app.GRADE_ORDER)
+    p_add.add_argument("--resolution", required=True, help="예: 3440x1440 (anchor_presets에 있는 해상도)")
+    p_add.add_argument("--ui-scale", type=int, default=None, help="게임 인터페이스 크기 (예: 25)")
+
+    parser.add_argument("--configs", default=None, help="매처 설정 목록 JSON")
+    parser.add_argument("--jobs", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--out", default=REPORT_PATH)
+    parser.add_argument("--baseline", default=None, help="이전 리포트 (맞던 프레임이 틀리면 exit 1)")
+
+    args = parser.parse_args()
+    if args.command == "add":
+        add_to_corpus(args)
+    else:
+        run(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+UI 루프가 멈춘 동안의 감지 이벤트 -> 재생 지연 검사 (오디오 스레드 분리 회귀 테스트)
+
+  python latency_check.py                   # sleep 정지 + busy 정지 각각 검사, 기준 넘으면 exit 1
+  python latency_check.py --stall sleep     # 파일 대화상자처럼 메인 스레드가 블록된 경우만
+  python latency_check.py --max-ms 30 --real-audio
+
+메인 스레드는 UI 루프 흉내 (pygame.event.pump 후 --stall-sec 동안 멈춤),
+별도 스레드가 감지 스레드처럼 GRADE / PENTA 이벤트를 event_bus에 발행.
+오디오 스레드(main.audio_thread)가 실제 재생 함수(play_music_for_grade / play_sfx_one_shot)를
+마칠 때까지의 시간을 이벤트마다 재고, 빠진 재생이 있거나 최대 지연이 --max-ms를 넘으면 실패.
+"""
+import os
+import sys
+import time
+import wave
+import struct
+import tempfile
+import argparse
+import threading
+
+import main as app
+
+DEFAULT_MAX_MS = 50.0
+STALL_MODES = ("sleep", "busy")
+
+def write_tone(path, freq, sec=0.5, rate=22050):
+    n = int(sec * rate)
+    frames = b"".join(struct.pack("<h", int(8000 * ((i * freq * 2 // rate) % 2 * 2 - 1))) for i in range(n))
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(frames)
+
+def setup_sounds(directory):
+    """사미라 슬롯(S~E) + 펜타 슬롯에 테스트용 wav 지정"""
+    for i, slot in enumerate(app.samira_slots):
+        slot["path"] = os.path.join(directory, f"grade_{slot['title']}.wav")
+        write_tone(slot["path"], 220 + 40 * i)
+    app.penta_slots[0]["path"] = os.path.join(directory, "penta.wav")
+    write_tone(app.penta_slots[0]["path"], 880, sec=0.2)
+    app.sync_sound_assets()
+
+class PlayProbe:
+    """재생 함수를 감싸 이벤트별 '발행 -> 재생 호출 완료' 시간을 기록"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = []     # 발행 순서대로 (kind, publish_t)
+        self.samples = []     # (kind, 지연 초)
+        self._music = app.play_music_for_grade
+        self._sfx = app.play_sfx_one_shot
+
+    def install(self):
+        app.play_music_for_grade = self._wrap(self._music, "GRADE")
+        app.play_sfx_one_shot = self._wrap(self._sfx, "PENTA")
+
+    def uninstall(self):
+        app.play_music_for_grade = self._music
+        app.play_sfx_one_shot = self._sfx
+
+    def _wrap(self, fn, kind):
+        def played(*args, **kwargs):
+            fn(*args, **kwargs)
+            t = time.perf_counter()
+            with self.lock:
+                if self.pending and self.pending[0][0] == kind:
+                    self.samples.append((kind, t - self.pending.pop(0)[1]))
+        return played
+
+    def expect(self, kind, t):
+        with self.lock:
+            self.pending.append((kind, t))
+
+def publish_events(probe, count, interval, done):
+    """감지 스레드 역할: 매번 다른 등급(같은 등급이면 재생 안 함) + 5번마다 펜타"""
+    grades = [s["title"] for s in app.samira_slots]
+    t = time.perf_counter()
+    app.event_bus.publish(app.SamiraActiveEvent(capture_t=t, detect_t=t, active=True, plugin="samira"))
+    time.sleep(interval)
+    for i in range(count):
+        t = time.perf_counter()
+        if i % 5 == 4:
+            probe.expect("PENTA", t)
+            app.event_bus.publish(app.PentaEvent(capture_t=t, detect_t=t))
+        else:
+            probe.expect("GRADE", t)
+            app.event_bus.publish(app.GradeEvent(capture_t=t, detect_t=t, grade=grades[i % len(grades)],
+                                                 score=0.9, seen_t=t))
+        time.sleep(interval)
+    done.set()
+
+def stall(mode, sec):
+    """UI 프레임 하나가 sec 동안 멈춤: sleep = 블로킹 대화상자, busy = GIL을 쥔 느린 redraw"""
+    if mode == "sleep":
+        time.sleep(sec)
+        return
+    end = time.perf_counter() + sec
+    x = 0
+    while time.perf_counter() < end:
+        x += 1
+
+def run_case(mode, args):
+    app.stop_music()
+    app.current_music_grade = None
+    probe = PlayProbe()
+    probe.install()
+    done = threading.Event()
+    pub = threading.Thread(target=publish_events, args=(probe, args.events, args.interval, done),
+                           daemon=True, name="detection")
+    pub.start()
+    frames = 0
+    # UI 루프: 이벤트를 전혀 꺼내지 않고 멈추기만 함
+    while not done.is_set():
+        app.pygame.event.pump()
+        stall(mode, args.stall_sec)
+        frames += 1
+    time.sleep(args.max_ms / 1000.0 * 2)
+    probe.uninstall()
+
+    lat = sorted(ms * 1000.0 for _, ms in probe.samples)
+    missing = args.events - len(lat)
+    worst = lat[-1] if lat else float("inf")
+    p50 = lat[len(lat) // 2] if lat else float("inf")
+    p99 = lat[min(len(lat) - 1, int(len(lat) * 0.99))] if lat else float("inf")
+    ok = missing == 0 and worst <= args.max_ms
+    print(f"[LATENCY] stall={mode:5} {args.stall_sec * 1000:.0f} ms x {frames} frames  "
+          f"events {len(lat)}/{args.events}  p50 {p50:6.2f}  p99 {p99:6.2f}  max {worst:6.2f} ms  "
+          f"{'ok' if ok else 'FAIL'}")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Event-to-play latency under a stalled UI loop")
+    parser.add_argument("--stall", choices=STALL_MODES + ("all",), default="all")
+    parser.add_argument("--stall-sec", type=float, default=1.0, help="UI 프레임 하나가 멈추는 시간")
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.15, help="이벤트 발행 간격 (초)")
+    parser.add_argument("--max-ms", type=float, default=DEFAULT_MAX_MS, help="허용 최대 지연 (ms)")
+    parser.add_argument("--real-audio", action="store_true", help="더미 대신 실제 오디오 장치 사용")
+    args = parser.parse_args()
+
+    if not args.real_audio:
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    app.pygame.init()
+    app.init_mixer(app.DEFAULT_MIXER_PROFILE)
+
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_sounds(tmp)
+        app.audio_thread.start()
+        for mode in (STALL_MODES if args.stall == "all" else (args.stall,)):
+            ok = run_case(mode, args) and ok
+        app.event_bus.close()
+        app.audio_thread.join(timeout=1.0)
+        app.stop_music()
+        app.pygame.mixer.quit()
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+내 화면에서 ROI/등급 템플릿 프로필 학습
+
+  python learn_profile.py myscreen shot_S.png:S shot_A.png:A shot_none.png:None
+      -> 첫 스크린샷에서 등급 아이콘을 마우스로 드래그해 표시 (나머지는 같은 위치 사용)
+  python learn_profile.py myscreen shot_S.png:S shot_A.png:A --box 1690,1305,60,60
+      -> 창 없이 아이콘 박스(x,y,w,h)를 직접 지정
+  python learn_profile.py myscreen shot_S.png:S@1690,1305,60,60 shot_A.png:A@1691,1304,59,61
+      -> 스크린샷마다 박스 지정 (위치 평균을 앵커로 사용)
+
+스크린샷은 전체 화면(게임 해상도 그대로), 라벨은 GRADE_ORDER 중 하나.
+결과: roi_profiles/<이름>/profile.json + roi_profiles/<이름>/<등급>_<n>.png
+  anchor = 아이콘 중심, roi = 아이콘 크기 x --margin, 템플릿 = 내 화면 픽셀 그대로 자른 것
+main.py는 시작 시 roi_profiles/를 읽어 앵커 목록 끝에 "<이름> (W x H, 학습)"으로 추가하고,
+선택하면 resize 없이 1:1로 매칭함.
+"""
+import os
+import sys
+import time
+import argparse
+
+import main as app
+
+PROFILE_DIR = app.ROI_PROFILE_DIR
+DEFAULT_MARGIN = app.ROI_W_BASE / 60.0   # 기본 ROI 90px / 템플릿 60px
+DUPLICATE_SCORE = 0.97                     # 같은 등급 크롭끼리 이보다 비슷하면 하나만 저장
+
+def parse_box(text):
+    box = tuple(int(v) for v in text.split(","))
+    if len(box) != 4 or box[2] <= 0 or box[3] <= 0:
+        raise ValueError(f"box must be x,y,w,h: {text}")
+    return box
+
+def parse_shot(spec):
+    """'path:GRADE[@x,y,w,h]' -> (path, grade, box or None). 경로의 드라이브 문자(C:)는 rsplit으로 보존"""
+    box = None
+    if "@" in spec:
+        spec, box_text = spec.rsplit("@", 1)
+        box = parse_box(box_text)
+    path, grade = spec.rsplit(":", 1)
+    if grade not in app.GRADE_ORDER:
+        raise ValueError(f"unknown grade {grade!r} (one of {', '.join(app.GRADE_ORDER)})")
+    return path, grade, box
+
+def mark_box(img, path):
+    cv2 = app.cv2
+    title = f"drag over the grade icon, Enter to confirm - {os.path.basename(path)}"
+    x, y, w, h = cv2.selectROI(title, img, showCrosshair=True, fromCenter=False)
+    cv2.destroyWindow(title)
+    if w <= 0 or h <= 0:
+        sys.exit("no box selected")
+    return int(x), int(y), int(w), int(h)
+
+def learn(args):
+    app.import_cv()
+    cv2 = app.cv2
+
+    shots = []
+    for spec in args.shots:
+        try:
+            path, grade, box = parse_shot(spec)
+        except ValueError as e:
+            sys.exit(str(e))
+        img = cv2.imread(path, cv2.IMREAD_COLOR)
+        if img is None:
+            sys.exit(f"cannot read {path}")
+        shots.append((path, grade, box, img))
+
+    resolutions = {(img.shape[1], img.shape[0]) for _, _, _, img in shots}
+    if len(resolutions) != 1:
+        sys.exit(f"screenshots must share one resolution, got {sorted(resolutions)}")
+    res_w, res_h = resolutions.pop()
+
+    # 박스: 스크린샷별 > --box > 첫 스크린샷에서 직접 표시
+    default_box = parse_box(args.box) if args.box else None
+    if default_box is None and any(box is None for _, _, box, _ in shots):
+        first = next(s for s in shots if s[2] is None)
+        default_box = mark_box(first[3], first[0])
+    boxes = [box or default_box for _, _, box, _ in shots]
+
+    # 앵커 = 박스 중심 평균, 아이콘 크기 = 박스 크기 중앙값 (손으로 그린 박스의 몇 px 차이 흡수)
+    ax = int(round(sum(x + w / 2.0 for x, _, w, _ in boxes) / len(boxes)))
+    ay = int(round(sum(y + h / 2.0 for _, y, _, h in boxes) / len(boxes)))
+    icon_w = sorted(b[2] for b in boxes)[len(boxes) // 2]
+    icon_h = sorted(b[3] for b in boxes)[len(boxes) // 2]
+    roi_w = max(icon_w + 2, int(round(icon_w * args.margin)))
+    roi_h = max(icon_h + 2, int(round(icon_h * args.margin)))
+
+    # 아이콘/ROI가 화면 밖으로 나가면 (음수 인덱스 슬라이스 -> 엉뚱한 크롭, 실행 시 화면 밖 grab) 아무것도 쓰기 전에 중단
+    tx, ty = ax - icon_w // 2, ay - icon_h // 2
+    rx, ry = ax - roi_w // 2, ay - roi_h // 2
+    if tx < 0 or ty < 0 or tx + icon_w > res_w or ty + icon_h > res_h:
+        sys.exit(f"icon box {icon_w}x{icon_h} at ({tx}, {ty}) falls outside the {res_w}x{res_h} screenshots")
+    if rx < 0 or ry < 0 or rx + roi_w > res_w or ry + roi_h > res_h:
+        sys.exit(f"ROI {roi_w}x{roi_h} at ({rx}, {ry}) falls outside the {res_w}x{res_h} screen - "
+                 f"lower --margin (now {args.margin:.2f})")
+
+    # 템플릿: 공통 앵커/크기로 잘라서 등급별로 (거의 같은 크롭은 하나만)
+    crops = {}
+    rois = []
+    for path, grade, _, img in shots:
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        crop = gray[ty:ty + icon_h, tx:tx + icon_w]
+        rois.append((path, grade, gray[ry:ry + roi_h, rx:rx + roi_w]))
+        same = crops.setdefault(grade, [])
+        if any(cv2.minMaxLoc(cv2.matchTemplate(crop, c, cv2.TM_CCOEFF_NORMED))[1] >= DUPLICATE_SCORE for c in same):
+            continue
+        same.append(crop)
+
+    out_dir = os.path.join(args.out, args.name)
+    os.makedirs(out_dir, exist_ok=True)
+    templates = {}
+    for grade, imgs in crops.items():
+        files = []
+        for i, crop in enumerate(imgs):
+            fn = f"{grade}_{i}.png"
+            cv2.imwrite(os.path.join(out_dir, fn), crop)
+            files.append(fn)
+        templates[grade] = files
+
+    profile = {
+        "version": app.ROI_PROFILE_VERSION,
+        "name": args.name,
+        "plugin": app.SAMIRA_PLUGIN.id,   # 사미라 등급 아이콘 전용 (다른 플러그인 감지 중에는 적용 안 됨)
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "resolution": [res_w, res_h],
+        "anchor": [ax, ay],
+        "roi": [roi_w, roi_h],
+        "icon": [icon_w, icon_h],
+        "templates": templates,
+        "sources": [{"path": p, "grade": g} for p, g, _, _ in shots],
+    }
+    app.safe_write_json(os.path.join(out_dir, "profile.json"), profile)
+    print(f"[PROFILE] {args.name}: {res_w}x{res_h} anchor=({ax}, {ay}) roi={roi_w}x{roi_h} icon={icon_w}x{icon_h}")
+    print("[PROFILE] templates:", ", ".join(f"{g}x{len(f)}" for g, f in templates.items()))
+
+    missing = [g for g in app.GRADE_ORDER if g not in templates]
+    if missing:
+        print("[PROFILE] no screenshots for:", ", ".join(missing), "- those grades can't be detected with this profile")
+
+    self_check(templates, out_dir, rois)
+
+def self_check(templates, out_dir, rois):
+    """학습에 쓴 스크린샷 ROI를 main.py와 같은 detect_grade_fn으로 다시 판정 (라벨/점수/2등과의 차이)"""
+    cv2 = app.cv2
+    app.tmpl_imgs = {g: [cv2.imread(os.path.join(out_dir, f), cv2.IMREAD_GRAYSCALE) for f in files]
+                     for g, files in templates.items()}
+    wrong = 0
+    print("[PROFILE] self-check: label -> pred (score, margin to runner-up)")
+    for path, label, roi in rois:
+        scores = {}
+        pred, score = app.detect_grade_fn(roi, scores)
+        if pred is None or score < app.SCORE_THRESHOLD:
+            pred = "None"
+        runner_up = max((v for g, v in scores.items() if g not in ("matches", pred)), default=-1.0)
+        ok = pred == label
+        wrong += not ok
+        print(f"  {'ok ' if ok else 'BAD'} {label:>4} -> {pred:<4} ({score:.3f}, +{score - runner_up:.3f})  {path}")
+    if wrong:
+        print(f"[PROFILE] {wrong} screenshot(s) misdetected - add more screenshots or redraw the box")
+
+def main():
+    parser = argparse.ArgumentParser(description="Learn a Samira Sound Tool ROI/template profile from screenshots")
+    parser.add_argument("name", help="프로필 이름 (roi_profiles/<이름>/)")
+    parser.add_argument("shots", nargs="+", help="screenshot.png:GRADE[@x,y,w,h]")
+    parser.add_argument("--box", default=None, help="모든 스크린샷에 쓸 아이콘 박스 x,y,w,h (없으면 직접 표시)")
+    parser.add_argument("--margin", type=float, default=DEFAULT_MARGIN, help="ROI 크기 = 아이콘 크기 x margin")
+    parser.add_argument("--out", default=PROFILE_DIR)
+    learn(parser.parse_args())
+
+if __name__ == "__main__":
+    main()
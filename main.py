@@ -1,42 +1,112 @@
+import time
+STARTUP_T0 = time.perf_counter()
+
 import os
+import sys
+import io
 import json
-import time
+import marshal
+import re
+import argparse
+import functools
+import hashlib
 import threading
 import queue
+import socket
+from collections import OrderedDict, deque
+from concurrent.futures import Future
 from dataclasses import dataclass
 
 import pygame
-import tkinter as tk
-from tkinter import filedialog
-
-import cv2
-import numpy as np
-import requests
-from mss import mss
-import urllib3
 
-# 로컬 라이브클라(127.0.0.1) + verify=False 경고 끄기
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+# ✅ 무거운 모듈은 창을 먼저 띄운 뒤 백그라운드/첫 사용 시 로드
+#   cv2 / numpy / mss -> load_backend() (백그라운드 로더 스레드)
+#   requests / urllib3 -> live_get_json() 첫 호출 시
+#   tkinter -> DialogService 스레드 시작 시
+cv2 = None
+np = None
 
 # =============================
-# Pygame init
+# Startup profile (--startup-profile)
 # =============================
-pygame.init()
-
-# ✅ 채널을 명시적으로 쓰려고 pre_init + set_num_channels 권장
-pygame.mixer.pre_init(frequency=44100, size=-16, channels=2, buffer=512)
-pygame.mixer.init()
-pygame.mixer.set_num_channels(8)
+startup_marks = []
+
+def startup_mark(label, start=None):
+    """STARTUP_T0 기준 경과 시간 기록. start(perf_counter)가 있으면 그 구간 소요 시간도 기록"""
+    now = time.perf_counter()
+    startup_marks.append({
+        "label": label,
+        "thread": threading.current_thread().name,
+        "at_ms": round((now - STARTUP_T0) * 1000.0, 2),
+        "self_ms": round((now - start) * 1000.0, 2) if start is not None else None,
+    })
+
+def print_startup_profile(path="startup_profile.json"):
+    """-X importtime 비슷한 형식: self / cumulative(시작 기준) / 단계"""
+    print("[STARTUP] self [ms] | cumulative [ms] | stage")
+    for m in startup_marks:
+        self_ms = f"{m['self_ms']:9.2f}" if m["self_ms"] is not None else " " * 9
+        print(f"[STARTUP] {self_ms} | {m['at_ms']:16.2f} | {m['label']} ({m['thread']})")
+    safe_write_json(path, {"marks": startup_marks})
+
+startup_mark("stdlib + pygame import")
 
-# ✅ 등급 배경음악은 mixer.music 사용 (단 1회 재생)
-# ✅ 펜타/미리듣기 SFX는 Channel로 재생 (music와 분리)
-SFX_CHANNEL = pygame.mixer.Channel(1)
+# =============================
+# CLI
+# =============================
+IPC_HOST = "127.0.0.1"
+IPC_DEFAULT_PORT = 47815
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Samira Sound Tool")
+    parser.add_argument("--audio-profile", default=None,
+                        help="mixer 프로필: low_latency / balanced / safe / auto(버퍼 자동 보정)")
+    parser.add_argument("--recalibrate-audio", action="store_true",
+                        help="저장된 보정 결과를 무시하고 오디오 버퍼 보정을 다시 실행")
+    parser.add_argument("--frame-stats", action="store_true",
+                        help="프레임 draw 시간 / 프로세스 CPU 사용률을 주기적으로 출력")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="시작 단계별 소요 시간을 출력하고 startup_profile.json으로 저장")
+    parser.add_argument("--headless", action="store_true",
+                        help="UI 없이 감지(캡처/매칭/상태 머신) + 오디오만 실행, 제어는 로컬 IPC로")
+    parser.add_argument("--ipc", action="store_true",
+                        help="UI 모드에서도 로컬 IPC 서버를 염 (--headless는 항상 켬)")
+    parser.add_argument("--ipc-port", type=int, default=None,
+                        help=f"로컬 IPC 포트 (기본 {IPC_DEFAULT_PORT}, 127.0.0.1에만 바인드)")
+    parser.add_argument("--config", default=None,
+                        help="시작 시 적용할 툴 설정 JSON 경로")
+    parser.add_argument("--record-events", default=None, metavar="PATH",
+                        help="감지 이벤트(시각/점수 포함)를 JSON Lines로 기록")
+    parser.add_argument("--latency-report", default=None, metavar="PATH",
+                        help="종료 시 단계별 지연 히스토그램을 JSON으로 저장")
+    parser.add_argument("--profile", action="store_true",
+                        help="감지/메인 루프 스택 샘플링 (종료 시 profiles/*.collapsed 저장, UI에서 F9로도 토글)")
+    parser.add_argument("--watch-player", default=None, metavar="RIOT_ID",
+                        help="이 플레이어(예: 이름#KR1)를 감지 대상으로 (관전/리플레이용, 기본: 내 챔피언)")
+    parser.add_argument("--live-url", default=None,
+                        help="Live Client allgamedata 주소 (기본 https://127.0.0.1:2999/..., 테스트 서버용)")
+    args, _ = parser.parse_known_args(argv)
+    return args
+
+ARGS = parse_args()
 
+# =============================
+# Pygame init
+# =============================
+# mixer는 init_mixer()에서 프로필대로 직접 열기 때문에 pygame.init() 대신 필요한 모듈만
+# ✅ display / font는 UI 모드에서만 (init_display) -> --headless는 창/폰트 없이 동작
 W, H = 1100, 650
-screen = pygame.display.set_mode((W, H), pygame.RESIZABLE)
-pygame.display.set_caption("Samira Sound Tool (UI + Detection + JSON Presets)")
-
-clock = pygame.time.Clock()
+screen = None
+clock = None
+
+def init_display():
+    global screen, clock
+    _t = time.perf_counter()
+    pygame.display.init()
+    screen = pygame.display.set_mode((W, H), pygame.RESIZABLE)
+    pygame.display.set_caption("Samira Sound Tool (UI + Detection + JSON Presets)")
+    clock = pygame.time.Clock()
+    startup_mark("pygame display", _t)
 
 # =============================
 # Fonts
@@ -49,9 +119,14 @@ def load_font(size):
             pass
     return pygame.font.SysFont(None, size)
 
-FONT_12 = load_font(12)
-FONT_14 = load_font(14)
-FONT_16 = load_font(16)
+FONT_12 = FONT_14 = FONT_16 = None
+
+def init_fonts():
+    global FONT_12, FONT_14, FONT_16
+    pygame.font.init()
+    FONT_12 = load_font(12)
+    FONT_14 = load_font(14)
+    FONT_16 = load_font(16)
 
 # =============================
 # Utils
@@ -67,18 +142,149 @@ def lerp_color(c1, c2, t):
             int(lerp(c1[1], c2[1], t)),
             int(lerp(c1[2], c2[2], t)))
 
+# =============================
+# Surface cache
+# =============================
+class SurfaceCache:
+    """
+    ✅ 정적인 UI 조각(그림자, 카드, 라벨)을 미리 그려두고 재사용하는 LRU 캐시
+    키는 (종류, 크기, 텍스트, 상태...) 튜플. 크기/상태가 바뀌면 키가 달라지므로 자연히 새로 그림.
+    VIDEORESIZE / 테마 변경 시에는 invalidate()로 통째로 비움.
+    개수(max_items)와 서피스 픽셀 바이트 합(max_bytes) 둘 다로 제한 -> 큰 카드/행이 쌓여도 메모리 상한 고정.
+    """
+    def __init__(self, max_items=512, max_bytes=32 * 1024 * 1024):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.items = OrderedDict()     # key -> (item, 바이트)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _size(item):
+        """Surface 또는 Surface가 든 튜플(서피스, rect 등)의 픽셀 바이트"""
+        parts = item if isinstance(item, tuple) else (item,)
+        return sum(p.get_pitch() * p.get_height() for p in parts if isinstance(p, pygame.Surface))
+
+    def get(self, key, build):
+        entry = self.items.get(key)
+        if entry is not None:
+            self.items.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        item = build()
+        size = self._size(item)
+        self.items[key] = (item, size)
+        self.bytes += size
+        while len(self.items) > 1 and (len(self.items) > self.max_items or self.bytes > self.max_bytes):
+            _, (_, old) = self.items.popitem(last=False)
+            self.bytes -= old
+        return item
+
+    def invalidate(self):
+        self.items.clear()
+        self.bytes = 0
+
+UI_CACHE = SurfaceCache()
+
+# ✅ 모든 위젯이 공유하는 글자 렌더 캐시: (font, text, color, antialias) -> Surface
+# 폰트 래스터화가 프레임 시간 대부분이라 같은 문자열은 한 번만 render
+TEXT_CACHE = SurfaceCache(max_items=1024, max_bytes=8 * 1024 * 1024)
+
+def render_text(font, text, color, antialias=True):
+    key = (font, text, tuple(color), antialias)
+    return TEXT_CACHE.get(key, lambda: font.render(text, antialias, color))
+
+@functools.lru_cache(maxsize=1024)
+def truncate_path(path, max_len=60):
+    if len(path) > max_len:
+        return "..." + path[-(max_len - 3):]
+    return path
+
+# 그림자 여백 (draw_shadow_card가 rect 바깥으로 그리는 범위)
+SHADOW_PAD = 10
+
 def draw_round_rect(surf, rect, color, radius=10, border=0, border_color=(0, 0, 0)):
     pygame.draw.rect(surf, color, rect, border_radius=radius)
     if border > 0:
         pygame.draw.rect(surf, border_color, rect, width=border, border_radius=radius)
 
-def draw_shadow_card(surf, rect, fill, radius=12, shadow_alpha=90, shadow_offset=(0, 4)):
-    shadow = pygame.Surface((rect.w + 20, rect.h + 20), pygame.SRCALPHA)
-    srect = pygame.Rect(10 + shadow_offset[0], 10 + shadow_offset[1], rect.w, rect.h)
+def _build_shadow(w, h, radius, shadow_alpha, shadow_offset):
+    shadow = pygame.Surface((w + SHADOW_PAD * 2, h + SHADOW_PAD * 2), pygame.SRCALPHA)
+    srect = pygame.Rect(SHADOW_PAD + shadow_offset[0], SHADOW_PAD + shadow_offset[1], w, h)
     pygame.draw.rect(shadow, (0, 0, 0, shadow_alpha), srect, border_radius=radius)
-    surf.blit(shadow, (rect.x - 10, rect.y - 10))
+    return shadow
+
+def draw_shadow_card(surf, rect, fill, radius=12, shadow_alpha=90, shadow_offset=(0, 4)):
+    key = ("shadow", rect.w, rect.h, radius, shadow_alpha, tuple(shadow_offset))
+    shadow = UI_CACHE.get(key, lambda: _build_shadow(rect.w, rect.h, radius, shadow_alpha, shadow_offset))
+    surf.blit(shadow, (rect.x - SHADOW_PAD, rect.y - SHADOW_PAD))
     draw_round_rect(surf, rect, fill, radius=radius)
 
+def draw_cached(surf, key, size, pos, paint):
+    """
+    size 크기의 SRCALPHA 서피스에 paint(서피스)로 한 번만 그린 뒤 pos에 blit.
+    key가 같으면 다음 프레임부터는 blit만 함.
+    """
+    def build():
+        img = pygame.Surface(size, pygame.SRCALPHA)
+        paint(img)
+        return img
+
+    img = UI_CACHE.get(key, build)
+    surf.blit(img, pos)
+    return img
+
+def draw_panel(surf, rect, title, hint=None, title_font=None):
+    """사이드바/하단/리스트 공통 패널 (그림자 카드 + 제목 + 안내문) 캐시 렌더"""
+    font = title_font or FONT_16
+    key = ("panel", rect.size, title, hint, id(font))
+    size = (rect.w + SHADOW_PAD * 2, rect.h + SHADOW_PAD * 2)
+
+    def paint(img):
+        local = pygame.Rect(SHADOW_PAD, SHADOW_PAD, rect.w, rect.h)
+        draw_shadow_card(img, local, THEME.panel, radius=16, shadow_alpha=90)
+        if title:
+            t = render_text(font, title, THEME.text)
+            img.blit(t, (local.x + 16, local.y + 16))
+        if hint:
+            h = render_text(FONT_12, hint, THEME.subtext)
+            img.blit(h, (local.x + 16, local.y + 40))
+
+    draw_cached(surf, key, size, (rect.x - SHADOW_PAD, rect.y - SHADOW_PAD), paint)
+
+# =============================
+# Frame stats (--frame-stats)
+# =============================
+class FrameStats:
+    """idle 상태 프레임 시간/CPU 측정용: interval마다 평균/최대 draw 시간과 프로세스 CPU%를 출력"""
+    def __init__(self, interval=5.0):
+        self.interval = interval
+        self.reset()
+
+    def reset(self):
+        self.t0 = time.perf_counter()
+        self.cpu0 = time.process_time()
+        self.frames = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, frame_ms):
+        self.frames += 1
+        self.total_ms += frame_ms
+        self.max_ms = max(self.max_ms, frame_ms)
+
+        wall = time.perf_counter() - self.t0
+        if wall < self.interval:
+            return
+        cpu = (time.process_time() - self.cpu0) / wall * 100.0
+        avg = self.total_ms / max(1, self.frames)
+        print(f"[FRAME] frames={self.frames} avg={avg:.2f}ms max={self.max_ms:.2f}ms "
+              f"cpu={cpu:.1f}% cache hit={UI_CACHE.hits} miss={UI_CACHE.misses} {UI_CACHE.bytes / 1048576:.1f}MB "
+              f"text hit={TEXT_CACHE.hits} miss={TEXT_CACHE.misses}")
+        self.reset()
+
 # =============================
 # Theme
 # =============================
@@ -98,11 +304,113 @@ THEME = Theme()
 # =============================
 # File pickers
 # =============================
-def pick_audio_file():
-    root = tk.Tk()
-    root.withdraw()
-    root.attributes("-topmost", True)
-    file_path = filedialog.askopenfilename(
+class DialogService:
+    """
+    ✅ tkinter 파일 대화상자 전용 스레드 (숨긴 Tk root 하나를 계속 재사용)
+    요청은 큐로 넘기고 결과는 Future로 받음 -> 대화상자가 떠 있어도 메인 루프/오디오/감지는 계속 돎.
+    콜백은 poll()에서 메인 스레드로 옮겨 실행 (UI 상태는 메인 스레드에서만 건드림).
+    """
+    POLL_MS = 50
+
+    def __init__(self):
+        self.requests = queue.Queue()
+        self.completed = queue.Queue()
+        self.pending = 0
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._thread_main, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.requests.put(None)
+
+    def _fail_all(self, error):
+        # Tk를 못 띄우는 환경(디스플레이 없음 등): 요청은 즉시 실패 처리
+        while True:
+            item = self.requests.get()
+            if item is None:
+                return
+            future = item[2]
+            if future.set_running_or_notify_cancel():
+                future.set_exception(error)
+
+    def _thread_main(self):
+        try:
+            import tkinter as tk
+            from tkinter import filedialog
+            root = tk.Tk()
+        except Exception as e:
+            print("[ERROR] 파일 대화상자 초기화 실패:", e)
+            self._fail_all(e)
+            return
+        root.withdraw()
+        root.attributes("-topmost", True)
+
+        def pump():
+            while True:
+                try:
+                    item = self.requests.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    root.quit()
+                    return
+                ask_name, kwargs, future = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    ask = getattr(filedialog, ask_name)
+                    future.set_result(ask(parent=root, **kwargs) or "")
+                except Exception as e:
+                    future.set_exception(e)
+            root.after(self.POLL_MS, pump)
+
+        root.after(self.POLL_MS, pump)
+        root.mainloop()
+        try:
+            root.destroy()
+        except Exception:
+            pass
+
+    def ask(self, ask_name, callback=None, **kwargs):
+        """ask_name: tkinter.filedialog 함수 이름 (tkinter는 대화상자 스레드에서만 import)"""
+        future = Future()
+        if callback is not None:
+            def done(f):
+                self.completed.put((callback, f))
+                wake_ui()
+            future.add_done_callback(done)
+        self.pending += 1
+        self.requests.put((ask_name, kwargs, future))
+        return future
+
+    def busy(self):
+        return self.pending > 0
+
+    def poll(self):
+        """메인 루프에서 매 프레임 호출: 끝난 대화상자의 콜백 실행"""
+        while True:
+            try:
+                callback, future = self.completed.get_nowait()
+            except queue.Empty:
+                break
+            self.pending = max(0, self.pending - 1)
+            try:
+                result = future.result()
+            except Exception as e:
+                print("[ERROR] 파일 대화상자 실패:", e)
+                result = ""
+            callback(result)
+
+dialogs = DialogService()
+
+def pick_audio_file(on_picked):
+    return dialogs.ask(
+        "askopenfilename",
+        on_picked,
         title="사운드 파일 선택",
         filetypes=[
             ("Audio Files", "*.mp3 *.wav *.ogg"),
@@ -112,32 +420,24 @@ def pick_audio_file():
             ("All Files", "*.*"),
         ],
     )
-    root.destroy()
-    return file_path
-
-def pick_json_save_path(default_name="tool_config.json"):
-    root = tk.Tk()
-    root.withdraw()
-    root.attributes("-topmost", True)
-    file_path = filedialog.asksaveasfilename(
+
+def pick_json_save_path(on_picked, default_name="tool_config.json"):
+    return dialogs.ask(
+        "asksaveasfilename",
+        on_picked,
         title="설정 JSON 저장",
         defaultextension=".json",
         initialfile=default_name,
         filetypes=[("JSON", "*.json"), ("All Files", "*.*")],
     )
-    root.destroy()
-    return file_path
-
-def pick_json_open_path(title="설정 JSON 불러오기"):
-    root = tk.Tk()
-    root.withdraw()
-    root.attributes("-topmost", True)
-    file_path = filedialog.askopenfilename(
+
+def pick_json_open_path(on_picked, title="설정 JSON 불러오기"):
+    return dialogs.ask(
+        "askopenfilename",
+        on_picked,
         title=title,
         filetypes=[("JSON", "*.json"), ("All Files", "*.*")],
     )
-    root.destroy()
-    return file_path
 
 def safe_read_json(path):
     try:
@@ -158,15 +458,321 @@ def safe_write_json(path, data):
         print("[ERROR] JSON 저장 실패:", path, e)
         return False
 
+# =============================
+# Mixer profiles
+# =============================
+# ✅ buffer가 작을수록 지연이 짧지만 언더런(끊김) 위험이 커짐
+MIXER_PROFILES = {
+    "low_latency": {"frequency": 48000, "size": -16, "channels": 2, "buffer": 256, "num_channels": 8},
+    "balanced":    {"frequency": 44100, "size": -16, "channels": 2, "buffer": 512, "num_channels": 8},
+    "safe":        {"frequency": 44100, "size": -16, "channels": 2, "buffer": 2048, "num_channels": 8},
+}
+DEFAULT_MIXER_PROFILE = "balanced"
+AUTO_MIXER_PROFILE = "auto"
+
+AUDIO_CALIBRATION_PATH = "audio_calibration.json"
+CALIBRATION_BUFFERS = [128, 256, 512, 1024, 2048]
+CALIBRATION_TONE_SEC = 0.1
+CALIBRATION_REPEATS = 3
+# 재생 시간이 명목 길이보다 이만큼 이상 늘어나면 콜백이 밀린 것(언더런)으로 판단
+CALIBRATION_STRETCH_TOL_SEC = 0.015
+
+# ✅ mixer 호출은 오디오 스레드 / UI 스레드(미리듣기) 양쪽에서 오므로 직렬화
+audio_lock = threading.RLock()
+
+# ✅ 등급 배경음악은 mixer.music 사용 (단 1회 재생)
+# ✅ 펜타/미리듣기 SFX는 Channel로 재생 (music와 분리)
+SFX_CHANNEL = None
+mixer_profile_name = None
+mixer_settings = None
+
+def _open_mixer(frequency, size, channels, buffer, num_channels):
+    global SFX_CHANNEL
+    with audio_lock:
+        # pygame.init()이 기본값으로 mixer를 먼저 열어버리므로 닫고 다시 열어야 buffer가 반영됨
+        if pygame.mixer.get_init():
+            pygame.mixer.quit()
+        pygame.mixer.pre_init(frequency=frequency, size=size, channels=channels, buffer=buffer)
+        pygame.mixer.init()
+        pygame.mixer.set_num_channels(num_channels)
+        SFX_CHANNEL = pygame.mixer.Channel(1)
+
+def _calibration_key(profile):
+    driver = os.environ.get("SDL_AUDIODRIVER", "") or "default"
+    return f"{driver}|{profile['frequency']}|{profile['channels']}"
+
+def _measure_buffer(buffer, profile):
+    """
+    buffer 크기 하나를 열어 무음 톤을 반복 재생:
+    - latency: play() 호출 ~ 채널이 끝날 때까지 걸린 시간에서 톤 길이를 뺀 값
+    - stretch: 재생 시간이 반복마다 얼마나 늘어지는지 (콜백이 밀리면 늘어남 = 언더런)
+    """
+    _open_mixer(profile["frequency"], profile["size"], profile["channels"], buffer, profile["num_channels"])
+    freq, fmt, ch = pygame.mixer.get_init()
+    frames = int(freq * CALIBRATION_TONE_SEC)
+    snd = pygame.mixer.Sound(buffer=bytes(frames * ch * (abs(fmt) // 8)))
+    nominal = snd.get_length()
+
+    durations = []
+    for _ in range(CALIBRATION_REPEATS):
+        t0 = time.perf_counter()
+        channel = snd.play()
+        if channel is None:
+            return None
+        deadline = t0 + nominal + 1.0
+        while channel.get_busy() and time.perf_counter() < deadline:
+            time.sleep(0.001)
+        durations.append(time.perf_counter() - t0)
+
+    latency = max(0.0, min(durations) - nominal)
+    stretch = max(durations) - min(durations)
+    return {
+        "buffer": buffer,
+        "latency_ms": round(latency * 1000.0, 2),
+        "stretch_ms": round(stretch * 1000.0, 2),
+        "stable": stretch <= CALIBRATION_STRETCH_TOL_SEC and latency <= nominal + 0.5,
+    }
+
+def calibrate_mixer_buffer(profile, force=False):
+    """작은 buffer부터 측정해 처음으로 안정적인 크기를 고름 (결과는 드라이버별로 캐시)"""
+    key = _calibration_key(profile)
+    cache = safe_read_json(AUDIO_CALIBRATION_PATH) if os.path.exists(AUDIO_CALIBRATION_PATH) else None
+    if not isinstance(cache, dict):
+        cache = {}
+
+    cached = cache.get(key)
+    if not force and isinstance(cached, dict) and isinstance(cached.get("buffer"), int):
+        return cached["buffer"]
+
+    results = []
+    chosen = None
+    for buffer in CALIBRATION_BUFFERS:
+        try:
+            r = _measure_buffer(buffer, profile)
+        except Exception as e:
+            print("[AUDIO CALIBRATION] buffer", buffer, "failed:", e)
+            r = None
+        if r is None:
+            continue
+        results.append(r)
+        print("[AUDIO CALIBRATION]", r)
+        if r["stable"]:
+            chosen = buffer
+            break
+
+    if chosen is None:
+        chosen = MIXER_PROFILES["safe"]["buffer"]
+
+    cache[key] = {"buffer": chosen, "results": results, "time": int(time.time())}
+    safe_write_json(AUDIO_CALIBRATION_PATH, cache)
+    return chosen
+
+def init_mixer(profile_name=None, force_calibration=False):
+    global mixer_profile_name, mixer_settings
+    name = profile_name or DEFAULT_MIXER_PROFILE
+
+    if name == AUTO_MIXER_PROFILE:
+        profile = dict(MIXER_PROFILES["low_latency"])
+        profile["buffer"] = calibrate_mixer_buffer(profile, force=force_calibration)
+    elif name in MIXER_PROFILES:
+        profile = dict(MIXER_PROFILES[name])
+    else:
+        print("[WARN] unknown audio profile:", name, "->", DEFAULT_MIXER_PROFILE)
+        name = DEFAULT_MIXER_PROFILE
+        profile = dict(MIXER_PROFILES[name])
+
+    _open_mixer(profile["frequency"], profile["size"], profile["channels"], profile["buffer"], profile["num_channels"])
+    mixer_profile_name = name
+    mixer_settings = profile
+    print("[AUDIO PROFILE]", name, profile)
+
+# =============================
+# Loudness normalization
+# =============================
+# ✅ 슬롯 파일마다 음량 편차가 커서 파일별 게인을 미리 계산해 재생 시 곱함
+# ✅ 분석 결과는 path+mtime+size 키로 캐시 -> 실행할 때마다 다시 분석하지 않음
+LOUDNESS_CACHE_PATH = "loudness_cache.json"
+LOUDNESS_TARGET_LUFS = -18.0
+LOUDNESS_MIN_GAIN_DB = -24.0
+LOUDNESS_MAX_GAIN_DB = 12.0
+LOUDNESS_BLOCK_SEC = 0.4      # BS.1770 게이팅 블록 (400ms, 75% overlap)
+LOUDNESS_ABS_GATE = -70.0
+LOUDNESS_REL_GATE = -10.0
+LOUDNESS_CHUNK_BLOCKS = 32    # rfft를 한 번에 돌리는 블록 수 (4분 스테레오 곡도 작업 메모리 ~20MB로 고정)
+LOUDNESS_RMS_CHUNK = 1 << 20  # RMS 제곱합을 구하는 프레임 단위
+
+# BS.1770 K-weighting 필터 (48kHz 기준 biquad 2단: high-shelf + high-pass)
+_K_SHELF = ([1.53512485958697, -2.69169618940638, 1.19839281085285], [1.0, -1.69065929318241, 0.73248077421585])
+_K_HIPASS = ([1.0, -2.0, 1.0], [1.0, -1.99004745483398, 0.99007225036621])
+
+loudness_lock = threading.Lock()
+loudness_cache = None          # 디스크 캐시 {key: {"lufs", "rms_db", "gain"}}
+loudness_gain_by_path = {}     # 재생 경로 -> 선형 게인 (재생 시에는 dict 조회만)
+_loudness_pending = set()
+_loudness_executor = None
+
+def _k_weight_power(freqs_hz):
+    """K-weighting 필터의 |H(f)|^2 (주파수 영역에서 곱하기 위해 미리 계산)"""
+    w = 2.0 * np.pi * np.minimum(freqs_hz, 24000.0) / 48000.0
+    z1 = np.exp(-1j * w)
+    z2 = z1 * z1
+    h = np.ones_like(z1)
+    for b, a in (_K_SHELF, _K_HIPASS):
+        h = h * (b[0] + b[1] * z1 + b[2] * z2) / (a[0] + a[1] * z1 + a[2] * z2)
+    return np.abs(h) ** 2
+
+def measure_loudness(samples, rate):
+    """
+    samples: (frames, channels) float32 [-1, 1]
+    반환: (integrated LUFS, RMS dBFS)
+    블록 단위 rfft에 K-weighting을 곱해 파워를 구하므로 IIR 루프 없이 전부 벡터 연산.
+    ✅ 겹치는 블록 전체를 한 번에 rfft하면 곡 길이에 비례해 수백 MB가 필요 ->
+       LOUDNESS_CHUNK_BLOCKS개씩 나눠 블록 에너지만 모음 (결과는 같고 메모리는 곡 길이와 무관)
+    """
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    frames = samples.shape[0]
+    if frames == 0:
+        return None, None
+
+    sq = 0.0
+    for i in range(0, frames, LOUDNESS_RMS_CHUNK):
+        part = samples[i:i + LOUDNESS_RMS_CHUNK].astype(np.float64)
+        sq += float(np.einsum("ij,ij->", part, part))
+    rms = (sq / samples.size) ** 0.5
+    rms_db = float(20.0 * np.log10(max(rms, 1e-9)))
+
+    block = max(1, min(frames, int(rate * LOUDNESS_BLOCK_SEC)))
+    hop = max(1, block // 4)
+    # (블록 수, 채널, block) 뷰 -> 복사 없이 겹치는 블록 생성 (rfft는 청크 단위로만 복사)
+    blocks = np.lib.stride_tricks.sliding_window_view(samples, block, axis=0)[::hop]
+
+    weight = _k_weight_power(np.fft.rfftfreq(block, d=1.0 / rate))
+    # Parseval: 실수 신호 rfft는 DC/나이퀴스트 외 성분이 양쪽 대칭이므로 2배
+    weight[1:(block + 1) // 2] *= 2.0
+    weight /= block * block
+    z = np.empty(blocks.shape[0], dtype=np.float64)
+    for i in range(0, blocks.shape[0], LOUDNESS_CHUNK_BLOCKS):
+        spec = np.fft.rfft(blocks[i:i + LOUDNESS_CHUNK_BLOCKS], axis=-1)
+        power = spec.real ** 2 + spec.imag ** 2
+        z[i:i + LOUDNESS_CHUNK_BLOCKS] = (power @ weight).sum(axis=-1)   # 채널 합 (L/R 가중치 1.0)
+
+    with np.errstate(divide="ignore"):
+        block_lufs = -0.691 + 10.0 * np.log10(z)
+
+    gated = z[block_lufs > LOUDNESS_ABS_GATE]
+    if gated.size == 0:
+        return None, rms_db
+    rel_gate = -0.691 + 10.0 * np.log10(gated.mean()) + LOUDNESS_REL_GATE
+    gated = z[(block_lufs > LOUDNESS_ABS_GATE) & (block_lufs > rel_gate)]
+    if gated.size == 0:
+        return None, rms_db
+    return float(-0.691 + 10.0 * np.log10(gated.mean())), rms_db
+
+def _loudness_key(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}"
+
+def _load_loudness_cache():
+    global loudness_cache
+    if loudness_cache is None:
+        data = safe_read_json(LOUDNESS_CACHE_PATH) if os.path.exists(LOUDNESS_CACHE_PATH) else None
+        loudness_cache = data if isinstance(data, dict) else {}
+    return loudness_cache
+
+def _analyze_one(path):
+    key = _loudness_key(path)
+    if key is None:
+        return path, None, None
+    import_numpy()
+
+    with loudness_lock:
+        entry = _load_loudness_cache().get(key)
+    if isinstance(entry, dict) and "gain" in entry:
+        return path, key, entry
+
+    snd = pygame.mixer.Sound(path)
+    rate, fmt, _ = pygame.mixer.get_init()
+    raw = pygame.sndarray.array(snd)
+    samples = raw.astype(np.float32) / float(2 ** (abs(fmt) - 1))
+    lufs, rms_db = measure_loudness(samples, rate)
+
+    level = lufs if lufs is not None else rms_db
+    gain_db = clamp(LOUDNESS_TARGET_LUFS - level, LOUDNESS_MIN_GAIN_DB, LOUDNESS_MAX_GAIN_DB)
+    entry = {
+        "lufs": None if lufs is None else round(lufs, 2),
+        "rms_db": round(rms_db, 2),
+        "gain": round(10.0 ** (gain_db / 20.0), 4),
+    }
+    return path, key, entry
+
+def _on_loudness_done(path, future):
+    try:
+        path, key, entry = future.result()
+    except Exception as e:
+        # 실패한 경로도 pending에서 빼야 다음 schedule_loudness_analysis에서 다시 시도됨
+        print("[LOUDNESS] 분석 실패:", path, e)
+        with loudness_lock:
+            _loudness_pending.discard(path)
+            # 마지막 작업이 실패해도 앞서 끝난 결과는 저장
+            snapshot = dict(loudness_cache) if loudness_cache and not _loudness_pending else None
+        if snapshot is not None:
+            safe_write_json(LOUDNESS_CACHE_PATH, snapshot)
+        return
+
+    with loudness_lock:
+        _loudness_pending.discard(path)
+        if key is None or entry is None:
+            return
+        cache = _load_loudness_cache()
+        is_new = cache.get(key) is not entry
+        cache[key] = entry
+        loudness_gain_by_path[path] = entry["gain"]
+        flush = is_new and not _loudness_pending
+
+    if is_new:
+        print("[LOUDNESS]", path, entry)
+    if flush:
+        with loudness_lock:
+            snapshot = dict(loudness_cache)
+        safe_write_json(LOUDNESS_CACHE_PATH, snapshot)
+
+def schedule_loudness_analysis(paths):
+    """백그라운드 스레드 풀에서 분석 (폴더 단위로 넘겨도 코어 수만큼 병렬)"""
+    global _loudness_executor
+    from concurrent.futures import ThreadPoolExecutor
+
+    with loudness_lock:
+        if _loudness_executor is None:
+            _loudness_executor = ThreadPoolExecutor(max_workers=max(1, (os.cpu_count() or 2) - 1),
+                                                    thread_name_prefix="loudness")
+        todo = [p for p in paths if p and p not in _loudness_pending]
+        _loudness_pending.update(todo)
+
+    for path in todo:
+        _loudness_executor.submit(_analyze_one, path).add_done_callback(functools.partial(_on_loudness_done, path))
+
+def loudness_gain(path):
+    if not state.get("normalize_loudness", True):
+        return 1.0
+    return loudness_gain_by_path.get(path, 1.0)
+
 # =============================
 # Audio helpers
 # =============================
+# 현재 배경음악 파일의 loudness 게인 (덕킹/볼륨 변경에도 같이 곱해짐)
+_music_gain = 1.0
+
 def set_music_volume(vol_0_100):
-    pygame.mixer.music.set_volume(clamp(vol_0_100, 0, 100) / 100.0)
+    pygame.mixer.music.set_volume(clamp(clamp(vol_0_100, 0, 100) / 100.0 * _music_gain, 0.0, 1.0))
 
 def stop_music():
     try:
-        pygame.mixer.music.stop()
+        with audio_lock:
+            pygame.mixer.music.stop()
     except:
         pass
 
@@ -174,25 +780,32 @@ def stop_music():
 current_music_grade = None
 
 def play_music_for_grade(grade, music_path, volume_0_100):
-    global current_music_grade
+    global current_music_grade, _music_gain
 
     # None이면 아무 것도 하지 않음 (음악 유지)
     if grade == "None":
         return
 
-    if not music_path or not os.path.exists(music_path):
+    # 경로 확인은 sound_assets가 미리 해 둠 (여기서는 dict 조회만)
+    asset = sound_assets.get(music_path)
+    if asset is None or not asset.exists:
         return
 
     # 같은 등급이면 재시작 금지 (음악 끝났어도 재시작 안 함)
     if grade == current_music_grade:
         return
 
-    pygame.mixer.music.stop()
-    pygame.mixer.music.load(music_path)
-    set_music_volume(volume_0_100)
+    with audio_lock:
+        pygame.mixer.music.stop()
+        if asset.data is not None:
+            pygame.mixer.music.load(io.BytesIO(asset.data), os.path.splitext(asset.resolved)[1].lstrip("."))
+        else:
+            pygame.mixer.music.load(asset.resolved)
+        _music_gain = loudness_gain(music_path)
+        set_music_volume(volume_0_100)
 
-    # ✅ 한 번만 재생 (반복 X)
-    pygame.mixer.music.play(0)
+        # ✅ 한 번만 재생 (반복 X)
+        pygame.mixer.music.play(0)
 
     current_music_grade = grade
 
@@ -203,51 +816,598 @@ _base_music_volume_0_100 = 30
 
 def play_sfx_one_shot(path, volume_0_100, duck=True):
     global _ducking
-    if not path or not os.path.exists(path):
-        return
+    # 조회 ~ 재생까지 audio_lock 안에서: set_audio_profile(mixer 재시작)과 섞이지 않고,
+    # 레지스트리의 공유 Sound에 대한 set_volume도 오디오 스레드/UI 미리듣기 사이에서 직렬화
+    with audio_lock:
+        asset = sound_assets.get(path)
+        if asset is None or not asset.exists:
+            return
+
+        snd = asset.sound
+        if snd is None:
+            # 아직 디코딩 전(또는 배경음악 슬롯 미리듣기) -> 이번만 직접 로드
+            try:
+                snd = pygame.mixer.Sound(file=io.BytesIO(asset.data)) if asset.data is not None else pygame.mixer.Sound(asset.resolved)
+            except Exception as e:
+                print("[SFX LOAD FAIL]", path, e)
+                return
+
+        # SFX 볼륨은 유저 볼륨 x 파일별 loudness 게인 (원하면 여기서도 0.5 적용 가능)
+        snd.set_volume(clamp(clamp(volume_0_100, 0, 100) / 100.0 * loudness_gain(path), 0.0, 1.0))
+
+        if duck:
+            _ducking = True
+            # 배경음악 볼륨 1/2
+            set_music_volume(volume_0_100 * 0.5)
+
+        # 기존 SFX 즉시 컷(원치 않으면 stop 제거)
+        try:
+            SFX_CHANNEL.stop()
+        except:
+            pass
+
+        SFX_CHANNEL.play(snd)
+
+def update_ducking(volume_0_100):
+    """오디오 스레드에서 주기적으로 호출: SFX가 끝나면 배경음악 볼륨을 원상복귀"""
+    global _ducking
+    with audio_lock:
+        if _ducking and (not SFX_CHANNEL.get_busy()):
+            _ducking = False
+            set_music_volume(volume_0_100)
 
+# =============================
+# Sound assets (슬롯 경로 -> 미리 확인/로드된 핸들)
+# =============================
+ASSET_POLL_SEC = 2.0
+ASSET_PRELOAD_MAX_BYTES = 64 * 1024 * 1024
+
+class SoundAsset:
+    """
+    슬롯 경로 하나의 확인 결과. 교체만 하고 수정하지 않음 (이벤트 스레드는 락 없이 읽음)
+    sig: 파일 (mtime_ns, size), 없으면 None
+    data: 파일 내용 (배경음악은 mixer.music이 스트리밍 -> 바이트만 메모리에)
+    sound: SFX용 pygame Sound (디코딩까지 끝난 것)
+    loaded: 이 sig로 미리 로드를 시도했는지 (실패/너무 큰 파일도 True -> 재시도 안 함)
+    """
+    __slots__ = ("path", "kind", "resolved", "sig", "data", "sound", "loaded")
+
+    def __init__(self, path, kind, resolved, sig, data=None, sound=None, loaded=False):
+        self.path = path
+        self.kind = kind
+        self.resolved = resolved
+        self.sig = sig
+        self.data = data
+        self.sound = sound
+        self.loaded = loaded
+
+    @property
+    def exists(self):
+        return self.sig is not None
+
+def _stat_sig(path):
     try:
-        snd = pygame.mixer.Sound(path)
-    except Exception as e:
-        print("[SFX LOAD FAIL]", path, e)
-        return
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+class SoundAssetRegistry:
+    """
+    ✅ 슬롯 경로는 지정/설정 로드 시점(sync)에 한 번만 확인하고,
+    이벤트 처리(handle_detection_event / play_*)는 get()으로 dict 조회만 함 -> 재생 경로에 stat/open 없음.
+    파일 내용/Sound 디코딩은 백그라운드 감시 스레드가 채우고, ASSET_POLL_SEC마다 mtime/size로 다시 확인
+    (파일이 바뀌거나 지워지거나 새로 생기면 교체).
+    """
+    def __init__(self, poll_sec=ASSET_POLL_SEC):
+        self.poll_sec = poll_sec
+        self.lock = threading.Lock()
+        self.assets = {}        # 슬롯 경로(그대로) -> SoundAsset
+        self.generation = 0     # reload_sounds마다 증가 (이전 mixer로 만든 Sound가 다시 들어오지 않게)
+        self.running = False
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._watch_main, daemon=True, name="asset-watcher")
+        self._thread.start()
+
+    def stop(self):
+        self.running = False
+        self._wake.set()
+
+    def get(self, path):
+        return self.assets.get(path)
+
+    def sync(self, wanted):
+        """wanted: {경로: "music" | "sfx"}. 새 경로만 stat으로 확인, 목록에서 빠진 경로는 버림"""
+        with self.lock:
+            current = self.assets
+        assets = {}
+        for path, kind in wanted.items():
+            if not path:
+                continue
+            a = current.get(path)
+            if a is None or a.kind != kind:
+                resolved = os.path.abspath(os.path.expanduser(path))
+                a = SoundAsset(path, kind, resolved, _stat_sig(resolved))
+            assets[path] = a
+        with self.lock:
+            self.assets = assets
+        self._wake.set()
+
+    def reload_sounds(self):
+        """mixer를 다시 열면 기존 Sound는 못 씀 -> 버리고 감시 스레드가 새 형식으로 다시 디코딩"""
+        with self.lock:
+            self.assets = {p: SoundAsset(a.path, a.kind, a.resolved, a.sig, a.data, loaded=a.kind != "sfx")
+                           for p, a in self.assets.items()}
+            self.generation += 1
+        self._wake.set()
+
+    def _preload(self, a, sig):
+        if sig is None:
+            return SoundAsset(a.path, a.kind, a.resolved, None, loaded=True)
+        data = sound = None
+        try:
+            if sig[1] <= ASSET_PRELOAD_MAX_BYTES:
+                with open(a.resolved, "rb") as f:
+                    data = f.read()
+            if a.kind == "sfx" and data is not None:
+                with audio_lock:
+                    if pygame.mixer.get_init():
+                        sound = pygame.mixer.Sound(file=io.BytesIO(data))
+        except Exception as e:
+            print("[ASSET] preload failed:", a.path, e)
+        return SoundAsset(a.path, a.kind, a.resolved, sig, data, sound, loaded=True)
+
+    def revalidate(self):
+        with self.lock:
+            current = dict(self.assets)
+            generation = self.generation
+
+        updated = {}
+        for path, a in current.items():
+            sig = _stat_sig(a.resolved)
+            if sig == a.sig and a.loaded:
+                continue
+            if sig != a.sig:
+                print("[ASSET]", "missing:" if sig is None else "updated:", path)
+            updated[path] = self._preload(a, sig)
+
+        if updated:
+            with self.lock:
+                if self.generation != generation:
+                    # 그 사이 mixer가 다시 열림 -> 이번 결과(이전 mixer의 Sound)는 버리고 다음 주기에 다시
+                    return 0
+                assets = dict(self.assets)
+                for path, a in updated.items():
+                    # 그 사이 sync로 바뀐/빠진 경로는 건드리지 않음
+                    if assets.get(path) is current[path]:
+                        assets[path] = a
+                self.assets = assets
+        return len(updated)
+
+    def _watch_main(self):
+        while self.running:
+            try:
+                self.revalidate()
+            except Exception as e:
+                print("[ASSET] revalidate 실패:", e)
+            self._wake.wait(self.poll_sec)
+            self._wake.clear()
+
+sound_assets = SoundAssetRegistry()
+
+# =============================
+# Tool config (스키마 / 마이그레이션 / 바이너리 캐시)
+# =============================
+# version 1: "version" 없음. 슬롯이 경로 문자열 목록이거나 samira가 {"S": 경로, ...} 형태일 수 있음
+# version 2: {"version": 2, ..., "samira": [{"title", "path"}], "penta": [...]} (export_tool_config)
+#            audio_profile / normalize_loudness / profiler / watch_player / plugins는 나중에 추가된 선택 필드
+#            plugins: {"<플러그인 id>": [{"title", "path"}, ...]} (사미라 외 플러그인 슬롯)
+CONFIG_VERSION = 2
+CONFIG_CACHE_FORMAT = 5   # ToolConfig 필드가 바뀌면 올림 -> 기존 캐시 전부 무효
+
+def _user_cache_dir():
+    """사용자별 로컬 캐시 폴더 (Windows: %LOCALAPPDATA%, 그 외: $XDG_CACHE_HOME 또는 ~/.cache)"""
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") or os.path.join("~", ".cache")
+    return os.path.join(os.path.expanduser(base), "samira-sound-tool")
+
+# 컴파일된 설정 캐시는 JSON 옆(공유 presets 폴더일 수 있음)이 아니라 여기에만 씀
+CONFIG_CACHE_DIR = os.path.join(_user_cache_dir(), "config")
+
+class ConfigError(ValueError):
+    pass
+
+def _migrate_v1(data):
+    out = dict(data)
+    for group in ("samira", "penta"):
+        slots = out.get(group)
+        if isinstance(slots, dict) and group == "samira":
+            slots = [slots.get(s["title"], "") for s in samira_slots]
+        if isinstance(slots, list):
+            out[group] = [{"path": s} if isinstance(s, str) else s for s in slots]
+    out["version"] = 2
+    return out
+
+# 버전 N -> N+1 변환. CONFIG_VERSION을 올릴 때 여기에 한 단계씩 추가
+CONFIG_MIGRATIONS = {
+    1: _migrate_v1,
+}
+
+def migrate_tool_config(data):
+    if not isinstance(data, dict):
+        raise ConfigError("config must be a JSON object")
+    version = data.get("version", 1)
+    if isinstance(version, bool) or not isinstance(version, int) or version < 1:
+        raise ConfigError(f"invalid version: {version!r}")
+    if version > CONFIG_VERSION:
+        raise ConfigError(f"version {version} is newer than supported {CONFIG_VERSION}")
+    while version < CONFIG_VERSION:
+        data = CONFIG_MIGRATIONS[version](data)
+        version = data["version"]
+    return data
+
+class ToolConfig:
+    """
+    검증/마이그레이션이 끝난 설정. None인 필드는 "현재 값 유지" (apply_tool_config).
+    samira / penta: 슬롯 순서대로 (title, path, resolved) 또는 None(잘못된 항목 -> 유지)
+    파일 존재 여부는 캐시하지 않음 -> apply 때 SoundAssetRegistry.sync가 확인
+    plugins: ((플러그인 id, 슬롯들), ...)
+    """
+    __slots__ = ("version", "volume", "debug_window", "anchor_index", "audio_profile",
+                 "normalize_loudness", "profiler", "watch_player", "samira", "penta", "plugins", "errors")
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    def to_tuple(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    @classmethod
+    def from_tuple(cls, values):
+        return cls(**dict(zip(cls.__slots__, values)))
+
+    def sound_paths(self):
+        slots = self.samira + self.penta + tuple(s for _, group in self.plugins for s in group)
+        return [s[1] for s in slots if s is not None and s[1]]
+
+def _is_number(v):
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+def _compile_slots(group, raw, count, errors):
+    if raw is None:
+        return ()
+    if not isinstance(raw, list):
+        errors.append(f"{group}: expected a list, got {type(raw).__name__}")
+        return ()
+    if len(raw) > count:
+        errors.append(f"{group}: {len(raw)} entries, only the first {count} are used")
+    out = []
+    for i, slot in enumerate(raw[:count]):
+        path = slot.get("path", "") if isinstance(slot, dict) else None
+        if not isinstance(path, str):
+            errors.append(f"{group}[{i}]: expected {{\"path\": str}}, got {slot!r}")
+            out.append(None)
+            continue
+        title = slot.get("title", "")
+        resolved = os.path.abspath(os.path.expanduser(path)) if path else ""
+        out.append((title if isinstance(title, str) else "", path, resolved))
+    return tuple(out)
+
+def _compile_plugin_slots(raw, errors):
+    if raw is None:
+        return ()
+    if not isinstance(raw, dict):
+        errors.append(f"plugins: expected an object, got {type(raw).__name__}")
+        return ()
+    out = []
+    for pid, slots in raw.items():
+        if pid == "samira" or pid not in plugin_slots:
+            errors.append(f"plugins.{pid}: plugin not installed")
+            continue
+        out.append((pid, _compile_slots(f"plugins.{pid}", slots, len(plugin_slots[pid]), errors)))
+    return tuple(out)
+
+def compile_tool_config(data):
+    """JSON dict -> ToolConfig. 고칠 수 없는 오류는 ConfigError, 필드 단위 오류는 errors에 모으고 그 필드만 무시"""
+    data = migrate_tool_config(data)
+    errors = []
+
+    def field(name, check, expected, convert=None):
+        v = data.get(name)
+        if v is None:
+            return None
+        if not check(v):
+            errors.append(f"{name}: expected {expected}, got {v!r}")
+            return None
+        return convert(v) if convert else v
+
+    profiles = set(MIXER_PROFILES) | {AUTO_MIXER_PROFILE}
+    return ToolConfig(
+        version=data["version"],
+        volume=field("volume", _is_number, "a number 0-100", lambda v: int(clamp(v, 0, 100))),
+        debug_window=field("debug_window", lambda v: isinstance(v, bool), "true/false"),
+        anchor_index=field("anchor_index", lambda v: _is_number(v) and v >= 0, "a non-negative index", int),
+        audio_profile=field("audio_profile", lambda v: v in profiles, " / ".join(sorted(profiles))),
+        normalize_loudness=field("normalize_loudness", lambda v: isinstance(v, bool), "true/false"),
+        profiler=field("profiler", lambda v: isinstance(v, bool), "true/false"),
+        watch_player=field("watch_player", lambda v: isinstance(v, str), "a Riot ID string", str.strip),
+        samira=_compile_slots("samira", data.get("samira"), len(samira_slots), errors),
+        penta=_compile_slots("penta", data.get("penta"), len(penta_slots), errors),
+        plugins=_compile_plugin_slots(data.get("plugins"), errors),
+        errors=tuple(errors),
+    )
 
-    # SFX 볼륨은 유저 볼륨 그대로 (원하면 여기서도 0.5 적용 가능)
-    snd.set_volume(clamp(volume_0_100, 0, 100) / 100.0)
+def _config_cache_path(abs_path):
+    """JSON 절대 경로 -> CONFIG_CACHE_DIR/<sha1>.cache"""
+    digest = hashlib.sha1(os.path.normcase(abs_path).encode("utf-8", "surrogatepass")).hexdigest()
+    return os.path.join(CONFIG_CACHE_DIR, digest + ".cache")
 
-    if duck:
-        _ducking = True
-        # 배경음악 볼륨 1/2
-        set_music_volume(volume_0_100 * 0.5)
+def _is_slot_group(v):
+    return isinstance(v, tuple) and all(
+        s is None or (isinstance(s, tuple) and len(s) == 3 and all(isinstance(x, str) for x in s)) for s in v)
 
-    # 기존 SFX 즉시 컷(원치 않으면 stop 제거)
+def _valid_cached_config(values):
+    """캐시에서 읽은 tuple이 to_tuple()이 만든 모양인지 (필드 수/타입). 아니면 캐시를 버리고 JSON을 다시 컴파일"""
+    if not isinstance(values, tuple) or len(values) != len(ToolConfig.__slots__):
+        return False
+    v = dict(zip(ToolConfig.__slots__, values))
+    opt = lambda x, t: x is None or (isinstance(x, t) and not (t is int and isinstance(x, bool)))
+    return (isinstance(v["version"], int) and opt(v["volume"], int) and opt(v["debug_window"], bool)
+            and opt(v["anchor_index"], int) and opt(v["audio_profile"], str)
+            and opt(v["normalize_loudness"], bool) and opt(v["profiler"], bool) and opt(v["watch_player"], str)
+            and _is_slot_group(v["samira"]) and _is_slot_group(v["penta"])
+            and isinstance(v["plugins"], tuple)
+            and all(isinstance(p, tuple) and len(p) == 2 and isinstance(p[0], str) and _is_slot_group(p[1])
+                    for p in v["plugins"])
+            and isinstance(v["errors"], tuple) and all(isinstance(e, str) for e in v["errors"]))
+
+def _read_config_cache(cache_path, abs_path, sig):
+    # marshal은 잘못되거나 악의적으로 만든 데이터에 안전하지 않음 (인터프리터가 죽을 수도 있음)
+    # -> 이 프로세스가 직접 쓴 사용자 로컬 캐시(CONFIG_CACHE_DIR)만 읽고, 읽은 뒤에도 모양을 검사
     try:
-        SFX_CHANNEL.stop()
-    except:
+        with open(cache_path, "rb") as f:
+            magic, fmt, cached_path, cached_sig, values = marshal.load(f)
+        if (magic == "samira-tool-config" and fmt == CONFIG_CACHE_FORMAT and cached_path == abs_path
+                and cached_sig == sig and _valid_cached_config(values)):
+            return ToolConfig.from_tuple(values)
+    except (OSError, EOFError, ValueError, TypeError):
         pass
+    return None
 
-    SFX_CHANNEL.play(snd)
+def _write_config_cache(cache_path, abs_path, sig, cfg):
+    tmp = cache_path + ".tmp"
+    try:
+        os.makedirs(CONFIG_CACHE_DIR, exist_ok=True)
+        with open(tmp, "wb") as f:
+            marshal.dump(("samira-tool-config", CONFIG_CACHE_FORMAT, abs_path, sig, cfg.to_tuple()), f)
+        os.replace(tmp, cache_path)
+    except OSError:
+        pass
 
-def update_ducking(volume_0_100):
-    """매 프레임 호출: SFX가 끝나면 배경음악 볼륨을 원상복귀"""
-    global _ducking
-    if _ducking and (not SFX_CHANNEL.get_busy()):
-        _ducking = False
-        set_music_volume(volume_0_100)
+def load_tool_config(path, sig=None):
+    """
+    JSON 설정 파일 -> ToolConfig (실패 시 None).
+    컴파일 결과를 사용자 로컬 CONFIG_CACHE_DIR에 (절대 경로 해시로) 저장하고,
+    JSON의 (mtime, size)와 설치된 플러그인(PLUGIN_CONFIG_SIG)이 그대로면 파싱/검증/경로 확인 없이 캐시를 씀
+    """
+    if sig is None:
+        try:
+            st = os.stat(path)
+        except OSError as e:
+            print("[ERROR] JSON 읽기 실패:", path, e)
+            return None
+        sig = (st.st_mtime_ns, st.st_size)
+    # 플러그인을 나중에 설치/제거하면 "plugin not installed"로 컴파일된 캐시는 무효
+    sig = tuple(sig) + (PLUGIN_CONFIG_SIG,)
+
+    abs_path = os.path.abspath(path)
+    cache_path = _config_cache_path(abs_path)
+    cfg = _read_config_cache(cache_path, abs_path, sig)
+    if cfg is not None:
+        return cfg
+
+    data = safe_read_json(path)
+    if data is None:
+        return None
+    try:
+        cfg = compile_tool_config(data)
+    except ConfigError as e:
+        print("[CONFIG ERROR]", path, e)
+        return None
+    for msg in cfg.errors:
+        print("[CONFIG WARN]", path, msg)
+    _write_config_cache(cache_path, abs_path, sig, cfg)
+    return cfg
+
+# =============================
+# Preset index (presets/ 감시)
+# =============================
+PRESET_DIR = "presets"
+PRESET_POLL_SEC = 1.0
+
+class PresetIndex:
+    """
+    ✅ presets/*.json 을 백그라운드 스레드에서 mtime/size 폴링으로 감시하고
+    파싱된 내용을 메모리에 유지 -> 클릭 시 디스크 읽기 없이 즉시 적용.
+    바뀐 파일만 다시 파싱하므로 수천 개여도 주기당 stat 비용만 듦.
+    """
+    def __init__(self, directory=PRESET_DIR, poll_sec=PRESET_POLL_SEC):
+        self.directory = directory
+        self.poll_sec = poll_sec
+        self.lock = threading.Lock()
+        self.entries = {}          # 파일명 -> entry dict
+        self.sorted_items = ()     # 이름순 스냅샷 (UI는 이것만 읽음)
+        self.version = 0
+        self.running = False
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._watch_main, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.running = False
+        self._wake.set()
+
+    def request_scan(self):
+        """다음 폴링 주기를 기다리지 않고 바로 스캔 (논블로킹)"""
+        self._wake.set()
+
+    def items(self):
+        with self.lock:
+            return self.sorted_items
+
+    def _watch_main(self):
+        while self.running:
+            try:
+                self.scan()
+            except Exception as e:
+                print("[PRESETS] scan 실패:", e)
+            self._wake.wait(self.poll_sec)
+            self._wake.clear()
+
+    def _load(self, fn, sig):
+        path = os.path.join(self.directory, fn)
+        # 검증/경로 확인까지 여기(백그라운드)서 끝냄. 바뀌지 않은 파일은 .cache에서 바로 읽음
+        config = load_tool_config(path, sig)
+        name = os.path.splitext(fn)[0]
+        return {
+            "name": name,
+            "path": path,
+            "sig": sig,
+            "config": config,
+            # 검색용 소문자 키 (파일이 바뀔 때만 다시 만듦)
+            "name_key": name.lower(),
+            "paths_key": "\n".join(config.sound_paths() if config else ()).lower(),
+        }
+
+    def scan(self):
+        os.makedirs(self.directory, exist_ok=True)
+        seen = {}
+        with os.scandir(self.directory) as it:
+            for de in it:
+                if not de.name.lower().endswith(".json") or not de.is_file():
+                    continue
+                try:
+                    st = de.stat()
+                except OSError:
+                    continue
+                seen[de.name] = (st.st_mtime_ns, st.st_size)
+
+        with self.lock:
+            changed = [fn for fn, sig in seen.items()
+                       if fn not in self.entries or self.entries[fn]["sig"] != sig]
+            removed = [fn for fn in self.entries if fn not in seen]
+        if not changed and not removed:
+            return False
+
+        # 파싱은 락 밖에서 (UI 스레드가 items()에서 기다리지 않도록)
+        loaded = {fn: self._load(fn, seen[fn]) for fn in changed}
+
+        with self.lock:
+            for fn in removed:
+                self.entries.pop(fn, None)
+            self.entries.update(loaded)
+            self.sorted_items = tuple(self.entries[fn] for fn in sorted(self.entries))
+            self.version += 1
+            count = len(self.sorted_items)
+
+        print("[PRESETS] found:", count, "changed:", len(changed), "removed:", len(removed))
+        wake_ui()
+        return True
+
+class PresetSearch:
+    """
+    프리셋 이름/사운드 경로 검색: 이름 prefix > 이름 substring > 경로 substring > 이름 fuzzy(부분 수열) 순.
+    ✅ 질의가 이전 질의를 확장한 경우(글자 추가) 이전 결과 안에서만 다시 찾음 -> 키 입력마다 1프레임 이내
+    """
+    def __init__(self):
+        self.query = ""
+        self.version = -1
+        self.results = ()
+
+    @staticmethod
+    def _rank(item, q, fuzzy):
+        name = item["name_key"]
+        if name.startswith(q):
+            return 0
+        if q in name:
+            return 1
+        if q in item["paths_key"]:
+            return 2
+        if fuzzy.search(name):
+            return 3
+        return None
+
+    def search(self, items, version, query):
+        q = query.strip().lower()
+        if not q:
+            self.query, self.version, self.results = "", version, tuple(items)
+            return self.results
+
+        if q == self.query and version == self.version:
+            return self.results
+
+        # 같은 인덱스 + 글자만 추가된 질의면 이전 결과가 후보 (모든 매칭 규칙이 단조적)
+        pool = self.results if (version == self.version and self.query and q.startswith(self.query)) else items
+
+        fuzzy = re.compile(".*?".join(map(re.escape, q)))
+        ranked = []
+        for item in pool:
+            r = self._rank(item, q, fuzzy)
+            if r is not None:
+                ranked.append((r, item["name_key"], item))
+        ranked.sort(key=lambda t: (t[0], t[1]))
+
+        self.query, self.version = q, version
+        self.results = tuple(t[2] for t in ranked)
+        return self.results
 
 # =============================
 # UI base
 # =============================
+UI_WAKE_EVENT = pygame.USEREVENT + 1
+
+def wake_ui():
+    """다른 스레드에서 UI에 보이는 상태를 바꿨을 때 idle 대기를 깨움"""
+    try:
+        pygame.event.post(pygame.event.Event(UI_WAKE_EVENT))
+    except Exception:
+        pass
+
 class UIElement:
     def __init__(self, rect):
         self.rect = pygame.Rect(rect)
         self.hover = False
         self.pressed = False
         self.enabled = True
+        # 내용(목록/경로 등)이 바뀔 때 올려서 render_key를 바꿈 -> dirty
+        self.version = 0
 
     def set_rect(self, rect):
         self.rect = pygame.Rect(rect)
 
+    def mark_dirty(self):
+        self.version += 1
+
+    def render_key(self):
+        """draw 결과를 결정하는 상태 모음. 지난 프레임과 같으면 다시 그릴 필요 없음"""
+        return (tuple(self.rect), self.version)
+
+    def is_animating(self):
+        """보간 중인 애니메이션이 있으면 True (메인 루프가 idle 대기로 내려가지 않음)"""
+        return False
+
     def hit_test(self, pos):
         return self.rect.collidepoint(pos)
 
@@ -303,15 +1463,32 @@ class Button(UIElement):
             self.target_color = self.base
 
         self.current_color = lerp_color(self.current_color, self.target_color, 0.25)
+        # int 보간은 목표에 완전히 닿지 않을 수 있으므로 가까우면 스냅 (애니메이션 종료 판정)
+        if max(abs(a - b) for a, b in zip(self.current_color, self.target_color)) < 4:
+            self.current_color = self.target_color
+
+    def render_key(self):
+        return (tuple(self.rect), self.text, self.current_color, self.hover and self.enabled)
+
+    def is_animating(self):
+        return self.current_color != self.target_color
 
     def draw(self, surf):
-        draw_shadow_card(surf, self.rect, self.current_color, radius=10, shadow_alpha=70)
-        if self.hover and self.enabled:
-            draw_round_rect(surf, self.rect, self.current_color, radius=10, border=1, border_color=THEME.stroke)
+        outlined = self.hover and self.enabled
+        key = ("button", self.rect.size, self.text, self.current_color, outlined)
+        size = (self.rect.w + SHADOW_PAD * 2, self.rect.h + SHADOW_PAD * 2)
+
+        def paint(img):
+            local = pygame.Rect(SHADOW_PAD, SHADOW_PAD, self.rect.w, self.rect.h)
+            draw_shadow_card(img, local, self.current_color, radius=10, shadow_alpha=70)
+            if outlined:
+                draw_round_rect(img, local, self.current_color, radius=10, border=1, border_color=THEME.stroke)
+
+            label = render_text(FONT_14, self.text, THEME.text)
+            img.blit(label, (local.centerx - label.get_width() // 2,
+                             local.centery - label.get_height() // 2))
 
-        label = FONT_14.render(self.text, True, THEME.text)
-        surf.blit(label, (self.rect.centerx - label.get_width() // 2,
-                          self.rect.centery - label.get_height() // 2))
+        draw_cached(surf, key, size, (self.rect.x - SHADOW_PAD, self.rect.y - SHADOW_PAD), paint)
 
 # =============================
 # Slider + clickable value input
@@ -392,27 +1569,56 @@ class Slider(UIElement):
         if self.on_change:
             self.on_change(self.value)
 
-    def draw(self, surf):
-        label = FONT_14.render(self.label, True, THEME.subtext)
-        surf.blit(label, (self.rect.x, self.rect.y))
+    def _render_static(self):
+        """값과 무관한 부분(라벨, 트랙, 입력 힌트)만 (rect 기준 -SHADOW_PAD 오프셋) 서피스 하나에 그림"""
+        w, h = self.rect.w, self.rect.h
+        img = pygame.Surface((w + SHADOW_PAD * 2, h + SHADOW_PAD * 2 + 20), pygame.SRCALPHA)
+        ox = oy = SHADOW_PAD
 
-        val_str = self.edit_text if self.editing else f"{self.value}"
-        val = FONT_14.render(val_str, True, THEME.text)
+        label = render_text(FONT_14, self.label, THEME.subtext)
+        img.blit(label, (ox, oy))
+
+        track = pygame.Rect(ox, oy + 26, w, 6)
+        draw_round_rect(img, track, THEME.stroke, radius=999)
+
+        if self.editing:
+            hint = render_text(FONT_12, "0~100 입력 후 Enter", THEME.subtext)
+            img.blit(hint, (ox, oy + 52))
+        return img
+
+    def _render_value(self, val_str):
+        """값 상자만 작은 서피스로 -> (서피스, rect 오른쪽 위 기준 value_rect 상대좌표)"""
+        val = render_text(FONT_14, val_str, THEME.text)
 
         padding = 8
         box_w = max(48, val.get_width() + padding * 2)
         box_h = 24
-        self.value_rect = pygame.Rect(self.rect.right - box_w, self.rect.y - 2, box_w, box_h)
+        img = pygame.Surface((box_w, box_h), pygame.SRCALPHA)
+        box = img.get_rect()
 
         box_color = lerp_color(THEME.card, THEME.accent, 0.18) if self.editing else THEME.card
-        draw_round_rect(surf, self.value_rect, box_color, radius=8, border=1, border_color=THEME.stroke)
+        draw_round_rect(img, box, box_color, radius=8, border=1, border_color=THEME.stroke)
 
-        surf.blit(val, (self.value_rect.centerx - val.get_width() // 2,
-                        self.value_rect.centery - val.get_height() // 2))
+        img.blit(val, (box.centerx - val.get_width() // 2,
+                       box.centery - val.get_height() // 2))
+        return img, pygame.Rect(self.rect.w - box_w, -2, box_w, box_h)
 
-        track = pygame.Rect(self.rect.x, self.rect.y + 26, self.rect.w, 6)
-        draw_round_rect(surf, track, THEME.stroke, radius=999)
+    def render_key(self):
+        return (tuple(self.rect), self.label, self.value, self.editing, self.edit_text)
+
+    def draw(self, surf):
+        # ✅ 캐시는 값과 무관한 배경 + 작은 값 상자만 (값마다 전체 서피스를 캐시하면 드래그 한 번에 수십 MB)
+        #    채움 막대/손잡이는 단색 도형이라 매 프레임 직접 그림
+        val_str = self.edit_text if self.editing else f"{self.value}"
+        img = UI_CACHE.get(("slider", self.rect.size, self.label, self.editing), self._render_static)
+        box, rel_value_rect = UI_CACHE.get(("slider_value", self.rect.w, self.editing, val_str),
+                                           lambda: self._render_value(val_str))
 
+        self.value_rect = rel_value_rect.move(self.rect.x, self.rect.y)
+        surf.blit(img, (self.rect.x - SHADOW_PAD, self.rect.y - SHADOW_PAD))
+        surf.blit(box, self.value_rect)
+
+        track = pygame.Rect(self.rect.x, self.rect.y + 26, self.rect.w, 6)
         t = (self.value - self.vmin) / (self.vmax - self.vmin)
         fill_w = int(track.w * t)
         fill_rect = pygame.Rect(track.x, track.y, fill_w, track.h)
@@ -422,10 +1628,6 @@ class Slider(UIElement):
         pygame.draw.circle(surf, (240, 242, 248), (hx, track.centery), 9)
         pygame.draw.circle(surf, THEME.stroke, (hx, track.centery), 9, 1)
 
-        if self.editing:
-            hint = FONT_12.render("0~100 입력 후 Enter", True, THEME.subtext)
-            surf.blit(hint, (self.rect.x, self.rect.y + 52))
-
 # =============================
 # Select box
 # =============================
@@ -482,20 +1684,30 @@ class Select(UIElement):
             if self.rect.collidepoint(event.pos):
                 self.opened = not self.opened
 
-    def draw(self, surf):
-        label = FONT_14.render(self.label, True, THEME.subtext)
-        surf.blit(label, (self.rect.x, self.rect.y))
+    def render_key(self):
+        scroll = int(self.scroll_y) if self.opened else 0
+        return (tuple(self.rect), self.label, len(self.options), self.selected, self.opened, scroll)
+
+    def _paint_closed(self, img, sel_txt):
+        label = render_text(FONT_14, self.label, THEME.subtext)
+        img.blit(label, (0, 0))
 
+        box_rect = pygame.Rect(0, 18, self.rect.w, self.rect.h - 20)
+        draw_round_rect(img, box_rect, THEME.card, radius=10, border=1, border_color=THEME.stroke)
+
+        val = render_text(FONT_14, sel_txt, THEME.text)
+        img.blit(val, (box_rect.x + 12, box_rect.centery - val.get_height() // 2))
+
+        arrow = render_text(FONT_14, "▼" if not self.opened else "▲", THEME.subtext)
+        img.blit(arrow, (box_rect.right - arrow.get_width() - 12, box_rect.centery - arrow.get_height() // 2))
+
+    def draw(self, surf):
         box_h = self.rect.h - 20
         box_rect = pygame.Rect(self.rect.x, self.rect.y + 18, self.rect.w, box_h)
-        draw_round_rect(surf, box_rect, THEME.card, radius=10, border=1, border_color=THEME.stroke)
 
         sel_txt = self.options[self.selected] if self.options else ""
-        val = FONT_14.render(sel_txt, True, THEME.text)
-        surf.blit(val, (box_rect.x + 12, box_rect.centery - val.get_height() // 2))
-
-        arrow = FONT_14.render("▼" if not self.opened else "▲", True, THEME.subtext)
-        surf.blit(arrow, (box_rect.right - arrow.get_width() - 12, box_rect.centery - arrow.get_height() // 2))
+        key = ("select", self.rect.size, self.label, sel_txt, self.opened)
+        draw_cached(surf, key, self.rect.size, self.rect.topleft, lambda img: self._paint_closed(img, sel_txt))
 
         self.option_rects = []
         if self.opened and self.options:
@@ -514,7 +1726,7 @@ class Select(UIElement):
                 orect = pygame.Rect(box_rect.x, opt_y - int(self.scroll_y), box_rect.w, box_h)
                 bg = lerp_color(THEME.card, THEME.accent, self.highlight_mix) if i == self.selected else THEME.card
                 draw_round_rect(surf, orect, bg, radius=8, border=0, border_color=THEME.stroke)
-                t = FONT_14.render(opt, True, THEME.text)
+                t = render_text(FONT_14, opt, THEME.text)
                 surf.blit(t, (orect.x + 12, orect.centery - t.get_height() // 2))
                 self.option_rects.append(orect)
                 opt_y += box_h + 6
@@ -522,63 +1734,137 @@ class Select(UIElement):
             surf.set_clip(prev_clip)
 
 # =============================
-# SoundSlotList
+# TextBox (한 줄 입력)
 # =============================
-class SoundSlotList(UIElement):
-    def __init__(self, rect, get_volume_func, on_play_click=None):
+class TextBox(UIElement):
+    def __init__(self, rect, placeholder="", on_change=None, max_len=64):
         super().__init__(rect)
-        self.get_volume = get_volume_func
-        self.on_play_click = on_play_click
-
-        self.scroll_y = 0
-        self.scroll_target = 0
-        self.slots = []
-        self._hit_play = []
-        self._hit_pick = []
-        self.header_title = "SOUND SLOTS"
+        self.placeholder = placeholder
+        self.on_change = on_change
+        self.max_len = max_len
+        self.text = ""
+        self.focused = False
 
-    def set_slots(self, slots, header_title="SOUND SLOTS"):
-        self.slots = slots
-        self.header_title = header_title
-        self.scroll_y = 0
-        self.scroll_target = 0
+    def set_text(self, text):
+        if text == self.text:
+            return
+        self.text = text[:self.max_len]
+        if self.on_change:
+            self.on_change(self.text)
 
     def handle_event(self, event):
         if not self.enabled:
             return
 
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            self.focused = self.hit_test(event.pos)
+            return
+
+        if not self.focused:
+            return
+
+        # TEXTINPUT은 IME(한글) 조합이 끝난 글자까지 들어옴
+        if event.type == pygame.TEXTINPUT:
+            self.set_text(self.text + event.text)
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_BACKSPACE:
+                self.set_text(self.text[:-1])
+            elif event.key == pygame.K_ESCAPE:
+                if self.text:
+                    self.set_text("")
+                else:
+                    self.focused = False
+            elif event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
+                self.focused = False
+
+    def render_key(self):
+        return (tuple(self.rect), self.text, self.focused)
+
+    def draw(self, surf):
+        border = THEME.accent if self.focused else THEME.stroke
+        draw_round_rect(surf, self.rect, THEME.card, radius=8, border=1, border_color=border)
+
+        inner = self.rect.inflate(-20, 0)
+        if self.text:
+            t = render_text(FONT_14, self.text + ("|" if self.focused else ""), THEME.text)
+        else:
+            t = render_text(FONT_14, "|" if self.focused else self.placeholder, THEME.subtext)
+
+        prev_clip = surf.get_clip()
+        surf.set_clip(inner.clip(prev_clip) if prev_clip else inner)
+        # 넘치면 끝부분이 보이도록 오른쪽 정렬
+        x = inner.x if t.get_width() <= inner.w else inner.right - t.get_width()
+        surf.blit(t, (x, inner.centery - t.get_height() // 2))
+        surf.set_clip(prev_clip)
+
+# =============================
+# ScrollList (SoundSlotList / PresetList 공통)
+# =============================
+class ScrollList(UIElement):
+    """
+    고정 높이 카드 목록 + 휠 스크롤.
+    ✅ 가상화: 보이는 행만 그리고, 클릭 위치는 스크롤 오프셋에서 행 번호를 바로 계산 (O(1))
+    """
+    ROW_H = 64
+    ROW_STEP = 74
+
+    def __init__(self, rect):
+        super().__init__(rect)
+        self.scroll_y = 0
+        self.scroll_target = 0
+
+    def item_count(self):
+        return 0
+
+    def list_area(self):
+        return pygame.Rect(self.rect.x + 16, self.rect.y + 70, self.rect.w - 32, self.rect.h - 86)
+
+    def row_rect(self, i, area):
+        return pygame.Rect(area.x, area.y - int(self.scroll_y) + i * self.ROW_STEP, area.w, self.ROW_H)
+
+    def visible_range(self, area):
+        top = int(self.scroll_y)
+        first = max(0, top // self.ROW_STEP)
+        last = min(self.item_count(), (top + area.h) // self.ROW_STEP + 1)
+        return range(first, last)
+
+    def row_at(self, pos):
+        """pos 아래 카드의 (행 번호, 카드 rect). 카드 사이 간격/목록 밖이면 None"""
+        area = self.list_area()
+        if not area.collidepoint(pos):
+            return None
+        offset = pos[1] - area.y + int(self.scroll_y)
+        i, within = divmod(offset, self.ROW_STEP)
+        if within >= self.ROW_H or i >= self.item_count():
+            return None
+        return i, self.row_rect(i, area)
+
+    def handle_wheel(self, event):
         if event.type == pygame.MOUSEWHEEL:
             mx, my = pygame.mouse.get_pos()
             if self.rect.collidepoint((mx, my)):
                 self.scroll_target += (-event.y) * 60
                 self._clamp_scroll()
 
-        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            if not self.rect.collidepoint(event.pos):
-                return
-
-            for i in range(len(self.slots)):
-                # ▶ 미리듣기: SFX 채널로 재생 + 덕킹
-                if i < len(self._hit_play) and self._hit_play[i].collidepoint(event.pos):
-                    slot = self.slots[i]
-                    if self.on_play_click:
-                        self.on_play_click(slot)
-                    else:
-                        path = slot.get("path", "")
-                        play_sfx_one_shot(path, self.get_volume(), duck=True)
-                    return
-
-                if i < len(self._hit_pick) and self._hit_pick[i].collidepoint(event.pos):
-                    picked = pick_audio_file()
-                    if picked:
-                        self.slots[i]["path"] = picked
-                        print("[SET]", self.slots[i]["title"], "=>", picked)
-                    return
+    def reset_scroll(self):
+        self.scroll_y = 0
+        self.scroll_target = 0
 
     def update(self, dt):
         self.scroll_y += (self.scroll_target - self.scroll_y) * 0.25
+        if abs(self.scroll_target - self.scroll_y) < 0.5:
+            self.scroll_y = self.scroll_target
         self._clamp_scroll()
 
+    def render_key(self):
+        return (tuple(self.rect), self.version, int(self.scroll_y))
+
+    def is_animating(self):
+        return self.scroll_y != self.scroll_target
+
+    def _content_height(self):
+        return self.item_count() * self.ROW_STEP
+
     def _clamp_scroll(self):
         content_h = self._content_height()
         view_h = self.rect.h - 70
@@ -586,158 +1872,232 @@ class SoundSlotList(UIElement):
         self.scroll_target = clamp(self.scroll_target, 0, max_scroll)
         self.scroll_y = clamp(self.scroll_y, 0, max_scroll)
 
-    def _content_height(self):
-        return len(self.slots) * 74
+    def draw_rows(self, surf, area, draw_row):
+        prev_clip = surf.get_clip()
+        surf.set_clip(area)
+        for i in self.visible_range(area):
+            draw_row(surf, i, self.row_rect(i, area))
+        surf.set_clip(prev_clip)
 
-    def draw(self, surf):
-        draw_shadow_card(surf, self.rect, THEME.panel, radius=16, shadow_alpha=90)
+# =============================
+# SoundSlotList
+# =============================
+class SoundSlotList(ScrollList):
+    def __init__(self, rect, get_volume_func, on_play_click=None):
+        super().__init__(rect)
+        self.get_volume = get_volume_func
+        self.on_play_click = on_play_click
 
-        title = FONT_16.render(self.header_title, True, THEME.text)
-        surf.blit(title, (self.rect.x + 16, self.rect.y + 16))
+        self.slots = []
+        self.header_title = "SOUND SLOTS"
 
-        hint = FONT_12.render("휠로 스크롤 / ▶ 미리듣기(SFX) / … 파일 지정", True, THEME.subtext)
-        surf.blit(hint, (self.rect.x + 16, self.rect.y + 40))
+    def item_count(self):
+        return len(self.slots)
 
-        list_area = pygame.Rect(self.rect.x + 16, self.rect.y + 70, self.rect.w - 32, self.rect.h - 86)
+    def set_slots(self, slots, header_title="SOUND SLOTS"):
+        self.slots = slots
+        self.header_title = header_title
+        self.reset_scroll()
+        self.mark_dirty()
 
-        prev_clip = surf.get_clip()
-        surf.set_clip(list_area)
+    def handle_event(self, event):
+        if not self.enabled:
+            return
 
-        self._hit_play = []
-        self._hit_pick = []
+        self.handle_wheel(event)
 
-        y = list_area.y - int(self.scroll_y)
-        for slot in self.slots:
-            card = pygame.Rect(list_area.x, y, list_area.w, 64)
-            draw_round_rect(surf, card, THEME.card, radius=12, border=1, border_color=THEME.stroke)
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            hit = self.row_at(event.pos)
+            if hit is None:
+                return
+            i, card = hit
+            btn_play, btn_pick = self._row_buttons(card)
+
+            # ▶ 미리듣기: SFX 채널로 재생 + 덕킹
+            if btn_play.collidepoint(event.pos):
+                slot = self.slots[i]
+                if self.on_play_click:
+                    self.on_play_click(slot)
+                else:
+                    path = slot.get("path", "")
+                    play_sfx_one_shot(path, self.get_volume(), duck=True)
+                return
 
-            title_txt = FONT_14.render(slot["title"], True, THEME.text)
-            surf.blit(title_txt, (card.x + 12, card.y + 10))
+            if btn_pick.collidepoint(event.pos):
+                if dialogs.busy():
+                    return
+                slot = self.slots[i]
 
-            path = slot.get("path", "")
-            if not path:
-                path_disp = "(미지정)"
-                path_color = lerp_color(THEME.subtext, THEME.card, 0.25)
-            else:
-                path_disp = path
-                if len(path_disp) > 60:
-                    path_disp = "..." + path_disp[-57:]
-                path_color = THEME.subtext
+                def on_picked(picked):
+                    if picked:
+                        slot["path"] = picked
+                        self.mark_dirty()
+                        print("[SET]", slot["title"], "=>", picked)
+                        schedule_loudness_analysis([picked])
+                        sync_sound_assets()
 
-            path_txt = FONT_12.render(path_disp, True, path_color)
-            surf.blit(path_txt, (card.x + 12, card.y + 34))
+                pick_audio_file(on_picked)
+                return
 
-            btn_w = 44
-            gap = 10
-            btn_play = pygame.Rect(card.right - (btn_w * 2 + gap) - 12, card.y + 14, btn_w, 36)
-            btn_pick = pygame.Rect(card.right - btn_w - 12, card.y + 14, btn_w, 36)
+    def _paint_row(self, img, slot_title, path):
+        card = pygame.Rect(0, 0, img.get_width(), self.ROW_H)
+        draw_round_rect(img, card, THEME.card, radius=12, border=1, border_color=THEME.stroke)
 
-            draw_round_rect(surf, btn_play, lerp_color(THEME.card, THEME.accent, 0.25), radius=10, border=1, border_color=THEME.stroke)
-            draw_round_rect(surf, btn_pick, THEME.card, radius=10, border=1, border_color=THEME.stroke)
+        title_txt = render_text(FONT_14, slot_title, THEME.text)
+        img.blit(title_txt, (card.x + 12, card.y + 10))
 
-            t1 = FONT_14.render("▶", True, THEME.text)
-            surf.blit(t1, (btn_play.centerx - t1.get_width() // 2, btn_play.centery - t1.get_height() // 2))
+        if not path:
+            path_disp = "(미지정)"
+            path_color = lerp_color(THEME.subtext, THEME.card, 0.25)
+        else:
+            path_disp = truncate_path(path)
+            path_color = THEME.subtext
 
-            t2 = FONT_14.render("…", True, THEME.text)
-            surf.blit(t2, (btn_pick.centerx - t2.get_width() // 2, btn_pick.centery - t2.get_height() // 2))
+        path_txt = render_text(FONT_12, path_disp, path_color)
+        img.blit(path_txt, (card.x + 12, card.y + 34))
 
-            self._hit_play.append(btn_play)
-            self._hit_pick.append(btn_pick)
+        btn_play, btn_pick = self._row_buttons(card)
+        draw_round_rect(img, btn_play, lerp_color(THEME.card, THEME.accent, 0.25), radius=10, border=1, border_color=THEME.stroke)
+        draw_round_rect(img, btn_pick, THEME.card, radius=10, border=1, border_color=THEME.stroke)
 
-            y += 74
+        t1 = render_text(FONT_14, "▶", THEME.text)
+        img.blit(t1, (btn_play.centerx - t1.get_width() // 2, btn_play.centery - t1.get_height() // 2))
 
-        surf.set_clip(prev_clip)
+        t2 = render_text(FONT_14, "…", THEME.text)
+        img.blit(t2, (btn_pick.centerx - t2.get_width() // 2, btn_pick.centery - t2.get_height() // 2))
+
+    @staticmethod
+    def _row_buttons(card):
+        btn_w = 44
+        gap = 10
+        btn_play = pygame.Rect(card.right - (btn_w * 2 + gap) - 12, card.y + 14, btn_w, 36)
+        btn_pick = pygame.Rect(card.right - btn_w - 12, card.y + 14, btn_w, 36)
+        return btn_play, btn_pick
+
+    def _draw_row(self, surf, i, card):
+        slot = self.slots[i]
+        slot_title = slot["title"]
+        path = slot.get("path", "")
+        key = ("slot_row", card.w, slot_title, path)
+        draw_cached(surf, key, card.size, card.topleft, lambda img: self._paint_row(img, slot_title, path))
+
+    def draw(self, surf):
+        draw_panel(surf, self.rect, self.header_title, "휠로 스크롤 / ▶ 미리듣기(SFX) / … 파일 지정")
+        self.draw_rows(surf, self.list_area(), self._draw_row)
 
 # =============================
 # PresetList
 # =============================
-class PresetList(UIElement):
-    def __init__(self, rect, apply_preset_func):
+class PresetList(ScrollList):
+    def __init__(self, rect, apply_preset_func, index):
         super().__init__(rect)
         self.apply_preset = apply_preset_func
-        self.scroll_y = 0
-        self.scroll_target = 0
-        self.items = []
-        self._hit_items = []
+        self.index = index
+        self.items = ()
+        self.total = 0
+        self._index_version = -1
+        self.search = PresetSearch()
+        self.filter_box = TextBox(self._filter_rect(), placeholder="검색 (이름 / 사운드 경로)",
+                                  on_change=self._on_filter_changed)
+
+    def _filter_rect(self):
+        w = min(280, max(120, self.rect.w // 3))
+        return pygame.Rect(self.rect.right - 16 - w, self.rect.y + 14, w, 30)
+
+    def set_rect(self, rect):
+        super().set_rect(rect)
+        self.filter_box.set_rect(self._filter_rect())
+
+    def item_count(self):
+        return len(self.items)
+
+    def _on_filter_changed(self, text):
+        self._refilter()
+        self.reset_scroll()
+
+    def _refilter(self):
+        all_items = self.index.items()
+        self.total = len(all_items)
+        self.items = self.search.search(all_items, self._index_version, self.filter_box.text)
+        self._clamp_scroll()
+        self.mark_dirty()
 
     def reload(self):
-        os.makedirs("presets", exist_ok=True)
-        files = [fn for fn in os.listdir("presets") if fn.lower().endswith(".json")]
-        files.sort()
-        self.items = [{"name": os.path.splitext(fn)[0], "path": os.path.join("presets", fn)} for fn in files]
-        self.scroll_y = 0
-        self.scroll_target = 0
-        print("[PRESETS] found:", len(self.items))
+        """목록을 처음부터 다시 보여줌. 실제 디렉터리 스캔은 PresetIndex 스레드가 함"""
+        self.index.request_scan()
+        self._sync()
+        self.reset_scroll()
+        self.mark_dirty()
+
+    def _sync(self):
+        if self.index.version == self._index_version:
+            return
+        self._index_version = self.index.version
+        self._refilter()
+
+    def render_key(self):
+        return super().render_key() + self.filter_box.render_key()
+
+    def update(self, dt):
+        # 외부에서 파일이 추가/수정/삭제되면 다음 프레임에 반영
+        self._sync()
+        super().update(dt)
 
     def handle_event(self, event):
         if not self.enabled:
             return
 
-        if event.type == pygame.MOUSEWHEEL:
-            mx, my = pygame.mouse.get_pos()
-            if self.rect.collidepoint((mx, my)):
-                self.scroll_target += (-event.y) * 60
-                self._clamp_scroll()
+        self.handle_wheel(event)
+        self.filter_box.handle_event(event)
 
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            if not self.rect.collidepoint(event.pos):
+            hit = self.row_at(event.pos)
+            if hit is None:
                 return
-            for i in range(len(self._hit_items)):
-                if self._hit_items[i].collidepoint(event.pos):
-                    item = self.items[i]
-                    data = safe_read_json(item["path"])
-                    if data:
-                        self.apply_preset(data, preset_name=item["name"])
-                    return
-
-    def update(self, dt):
-        self.scroll_y += (self.scroll_target - self.scroll_y) * 0.25
-        self._clamp_scroll()
-
-    def _content_height(self):
-        return len(self.items) * 74
+            item = self.items[hit[0]]
+            # 이미 컴파일된 설정으로 즉시 적용 (디스크 I/O / 재검증 없음)
+            if item["config"] is not None:
+                self.apply_preset(item["config"], preset_name=item["name"])
+            else:
+                print("[WARN] 프리셋 JSON이 올바르지 않음:", item["path"])
 
-    def _clamp_scroll(self):
-        content_h = self._content_height()
-        view_h = self.rect.h - 70
-        max_scroll = max(0, content_h - view_h)
-        self.scroll_target = clamp(self.scroll_target, 0, max_scroll)
-        self.scroll_y = clamp(self.scroll_y, 0, max_scroll)
+    @staticmethod
+    def _paint_row(img, name, path, valid):
+        card = pygame.Rect(0, 0, img.get_width(), img.get_height())
+        draw_round_rect(img, card, THEME.card, radius=12, border=1, border_color=THEME.stroke)
 
-    def draw(self, surf):
-        draw_shadow_card(surf, self.rect, THEME.panel, radius=16, shadow_alpha=90)
+        name_txt = render_text(FONT_14, name, THEME.text)
+        img.blit(name_txt, (card.x + 12, card.y + 12))
 
-        title = FONT_16.render("PRESETS", True, THEME.text)
-        surf.blit(title, (self.rect.x + 16, self.rect.y + 16))
+        path_disp = path if valid else f"{path}  (JSON 오류)"
+        path_txt = render_text(FONT_12, path_disp, THEME.subtext if valid else THEME.danger)
+        img.blit(path_txt, (card.x + 12, card.y + 36))
 
-        hint = FONT_12.render("presets/*.json 목록 / 클릭하면 적용 / 휠 스크롤", True, THEME.subtext)
-        surf.blit(hint, (self.rect.x + 16, self.rect.y + 40))
+    def _draw_row(self, surf, i, card):
+        item = self.items[i]
+        name, path, valid = item["name"], item["path"], item["config"] is not None
+        key = ("preset_row", card.w, name, path, valid)
+        draw_cached(surf, key, card.size, card.topleft, lambda img: self._paint_row(img, name, path, valid))
 
-        list_area = pygame.Rect(self.rect.x + 16, self.rect.y + 70, self.rect.w - 32, self.rect.h - 86)
-        prev_clip = surf.get_clip()
-        surf.set_clip(list_area)
+    def draw(self, surf):
+        draw_panel(surf, self.rect, "PRESETS", "presets/*.json 목록 / 클릭하면 적용 / 휠 스크롤")
+        self.filter_box.draw(surf)
 
-        self._hit_items = []
-        y = list_area.y - int(self.scroll_y)
+        if self.filter_box.text:
+            count = render_text(FONT_12, f"{len(self.items)} / {self.total}", THEME.subtext)
+            surf.blit(count, (self.filter_box.rect.x - count.get_width() - 10,
+                              self.filter_box.rect.centery - count.get_height() // 2))
 
+        area = self.list_area()
         if not self.items:
-            empty = FONT_14.render("presets 폴더에 JSON이 없습니다.", True, THEME.subtext)
-            surf.blit(empty, (list_area.x, list_area.y))
+            prev_clip = surf.get_clip()
+            surf.set_clip(area)
+            msg = "검색 결과가 없습니다." if self.total else "presets 폴더에 JSON이 없습니다."
+            empty = render_text(FONT_14, msg, THEME.subtext)
+            surf.blit(empty, (area.x, area.y))
+            surf.set_clip(prev_clip)
         else:
-            for item in self.items:
-                card = pygame.Rect(list_area.x, y, list_area.w, 64)
-                draw_round_rect(surf, card, THEME.card, radius=12, border=1, border_color=THEME.stroke)
-
-                name_txt = FONT_14.render(item["name"], True, THEME.text)
-                surf.blit(name_txt, (card.x + 12, card.y + 12))
-
-                path_txt = FONT_12.render(item["path"], True, THEME.subtext)
-                surf.blit(path_txt, (card.x + 12, card.y + 36))
-
-                self._hit_items.append(card)
-                y += 74
-
-        surf.set_clip(prev_clip)
+            self.draw_rows(surf, area, self._draw_row)
 
 # =============================
 # Detection thread (OpenCV + MSS)
@@ -784,12 +2144,176 @@ anchor_presets = [
     {"label": "3840 x 2160", "anchor": (1920, 2002), "resolution": (3840, 2160)},
 ]
 
+# ✅ learn_profile.py로 내 화면에서 학습한 ROI/템플릿 프로필 (roi_profiles/<이름>/profile.json)
+# 앵커 목록 뒤에 붙음 -> 기본 프리셋 번호(anchor_index)는 그대로.
+# 선택하면 학습한 ROI 크기 + 원본 크기 템플릿으로 1:1 매칭 (resize / TEMPLATE_SCALE_OFFSETS 없음)
+# 프로필은 학습한 플러그인(기본 사미라)용 -> 다른 플러그인이 감지 중이면 해상도 기준 scale로 동작
+ROI_PROFILE_DIR = "roi_profiles"
+ROI_PROFILE_VERSION = 1
+
+def load_roi_profiles(directory=ROI_PROFILE_DIR):
+    profiles = []
+    if not os.path.isdir(directory):
+        return profiles
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name, "profile.json")
+        if not os.path.isfile(path):
+            continue
+        data = safe_read_json(path)
+        try:
+            if data.get("version") != ROI_PROFILE_VERSION:
+                raise ValueError(f"unsupported version {data.get('version')!r}")
+            rw, rh = (int(v) for v in data["resolution"])
+            ax, ay = (int(v) for v in data["anchor"])
+            roi_w, roi_h = (int(v) for v in data["roi"])
+            templates = {g: [os.path.join(directory, name, f) for f in files]
+                         for g, files in data["templates"].items() if g in GRADE_TO_IDX and files}
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            print("[ROI PROFILE] 무시:", path, e)
+            continue
+        profiles.append({
+            "label": f"{data.get('name', name)} ({rw} x {rh}, 학습)",
+            "plugin": data.get("plugin", "samira"),
+            "anchor": (ax, ay),
+            "resolution": (rw, rh),
+            "roi": (roi_w, roi_h),
+            "templates": templates,
+        })
+    return profiles
+
+anchor_presets.extend(load_roi_profiles())
+
 anchor_x, anchor_y = anchor_presets[0]["anchor"]
 anchor_select = None
 ROI_W_BASE, ROI_H_BASE = 90, 90
 ROI_W, ROI_H = ROI_W_BASE, ROI_H_BASE
 TEMPLATE_BASE_RESOLUTION = (3440, 1440)
 TEMPLATE_SCALE_OFFSETS = [0.97, 1.0, 1.03]
+# detect_grade_fn 최고 점수가 이보다 낮으면 raw 등급 "None"
+SCORE_THRESHOLD = 0.55
+
+# =============================
+# Champion plugins (plugins/<id>/plugin.json)
+# =============================
+# 챔피언(또는 HUD 표시) 하나의 감지 설정 묶음: 템플릿 / ROI 크기·앵커 오프셋 / 등급 사다리 / 점수 기준 / 사운드 슬롯.
+# 사미라는 내장 플러그인 (위 TEMPLATES / GRADE_ORDER / ROI_W_BASE / SCORE_THRESHOLD).
+# 시작 시에는 manifest JSON만 읽고, 템플릿 디코딩은 그 챔피언이 감지 대상이 됐을 때만 (activate_plugin)
+#
+# {
+#   "version": 1, "id": "kindred", "name": "Kindred", "champions": ["Kindred", "킨드레드"],
+#   "ladder": ["None", "1", "2", "3"],            # 첫 칸은 항상 "None", 뒤로 갈수록 높은 단계
+#   "templates": {"1": ["1.png"], "2": ["2.png"], "3": ["3.png"], "None": ["none.png"]},   # 플러그인 폴더 기준
+#   "template_resolution": [3440, 1440],          # 템플릿을 잘라 온 해상도 (앵커 프리셋 scale 기준)
+#   "roi": [90, 90], "anchor_offset": [0, 0],     # template_resolution 픽셀 기준, 앵커 프리셋에 더함
+#   "score_threshold": 0.55, "top_guard_sec": 0,  # 최고 단계 -> None 보호 시간 (사미라 S: 6초)
+#   "slots": ["3", "2", "1"],                     # 사운드 슬롯 순서 (단계 이름)
+#   "penta": true                                 # 이 챔피언일 때 펜타킬 사운드 사용
+# }
+PLUGIN_DIR = "plugins"
+RAW_CHAMPION_PREFIX = "game_character_displayname_"
+PLUGIN_VERSION = 1
+
+class ChampionPlugin:
+    __slots__ = ("id", "name", "champions", "ladder", "grade_idx", "templates", "template_resolution",
+                 "roi", "anchor_offset", "score_threshold", "top_guard_sec", "slots", "slot_idx", "penta")
+
+    def __init__(self, id, name, champions, ladder, templates, template_resolution=TEMPLATE_BASE_RESOLUTION,
+                 roi=(ROI_W_BASE, ROI_H_BASE), anchor_offset=(0, 0), score_threshold=SCORE_THRESHOLD,
+                 top_guard_sec=0.0, slots=None, penta=True):
+        self.id = id
+        self.name = name
+        self.champions = tuple(champions)
+        self.ladder = tuple(ladder)
+        self.grade_idx = {g: i for i, g in enumerate(self.ladder)}
+        self.templates = templates
+        self.template_resolution = tuple(template_resolution)
+        self.roi = tuple(roi)
+        self.anchor_offset = tuple(anchor_offset)
+        self.score_threshold = score_threshold
+        self.top_guard_sec = top_guard_sec
+        self.slots = tuple(slots) if slots else tuple(reversed(self.ladder[1:]))
+        self.slot_idx = {g: i for i, g in enumerate(self.slots)}
+        self.penta = penta
+
+    def matches(self, player):
+        """
+        allPlayers 항목이 이 플러그인의 챔피언인지. 부분 문자열이 아니라 정확히 같은 이름만 ("Vi" != "Viego").
+        rawChampionName = "game_character_displayname_<내부 이름>" (로캘과 무관), championName = 표시 이름
+        """
+        raw = player.get("rawChampionName", "")
+        if isinstance(raw, str) and raw.startswith(RAW_CHAMPION_PREFIX) and raw[len(RAW_CHAMPION_PREFIX):] in self.champions:
+            return True
+        return player.get("championName", "") in self.champions
+
+    @property
+    def slot_header(self):
+        return f"{self.name.upper()} ({self.ladder[-1]}~{self.ladder[1]})"
+
+SAMIRA_PLUGIN = ChampionPlugin(
+    id="samira", name="Samira", champions=("Samira", "사미라"),
+    ladder=GRADE_ORDER, templates=TEMPLATES, top_guard_sec=6.0,
+    slots=("S", "A", "B", "C", "D", "E"),
+)
+
+def _load_plugin(directory, data):
+    if data.get("version") != PLUGIN_VERSION:
+        raise ValueError(f"unsupported version {data.get('version')!r}")
+    ladder = [str(g) for g in data["ladder"]]
+    if len(ladder) < 2 or ladder[0] != "None" or len(set(ladder)) != len(ladder):
+        raise ValueError("ladder must start with \"None\" and have unique grades")
+    templates = {}
+    for grade, files in data["templates"].items():
+        if grade not in ladder:
+            raise ValueError(f"template grade {grade!r} is not in the ladder")
+        templates[grade] = [os.path.join(directory, f) for f in files]
+    slots = [str(g) for g in data.get("slots") or []]
+    if any(g not in ladder[1:] for g in slots):
+        raise ValueError("slots must be ladder grades (except None)")
+    return ChampionPlugin(
+        id=str(data["id"]), name=str(data.get("name", data["id"])),
+        champions=[str(c) for c in data["champions"]], ladder=ladder, templates=templates,
+        template_resolution=[int(v) for v in data.get("template_resolution", TEMPLATE_BASE_RESOLUTION)],
+        roi=[int(v) for v in data.get("roi", (ROI_W_BASE, ROI_H_BASE))],
+        anchor_offset=[int(v) for v in data.get("anchor_offset", (0, 0))],
+        score_threshold=float(data.get("score_threshold", SCORE_THRESHOLD)),
+        top_guard_sec=float(data.get("top_guard_sec", 0.0)),
+        slots=slots, penta=bool(data.get("penta", True)),
+    )
+
+def load_plugins(directory=PLUGIN_DIR):
+    """내장 사미라 + plugins/*/plugin.json (같은 id면 폴더 쪽이 내장을 대체)"""
+    plugins = {SAMIRA_PLUGIN.id: SAMIRA_PLUGIN}
+    if not os.path.isdir(directory):
+        return list(plugins.values())
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name, "plugin.json")
+        if not os.path.isfile(path):
+            continue
+        try:
+            plugin = _load_plugin(os.path.join(directory, name), safe_read_json(path))
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            print("[PLUGIN] 무시:", path, e)
+            continue
+        if plugin.id == SAMIRA_PLUGIN.id and plugin.slots != SAMIRA_PLUGIN.slots:
+            # 설정 파일의 "samira" 슬롯 6칸과 맞아야 함
+            print("[PLUGIN] 무시:", path, "samira plugin must keep slots", SAMIRA_PLUGIN.slots)
+            continue
+        plugins[plugin.id] = plugin
+        print("[PLUGIN]", plugin.id, plugin.champions, plugin.ladder)
+    return list(plugins.values())
+
+PLUGINS = load_plugins()
+PLUGINS_BY_ID = {p.id: p for p in PLUGINS}
+# 설정 컴파일 결과("plugins" 슬롯)가 설치된 플러그인에 따라 달라지므로 설정 캐시 서명에 포함
+PLUGIN_CONFIG_SIG = tuple((p.id, p.slots) for p in PLUGINS)
+# 감지 파이프라인이 지금 쓰는 플러그인 (템플릿/ROI/사다리). 시작은 사미라 -> 기존과 같은 시작 경로
+current_plugin = PLUGINS_BY_ID["samira"]
+
+def find_plugin(player):
+    for plugin in PLUGINS:
+        if plugin.matches(player):
+            return plugin
+    return None
 
 def compute_monitor(ax, ay):
     rx = int(ax - ROI_W // 2)
@@ -798,15 +2322,41 @@ def compute_monitor(ax, ay):
 
 monitor = compute_monitor(anchor_x, anchor_y)
 
-tmpl_imgs_base = {g: [] for g in TEMPLATES.keys()}
-for grade, paths in TEMPLATES.items():
-    for path in paths:
-        img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
-        if img is None:
-            raise FileNotFoundError(f"템플릿 로드 실패: {grade} -> {path}")
-        tmpl_imgs_base[grade].append(img)
-
+# ✅ 템플릿 디코딩/스케일링은 load_backend()가 백그라운드에서 1회 수행
+tmpl_imgs_base = {}
 tmpl_imgs = {}
+template_scale = 1.0
+template_profile = None      # 학습 프로필 앵커가 선택돼 있으면 그 preset dict
+_profile_tmpls = {}          # 프로필 label -> 디코딩한 템플릿 (프로필마다 1회)
+# 템플릿 + 앵커/ROI 상태(anchor_x/y, ROI_W/H, monitor, current_plugin)를 함께 보호.
+# UI 스레드(앵커 선택/설정 적용)와 감지 스레드(activate_plugin)가 둘 다 set_anchor_index를 부르므로
+# 재진입 가능 (set_anchor_index -> rebuild_templates)
+templates_lock = threading.RLock()
+
+def import_numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+
+def import_cv():
+    global cv2
+    import_numpy()
+    if cv2 is None:
+        import cv2 as cv2_module
+        cv2 = cv2_module
+
+def load_templates(plugin=None):
+    """plugin(기본: current_plugin)의 템플릿만 디코딩"""
+    templates = (plugin or current_plugin).templates
+    base = {g: [] for g in templates.keys()}
+    for grade, paths in templates.items():
+        for path in paths:
+            img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+            if img is None:
+                raise FileNotFoundError(f"템플릿 로드 실패: {grade} -> {path}")
+            base[grade].append(img)
+    return base
 
 
 def _scale_candidates(base_scale):
@@ -820,10 +2370,9 @@ def _scale_candidates(base_scale):
         yield candidate
 
 
-def rebuild_templates(base_scale):
-    global tmpl_imgs
+def _build_scaled_templates(base, base_scale):
     new_tmpls = {}
-    for grade, tmpls in tmpl_imgs_base.items():
+    for grade, tmpls in base.items():
         scaled_list = []
         for tmpl in tmpls:
             for scale_factor in _scale_candidates(base_scale):
@@ -835,200 +2384,1305 @@ def rebuild_templates(base_scale):
                     scaled = tmpl
                 scaled_list.append(scaled)
         new_tmpls[grade] = scaled_list
+    return new_tmpls
+
+
+def _load_profile_templates(profile):
+    """학습 프로필 템플릿: 이미 내 화면 크기이므로 스케일링 없이 그대로"""
+    tmpls = _profile_tmpls.get(profile["label"])
+    if tmpls is None:
+        tmpls = {}
+        for grade, paths in profile["templates"].items():
+            imgs = [cv2.imread(p, cv2.IMREAD_GRAYSCALE) for p in paths]
+            tmpls[grade] = [img for img in imgs if img is not None]
+        _profile_tmpls[profile["label"]] = tmpls
+    return tmpls
+
+def _active_templates():
+    if template_profile is not None:
+        return _load_profile_templates(template_profile)
+    return _build_scaled_templates(tmpl_imgs_base, template_scale)
+
+def rebuild_templates(base_scale, profile=None):
+    """
+    앵커 변경 시 호출. 아직 템플릿이 로드되기 전이면 scale(또는 프로필)만 기억해 두고
+    로더가 끝날 때 그걸로 한 번만 생성 (1.0 -> scale 이중 생성 없음)
+    """
+    global tmpl_imgs, template_scale, template_profile
+    with templates_lock:
+        template_scale = base_scale
+        template_profile = profile
+        if not tmpl_imgs_base:
+            return
+        tmpl_imgs = _active_templates()
 
-    tmpl_imgs = new_tmpls
-
-
-rebuild_templates(1.0)
+# =============================
+# Background backend loader
+# =============================
+backend_ready = threading.Event()
+backend_error = None
 
+def load_backend():
+    """OpenCV/numpy/mss import + 템플릿 디코딩 + 현재 scale로 스케일링 (UI는 이미 떠 있음)"""
+    global tmpl_imgs_base, tmpl_imgs, backend_error
+    try:
+        t = time.perf_counter()
+        import_numpy()
+        startup_mark("import numpy", t)
+
+        t = time.perf_counter()
+        import_cv()
+        startup_mark("import cv2", t)
+
+        t = time.perf_counter()
+        base = load_templates()
+        startup_mark("decode templates", t)
+
+        t = time.perf_counter()
+        with templates_lock:
+            tmpl_imgs_base = base
+            tmpl_imgs = _active_templates()
+        startup_mark(f"scale templates x{template_scale:.3f}" if template_profile is None
+                     else f"profile templates {template_profile['label']}", t)
+    except Exception as e:
+        backend_error = e
+        print("[ERROR] 감지 백엔드 로드 실패:", e)
+    finally:
+        backend_ready.set()
+        startup_mark("backend ready")
+        wake_ui()
+
+
+def activate_plugin(plugin):
+    """
+    감지 대상 챔피언의 플러그인으로 전환 (감지 스레드에서 호출).
+    ✅ 새 플러그인 템플릿만 디코딩하고 이전 것은 버림 -> 프레임당 matchTemplate 수는 지금 챔피언 것만큼
+    """
+    global current_plugin, tmpl_imgs_base
+    if plugin is current_plugin:
+        return True
+    try:
+        base = load_templates(plugin)
+    except Exception as e:
+        print("[PLUGIN] 템플릿 로드 실패:", plugin.id, e)
+        return False
+    with templates_lock:
+        current_plugin = plugin
+        tmpl_imgs_base = base
+        # ROI 크기/앵커 오프셋/템플릿 scale을 새 플러그인 기준으로 (같은 잠금 안 -> UI의 앵커 변경과 섞이지 않음)
+        set_anchor_index(state["anchor_index"], update_ui=False)
+    print("[PLUGIN] active:", plugin.id)
+    return True
 
 def resolution_scale(resolution):
     try:
         rw, rh = resolution
-        bw, bh = TEMPLATE_BASE_RESOLUTION
+        bw, bh = current_plugin.template_resolution
         if bh > 0:
-            # UI 스케일을 높이 기준으로 정렬 (기본 해상도 3440x1440)
+            # UI 스케일을 높이 기준으로 정렬 (사미라 템플릿 기본 해상도 3440x1440)
             return max(0.2, rh / bh)
     except Exception:
         pass
     return 1.0
 
-def detect_grade_fn(roi_gray):
+def detect_grade_fn(roi_gray, scores=None):
+    """scores(dict)를 넘기면 등급별 최고 점수와 matchTemplate 호출 수("matches")를 채움 (HUD용)"""
     best_grade = None
     best_score = -1.0
+    matches = 0
     for grade, tmpls in tmpl_imgs.items():
+        grade_best = -1.0
         for tmpl in tmpls:
             if roi_gray.shape[0] < tmpl.shape[0] or roi_gray.shape[1] < tmpl.shape[1]:
                 continue
             res = cv2.matchTemplate(roi_gray, tmpl, cv2.TM_CCOEFF_NORMED)
             _, max_val, _, _ = cv2.minMaxLoc(res)
+            matches += 1
+            grade_best = max(grade_best, max_val)
             if max_val > best_score:
                 best_score = max_val
                 best_grade = grade
+        if scores is not None:
+            scores[grade] = grade_best
+    if scores is not None:
+        scores["matches"] = matches
     return best_grade, best_score
 
-LIVE_URL = "https://127.0.0.1:2999/liveclientdata/allgamedata"
-
-def is_active_player_samira(timeout_sec=0.2):
+DEFAULT_LIVE_URL = "https://127.0.0.1:2999/liveclientdata/allgamedata"
+# --live-url: mock_live_server.py 등 다른 주소로 폴링
+LIVE_URL = ARGS.live_url or DEFAULT_LIVE_URL
+
+_http = None
+# 최근 Live Client 요청 성공/실패 (HUD 에러율)
+http_results = deque(maxlen=100)
+
+def live_get_json(timeout_sec):
+    """requests는 첫 폴링 때 import. 세션을 재사용해 로컬 클라이언트와 keep-alive 유지"""
+    global _http
+    if _http is None:
+        import requests
+        import urllib3
+        # 로컬 라이브클라(127.0.0.1) + verify=False 경고 끄기
+        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+        session = requests.Session()
+        session.verify = False
+        _http = session
+    t0 = time.perf_counter()
     try:
-        data = requests.get(LIVE_URL, verify=False, timeout=timeout_sec).json()
+        data = _http.get(LIVE_URL, timeout=timeout_sec).json()
+    except Exception:
+        http_results.append(False)
+        note_game_offline()
+        raise
+    latency.record("http", time.perf_counter() - t0)
+    http_results.append(True)
+    return data
 
-        active_name = data.get("activePlayer", {}).get("summonerName", None)
-        if not active_name:
-            return False
+class DetectionController:
+    def __init__(self):
+        self.running = True
+        self.debug_window = True
+        self.lock = threading.Lock()
+        self.monitor = monitor
 
-        for p in data.get("allPlayers", []):
-            if p.get("summonerName") != active_name:
-                continue
+det_ctl = DetectionController()
 
-            champ = p.get("championName", "")
-            raw = p.get("rawChampionName", "")
+# =============================
+# Game state (allgamedata -> 매치별 플레이어 표)
+# =============================
+# Riot ID 전환 이후 이름 필드: riotId("이름#태그") / riotIdGameName + riotIdTagLine.
+# summonerName은 구버전 필드 (지금은 비어 있거나 riotId와 같음). 이벤트의 KillerName은 클라이언트 버전에 따라
+# 이 중 하나로 들어오므로 플레이어마다 모든 별칭을 대소문자 무시로 색인
+PLAYER_NAME_KEYS = ("riotId", "riotIdGameName", "summonerName")
+
+# 같은 10명/같은 챔피언으로 다시 하는 게임(연습 모드, 반복 사용자 설정 게임)은 match_key가 같으므로 아래로도 새 매치 판단
+MATCH_GAP_SEC = 5.0        # 게임 데이터 없음(연결 끊김 / 404 로딩)이 이만큼 이어졌다가 돌아오면
+MATCH_REWIND_SEC = 1.0     # gameData.gameTime이 이만큼 넘게 뒤로 가면
+
+def player_aliases(p):
+    names = set()
+    for k in PLAYER_NAME_KEYS:
+        v = p.get(k)
+        if isinstance(v, str) and v:
+            names.add(v.casefold())
+    game_name, tag = p.get("riotIdGameName"), p.get("riotIdTagLine")
+    if isinstance(game_name, str) and game_name and isinstance(tag, str) and tag:
+        names.add(f"{game_name}#{tag}".casefold())
+    return frozenset(names)
+
+class PlayerTable:
+    """
+    한 매치의 allPlayers 색인: 별칭 -> 플레이어 정보.
+    ✅ 매치가 바뀔 때(match_key 또는 is_new_match)만 다시 만들고, 폴링마다는 dict 조회만 함
+    """
+    __slots__ = ("key", "players", "by_name", "watch", "game_time", "max_event_id", "seen_t")
+
+    def __init__(self, key, all_players):
+        self.key = key
+        self.players = []
+        self.by_name = {}
+        self.watch = (None, None)   # 마지막 조회 (이름 키, 결과) -> 같은 대상이면 별칭 계산도 생략
+        self.game_time = None       # 마지막으로 본 gameData.gameTime
+        self.max_event_id = -1      # 마지막으로 본 가장 큰 EventID
+        self.seen_t = 0.0           # 마지막 게임 데이터를 받은 시각 (perf_counter)
+        for p in all_players:
+            info = {
+                "name": p.get("riotId") or p.get("summonerName") or p.get("riotIdGameName") or "",
+                "champion": p.get("championName", ""),
+                "team": p.get("team", ""),
+                "plugin": find_plugin(p),   # 이 챔피언용 감지 플러그인 (없으면 None)
+                "aliases": player_aliases(p),
+            }
+            self.players.append(info)
+            for alias in info["aliases"]:
+                self.by_name.setdefault(alias, info)
+
+    @staticmethod
+    def match_key(data):
+        """플레이어 목록은 매치 중 바뀌지 않음 -> 인원/양 끝 플레이어(이름, 챔피언)만 보고 매치 구분 (O(1))"""
+        players = data.get("allPlayers")
+        if not players:
+            return None
+        first, last = players[0], players[-1]
+        return (len(players), first.get("riotId") or first.get("summonerName"), first.get("championName"),
+                last.get("riotId") or last.get("summonerName"), last.get("championName"))
+
+    def find(self, aliases):
+        for alias in aliases:
+            info = self.by_name.get(alias)
+            if info is not None:
+                return info
+        return None
 
-            if isinstance(raw, str) and ("Samira" in raw):
+    @staticmethod
+    def progress(data):
+        """-> (gameTime 또는 None, 가장 큰 EventID). 이벤트는 EventID 순서라 마지막 것만 봄"""
+        gt = (data.get("gameData") or {}).get("gameTime")
+        events = (data.get("events") or {}).get("Events") or ()
+        last_id = events[-1].get("EventID", -1) if events else -1
+        return (gt if _is_number(gt) else None), (last_id if _is_number(last_id) else -1)
+
+    def is_new_match(self, game_time, max_event_id, now, offline_since):
+        """같은 로스터라도 시간/이벤트가 되감겼거나, 오래 끊겼다 돌아왔는데 게임 시간이 그만큼 흐르지 않았으면 새 매치"""
+        if max_event_id < self.max_event_id:
+            return True
+        if game_time is not None and self.game_time is not None and game_time < self.game_time - MATCH_REWIND_SEC:
+            return True
+        if offline_since is not None and now - offline_since >= MATCH_GAP_SEC:
+            # 같은 게임에 재접속했다면 끊긴 동안에도 gameTime이 흘렀음
+            if game_time is None or self.game_time is None:
                 return True
+            return game_time - self.game_time < (now - self.seen_t) - MATCH_GAP_SEC
+        return False
 
-            if champ in ("Samira", "사미라"):
-                return True
+_player_table = None
+_offline_since = None   # 게임 데이터가 처음 없어진 시각 (perf_counter, 게임 중이면 None)
 
-            return False
+def note_game_offline():
+    """Live Client 요청 실패 / 게임 데이터가 아닌 응답 (404 로딩, 클라이언트 꺼짐)"""
+    global _offline_since
+    if _offline_since is None:
+        _offline_since = time.perf_counter()
 
-        return False
+def player_table_for(data):
+    global _player_table, _offline_since
+    key = PlayerTable.match_key(data)
+    if key is None:
+        note_game_offline()
+        return None
+    now = time.perf_counter()
+    game_time, max_event_id = PlayerTable.progress(data)
+    table = _player_table
+    if table is None or table.key != key or table.is_new_match(game_time, max_event_id, now, _offline_since):
+        # 새 표 = 새 매치 (감지 스레드가 표가 바뀐 것을 보고 펜타 1회 제한/이벤트 위치를 초기화)
+        table = PlayerTable(key, data["allPlayers"])
+        _player_table = table
+    if game_time is not None:
+        table.game_time = game_time
+    table.max_event_id = max(table.max_event_id, max_event_id)
+    table.seen_t = now
+    _offline_since = None
+    return table
+
+def active_player_aliases(data):
+    """직접 플레이 중인 클라이언트의 내 별칭. 관전/리플레이는 activePlayer가 {"error": ...} -> 빈 집합"""
+    ap = data.get("activePlayer")
+    if not isinstance(ap, dict) or "error" in ap:
+        return frozenset()
+    return player_aliases(ap)
+
+def watched_player(data, watch=None):
+    """
+    감지 대상 플레이어 정보 (없으면 None).
+    watch(설정 watch_player: Riot ID "이름#태그" 또는 이름) > activePlayer.
+    관전/리플레이에서는 activePlayer가 없으므로 watch_player를 지정해야 함
+    """
+    table = player_table_for(data)
+    if table is None:
+        return None
+    if watch is None:
+        watch = state["watch_player"]
+    if watch:
+        key = ("watch", watch)
+    else:
+        ap = data.get("activePlayer")
+        key = ("active", ap.get("riotId") or ap.get("summonerName")) if isinstance(ap, dict) and "error" not in ap else None
+    if key is not None and table.watch[0] == key:
+        return table.watch[1]
+    info = table.find((watch.casefold(),)) if watch else table.find(active_player_aliases(data))
+    table.watch = (key, info)
+    return info
+
+def client_mode(data):
+    """"live"(직접 플레이) / "spectator"(관전/리플레이) / None(게임 아님)"""
+    if not data.get("allPlayers"):
+        return None
+    return "live" if active_player_aliases(data) else "spectator"
+
+def plugin_in_data(data, watch=None):
+    """allgamedata payload -> 감지 대상(내 챔피언 또는 watch_player)의 플러그인 (없으면 None)"""
+    p = watched_player(data, watch)
+    return p["plugin"] if p is not None else None
+
+def is_samira_in_data(data, watch=None):
+    """allgamedata payload -> 감지 대상이 사미라인지"""
+    plugin = plugin_in_data(data, watch)
+    return plugin is not None and plugin.id == "samira"
+
+def active_player_plugin(timeout_sec=0.2):
+    try:
+        return plugin_in_data(live_get_json(timeout_sec))
     except:
-        return False
+        return None
+
+def is_active_player_samira(timeout_sec=0.2):
+    plugin = active_player_plugin(timeout_sec)
+    return plugin is not None and plugin.id == "samira"
+
+def scan_pentakill(data, last_event_id, watch=None):
+    """
+    ✅ 펜타 이벤트는 '감지 대상이 킬한 것'만:
+    last_event_id 이후의 Multikill(KillStreak 5) 중 KillerName(또는 유사 필드)이 감지 대상의 별칭 중 하나인지
+    -> (found, 새 last_event_id)
+    """
+    p = watched_player(data, watch)
+    if p is None:
+        return False, last_event_id
+    aliases = p["aliases"]
+
+    for e in data.get("events", {}).get("Events", []):
+        eid = e.get("EventID", -1)
+        if eid <= last_event_id:
+            continue
+        last_event_id = max(last_event_id, eid)
+
+        if e.get("EventName") == "Multikill" and e.get("KillStreak") == 5:
+            killer = e.get("KillerName", None)  # 보통 이 키로 들어옴
+            # 혹시 키가 다르면 보조로 몇 개 더 시도 (환경마다 다를 수 있음)
+            if killer is None:
+                killer = e.get("Killer", None) or e.get("PlayerName", None)
+
+            # ✅ 감지 대상이면 재생, 다른 사람이 펜타한 것 -> 재생 X
+            if isinstance(killer, str) and killer.casefold() in aliases:
+                return True, last_event_id
+
+    return False, last_event_id
 
 def get_active_summoner_name(timeout_sec=0.2):
-    """펜타 이벤트에서 '내가 한 킬인지' 판별용"""
+    """감지 대상 이름 (Riot ID 우선)"""
     try:
-        data = requests.get(LIVE_URL, verify=False, timeout=timeout_sec).json()
-        return data.get("activePlayer", {}).get("summonerName", None)
+        p = watched_player(live_get_json(timeout_sec))
+        return p["name"] if p is not None else None
     except:
         return None
 
-class DetectionController:
+# =============================
+# Event bus (detection -> audio / UI / IPC / recorder)
+# =============================
+@dataclass(slots=True)
+class DetectionEvent:
+    """
+    capture_t: 입력을 얻은 시각 (프레임 grab / Live Client 요청 직전)
+    detect_t:  감지 스레드가 이벤트를 확정한 시각
+    둘 다 time.perf_counter() 기준 -> 같은 프로세스 안에서 지연 측정용
+    """
+    capture_t: float
+    detect_t: float
+
+    kind = "EVENT"
+
+    @property
+    def value(self):
+        return None
+
+    def to_dict(self):
+        wall_t = time.time() - (time.perf_counter() - self.detect_t)
+        return {
+            "event": self.kind,
+            "value": self.value,
+            "t": round(wall_t, 3),
+            "detect_ms": round((self.detect_t - self.capture_t) * 1000.0, 2),
+        }
+
+@dataclass(slots=True)
+class GradeEvent(DetectionEvent):
+    grade: str = "None"
+    score: float = 0.0
+    seen_t: float = 0.0     # 확정된 후보가 처음 보인 프레임의 capture_t (= 화면이 바뀐 시점 근사)
+
+    kind = "GRADE"
+
+    @property
+    def value(self):
+        return self.grade
+
+    def to_dict(self):
+        d = DetectionEvent.to_dict(self)
+        d["score"] = round(self.score, 4)
+        return d
+
+@dataclass(slots=True)
+class PentaEvent(DetectionEvent):
+    kind = "PENTA"
+
+@dataclass(slots=True)
+class SamiraActiveEvent(DetectionEvent):
+    """감지 대상 챔피언에 플러그인이 있으면 active (이벤트 이름은 IPC 호환을 위해 그대로)"""
+    active: bool = False
+    plugin: str = ""        # 활성 플러그인 id ("samira" 등)
+
+    kind = "SAMIRA_ACTIVE"
+
+    @property
+    def value(self):
+        return self.active
+
+    def to_dict(self):
+        d = DetectionEvent.to_dict(self)
+        d["plugin"] = self.plugin
+        return d
+
+class Subscription:
+    """
+    subscriber 하나의 전용 큐 (공유 queue.Queue를 여럿이 나눠 먹지 않음)
+    kinds: 받을 이벤트 종류 (None = 전부)
+    coalesce: 이 종류는 아직 안 꺼낸 마지막 이벤트가 같은 종류면 최신 것으로 덮어씀
+              (예: 오디오가 밀려 있을 때 GRADE E->D->C 연속이면 C만 재생)
+    notify: put 직후 호출 (UI는 wake_ui로 idle 대기를 깨움)
+    """
+    def __init__(self, name, kinds=None, coalesce=(), notify=None):
+        self.name = name
+        self.kinds = frozenset(kinds) if kinds is not None else None
+        self.coalesce = frozenset(coalesce)
+        self.notify = notify
+        self.items = deque()
+        self.cond = threading.Condition()
+        self.closed = False
+        self.coalesced = 0
+
+    def put(self, ev):
+        if self.kinds is not None and ev.kind not in self.kinds:
+            return
+        with self.cond:
+            if self.closed:
+                return
+            if ev.kind in self.coalesce and self.items and self.items[-1].kind == ev.kind:
+                self.items[-1] = ev
+                self.coalesced += 1
+            else:
+                self.items.append(ev)
+            self.cond.notify()
+        if self.notify is not None:
+            self.notify()
+
+    def get(self, timeout=None):
+        """이벤트 하나. 타임아웃/close면 None (close 여부는 self.closed)"""
+        with self.cond:
+            if not self.items and not self.closed:
+                self.cond.wait(timeout)
+            if self.items:
+                return self.items.popleft()
+            return None
+
+    def drain(self):
+        with self.cond:
+            items = list(self.items)
+            self.items.clear()
+        return items
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+class EventBus:
     def __init__(self):
-        self.running = True
-        self.debug_window = True
         self.lock = threading.Lock()
-        self.monitor = monitor
+        self.subs = ()
 
-det_ctl = DetectionController()
+    def subscribe(self, name, kinds=None, coalesce=(), notify=None):
+        sub = Subscription(name, kinds=kinds, coalesce=coalesce, notify=notify)
+        with self.lock:
+            self.subs = self.subs + (sub,)
+        return sub
 
-event_q = queue.Queue()
+    def unsubscribe(self, sub):
+        with self.lock:
+            self.subs = tuple(s for s in self.subs if s is not sub)
+        sub.close()
 
-def detection_thread_main():
-    score_threshold = 0.55
-    confirm_frames = 3
-    none_exit_extra_confirm = 6
-    step_interval_sec = 0.05
-    drop_confirm_frames = 10
-    ramp_hold_sec = 0.1
+    def publish(self, ev):
+        # subs는 교체만 하는 tuple -> 발행 경로(감지 스레드)는 lock 없이 순회
+        for sub in self.subs:
+            sub.put(ev)
 
-    last_stable_grade = "None"
-    last_step_time = 0.0
+    def close(self):
+        with self.lock:
+            subs, self.subs = self.subs, ()
+        for sub in subs:
+            sub.close()
 
-    candidate_grade = None
-    candidate_count = 0
+event_bus = EventBus()
 
-    ramp_target = None
-    ramp_target_idx = None
-    ramp_last_seen_time = 0.0
+# =============================
+# Latency (픽셀 변화 -> 소리)
+# =============================
+class LatencyHistogram:
+    """
+    HdrHistogram 방식 (µs 단위 정수): 2^SUB_BITS 미만은 1µs 칸, 그 위로는 2배 구간마다 2^(SUB_BITS-1)개 선형 칸
+    -> 상대 오차 < 1/64, 범위 제한 없음, 값이 몰리는 칸만 dict에 생김
+    """
+    SUB_BITS = 7
+
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+        self.sum_us = 0
+        self.min_us = None
+        self.max_us = 0
+
+    def _index(self, v):
+        sub = 1 << self.SUB_BITS
+        if v < sub:
+            return v
+        shift = v.bit_length() - self.SUB_BITS
+        return sub + (shift - 1) * (sub >> 1) + ((v >> shift) - (sub >> 1))
+
+    def _highest_equivalent(self, idx):
+        sub = 1 << self.SUB_BITS
+        if idx < sub:
+            return idx
+        k = idx - sub
+        shift = k // (sub >> 1) + 1
+        m = k % (sub >> 1) + (sub >> 1)
+        return ((m + 1) << shift) - 1
+
+    def record(self, us):
+        v = max(0, int(us))
+        idx = self._index(v)
+        self.counts[idx] = self.counts.get(idx, 0) + 1
+        self.total += 1
+        self.sum_us += v
+        self.max_us = max(self.max_us, v)
+        self.min_us = v if self.min_us is None else min(self.min_us, v)
+
+    def percentiles(self, ps):
+        """ps: 오름차순 [50, 90, 99, ...] -> µs 값 목록 (칸의 최댓값, HdrHistogram과 같은 보고 방식)"""
+        out = []
+        if self.total == 0:
+            return [0] * len(ps)
+        acc = 0
+        it = iter(ps)
+        p = next(it)
+        for idx in sorted(self.counts):
+            acc += self.counts[idx]
+            while acc * 100.0 >= p * self.total:
+                out.append(min(self._highest_equivalent(idx), self.max_us))
+                p = next(it, None)
+                if p is None:
+                    return out
+        while len(out) < len(ps):
+            out.append(self.max_us)
+        return out
+
+    def summary(self):
+        p50, p90, p99, p999 = self.percentiles([50, 90, 99, 99.9])
+        return {
+            "count": self.total,
+            "min_ms": (self.min_us or 0) / 1000.0,
+            "mean_ms": round(self.sum_us / max(1, self.total) / 1000.0, 3),
+            "p50_ms": p50 / 1000.0,
+            "p90_ms": p90 / 1000.0,
+            "p99_ms": p99 / 1000.0,
+            "p999_ms": p999 / 1000.0,
+            "max_ms": self.max_us / 1000.0,
+        }
+
+    def to_dict(self):
+        return {"sub_bits": self.SUB_BITS, "counts": {str(k): c for k, c in sorted(self.counts.items())}}
+
+# 감지 스레드: capture(sct.grab) / gray / detect(detect_grade_fn) - 프레임마다
+#              confirm(후보가 처음 보인 프레임 -> 이벤트 확정)
+# 오디오 스레드: queue(확정 -> 오디오 스레드 수신) / handle(handle_detection_event) / play(mixer 호출)
+#              e2e(후보가 처음 보인 프레임 -> play 반환). 실제 출력까지는 mixer 버퍼만큼 더 걸림
+# live_get_json: http(Live Client 요청 1회)
+LATENCY_STAGES = ("capture", "gray", "detect", "confirm", "queue", "handle", "play", "e2e", "http")
+
+class LatencyStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.hists = {name: LatencyHistogram() for name in LATENCY_STAGES}
+
+    def record(self, stage, seconds):
+        with self.lock:
+            self.hists[stage].record(seconds * 1_000_000.0)
+
+    def summary(self):
+        with self.lock:
+            return {name: h.summary() for name, h in self.hists.items() if h.total}
+
+    def export(self, path):
+        with self.lock:
+            stages = {name: {"summary": h.summary(), "histogram": h.to_dict()} for name, h in self.hists.items()}
+        buf_ms = None
+        if mixer_settings:
+            buf_ms = round(mixer_settings["buffer"] / mixer_settings["frequency"] * 1000.0, 2)
+        safe_write_json(path, {
+            "started_at": self.started_at,
+            "ended_at": time.time(),
+            "audio_profile": mixer_profile_name,
+            "mixer_buffer_ms": buf_ms,
+            "stages": stages,
+        })
+
+latency = LatencyStats()
+
+# =============================
+# Sampling profiler (--profile / F9 / 설정 "profiler")
+# =============================
+PROFILE_DIR = "profiles"
+PROFILE_INTERVAL_SEC = 0.01          # 기본 100 Hz
+PROFILE_MAX_INTERVAL_SEC = 0.2
+PROFILE_OVERHEAD_BUDGET = 0.01       # 샘플러 CPU 시간 <= 벽시계의 1%
+PROFILE_MAX_DEPTH = 64
+PROFILE_THREADS = ("MainThread", "detection", "audio", "debug-render")
+
+class SamplingProfiler:
+    """
+    sys._current_frames()로 대상 스레드(메인 루프/감지/오디오)의 스택을 주기적으로 훔쳐봄.
+    sys.setprofile 같은 함수 호출 계측이 없으므로 대상 스레드는 평소 속도 그대로 실행되고,
+    비용은 샘플마다 GIL을 한 번 잡고 스택을 걸어 올라가는 것뿐 (스레드 3개 x 깊이 ~20 -> 수십 µs).
+    샘플러 자신의 CPU 시간(thread_time)이 1초 구간마다 PROFILE_OVERHEAD_BUDGET를 넘으면
+    간격을 2배로 늘림 (최대 PROFILE_MAX_INTERVAL_SEC) -> 전체 오버헤드는 예산 근처로 묶임.
+    결과: 스택별 샘플 수 -> collapsed-stack 파일 (flamegraph.pl / speedscope / inferno에서 바로 열림)
+    """
+    def __init__(self, interval=PROFILE_INTERVAL_SEC, threads=PROFILE_THREADS):
+        self.base_interval = interval
+        self.threads = threads
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._labels = {}   # code object -> "qualname (file:line)"
+        self._reset()
+
+    def _reset(self):
+        self.interval = self.base_interval
+        self.stacks = {}    # (thread, (root, ..., leaf)) -> samples
+        self.samples = 0
+        self.started_at = time.time()
+        self.wall_sec = 0.0
+        self.cpu_sec = 0.0
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        with self.lock:
+            self._reset()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._main, daemon=True, name="profiler")
+        self._thread.start()
+        print(f"[PROFILE] sampling {', '.join(self.threads)} every {self.interval * 1000.0:.0f} ms")
+
+    def stop(self, path=None):
+        """샘플링을 멈추고 collapsed-stack 파일로 내보냄 -> 저장 경로 (샘플 없으면 None)"""
+        if self._thread is None:
+            return None
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        self._thread = None
+        if not self.samples:
+            return None
+        if path is None:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            path = os.path.join(PROFILE_DIR, time.strftime("profile_%Y%m%d_%H%M%S.collapsed"))
+        self.export(path)
+        self.print_summary()
+        print("[PROFILE] saved", path)
+        return path
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            name = getattr(code, "co_qualname", code.co_name)
+            label = f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _main(self):
+        names = {}
+        names_t = 0.0
+        me = threading.get_ident()
+        win_t0 = time.perf_counter()
+        win_cpu0 = time.thread_time()
+        t0, cpu0 = win_t0, win_cpu0
+
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            if now - names_t >= 1.0:
+                names = {t.ident: t.name for t in threading.enumerate() if t.name in self.threads}
+                names_t = now
+
+            frames = sys._current_frames()
+            sampled = []
+            for ident, name in names.items():
+                f = frames.get(ident)
+                if f is None or ident == me:
+                    continue
+                stack = []
+                while f is not None and len(stack) < PROFILE_MAX_DEPTH:
+                    stack.append(self._label(f.f_code))
+                    f = f.f_back
+                stack.reverse()
+                sampled.append((name, tuple(stack)))
+            del frames
+
+            with self.lock:
+                for key in sampled:
+                    self.stacks[key] = self.stacks.get(key, 0) + 1
+                self.samples += 1
+
+            # 오버헤드 예산: 1초 구간마다 샘플러 CPU / 벽시계 확인
+            now = time.perf_counter()
+            if now - win_t0 >= 1.0:
+                cpu = time.thread_time()
+                if (cpu - win_cpu0) / (now - win_t0) > PROFILE_OVERHEAD_BUDGET:
+                    self.interval = min(PROFILE_MAX_INTERVAL_SEC, self.interval * 2.0)
+                win_t0, win_cpu0 = now, cpu
+                with self.lock:
+                    self.wall_sec = now - t0
+                    self.cpu_sec = cpu - cpu0
+
+        with self.lock:
+            self.wall_sec = time.perf_counter() - t0
+            self.cpu_sec = time.thread_time() - cpu0
+
+    def functions(self, thread=None):
+        """함수별 집계 -> {label: [self 샘플, total 샘플]} (total은 스택에 한 번 이상 나온 샘플 수)"""
+        out = {}
+        with self.lock:
+            items = list(self.stacks.items())
+        for (name, stack), n in items:
+            if thread is not None and name != thread:
+                continue
+            for label in set(stack):
+                out.setdefault(label, [0, 0])[1] += n
+            if stack:
+                out.setdefault(stack[-1], [0, 0])[0] += n
+        return out
+
+    def summary(self, top=15):
+        with self.lock:
+            wall = self.wall_sec
+            info = {
+                "samples": self.samples,
+                "interval_ms": round(self.interval * 1000.0, 1),
+                "wall_sec": round(wall, 2),
+                "overhead_pct": round(self.cpu_sec / wall * 100.0, 3) if self.cpu_sec and wall else None,
+                "threads": {},
+            }
+            threads = sorted({name for name, _ in self.stacks})
+        for name in threads:
+            funcs = self.functions(name)
+            ranked = sorted(funcs.items(), key=lambda kv: -kv[1][1])[:top]
+            info["threads"][name] = [{"function": label, "self": s, "total": t} for label, (s, t) in ranked]
+        return info
+
+    def print_summary(self, top=15):
+        info = self.summary(top)
+        print(f"[PROFILE] {info['samples']} samples over {info['wall_sec']} s, "
+              f"interval {info['interval_ms']} ms, sampler overhead {info['overhead_pct']}%")
+        for name, funcs in info["threads"].items():
+            print(f"[PROFILE] -- {name}: total / self / function")
+            for f in funcs:
+                pct = f["total"] / max(1, info["samples"]) * 100.0
+                print(f"[PROFILE] {pct:6.1f}% {f['self']:7d}  {f['function']}")
+
+    def export(self, path):
+        """collapsed-stack 형식: 'thread;root;...;leaf count' 한 줄씩"""
+        with self.lock:
+            items = sorted(self.stacks.items())
+        with open(path, "w", encoding="utf-8") as f:
+            for (name, stack), n in items:
+                f.write(";".join((name,) + stack) + f" {n}\n")
 
-    drop_candidate = None
-    drop_count = 0
+profiler = SamplingProfiler()
 
-    s_enter_time = None
+# =============================
+# Grade state machine
+# =============================
+class GradeStateMachine:
+    """
+    프레임별 raw 등급 -> 안정 등급 + 등급 이벤트
+    - confirm_frames 연속으로 같은 raw여야 후보 확정 (None에서 벗어날 때는 none_exit_extra_confirm 더)
+    - 올라갈 때는 step_interval_sec마다 한 칸씩 (ramp), 2칸 이상 내려갈 때는 drop_confirm_frames 확인
+    - 최고 단계(S) -> None은 진입 후 top_guard_sec(S_TO_NONE_GUARD_SEC) 동안 막음
+    - ladder: 플러그인 등급 사다리 ("None", 가장 낮은 단계, ..., 최고 단계). 기본은 사미라 E~S
+    감지 스레드 / 벤치마크 / 정확도 러너가 같은 구현을 씀
+    """
     S_TO_NONE_GUARD_SEC = 6.0
 
-    # ✅ 감지 스레드 내에서 "현재 등급 이벤트 중복 방지용"
-    current_sent_grade = None
+    def __init__(self, confirm_frames=3, none_exit_extra_confirm=6, step_interval_sec=0.05,
+                 drop_confirm_frames=10, ramp_hold_sec=0.1, ladder=GRADE_ORDER, top_guard_sec=S_TO_NONE_GUARD_SEC):
+        self.ladder = tuple(ladder)
+        self.grade_idx = {g: i for i, g in enumerate(self.ladder)}
+        self.entry = self.ladder[1]
+        self.top = self.ladder[-1]
+        self.top_guard_sec = top_guard_sec
+        self.confirm_frames = confirm_frames
+        self.none_exit_extra_confirm = none_exit_extra_confirm
+        self.step_interval_sec = step_interval_sec
+        self.drop_confirm_frames = drop_confirm_frames
+        self.ramp_hold_sec = ramp_hold_sec
+        self.info_lines = []
+        self.reset()
+
+    def reset(self):
+        self.last_stable_grade = "None"
+        self.last_step_time = 0.0
+        self.candidate_grade = None
+        self.candidate_count = 0
+        self.candidate_seen_t = 0.0
+        self.ramp_target = None
+        self.ramp_target_idx = None
+        self.ramp_last_seen_time = 0.0
+        self.drop_candidate = None
+        self.drop_count = 0
+        self.s_enter_time = None
+        # ✅ "현재 등급 이벤트 중복 방지용"
+        self.current_sent_grade = None
+
+    def _send(self):
+        # ✅ 이벤트는 중복 전송 방지 (같은 등급 계속 보내면 재생이 꼬일 수 있음)
+        if self.last_stable_grade != "None" and self.last_stable_grade != self.current_sent_grade:
+            self.current_sent_grade = self.last_stable_grade
+            return self.current_sent_grade
+        return None
+
+    def step(self, raw_grade, now, capture_t=0.0, debug=False):
+        """
+        raw_grade: 점수 기준을 통과한 등급 또는 "None", now: time.time()
+        capture_t: 후보가 바뀔 때 candidate_seen_t로 기록 (지연 측정용)
+        debug: True면 info_lines(디버그 창 문구)도 채움
+        -> 새로 보낼 등급 또는 None
+        """
+        sent = None
+        info = self.info_lines if debug else None
+        if info is not None:
+            info.clear()
+
+        if raw_grade == self.candidate_grade:
+            self.candidate_count += 1
+        else:
+            self.candidate_grade = raw_grade
+            self.candidate_count = 1
+            self.candidate_seen_t = capture_t
+
+        if info is not None:
+            info.append(f"cand={self.candidate_grade} ({self.candidate_count}/{self.confirm_frames})")
+            info.append(f"stable={self.last_stable_grade}")
+
+        if self.candidate_count < self.confirm_frames:
+            return None
+
+        proposed = self.candidate_grade
+        stable_i = self.grade_idx.get(self.last_stable_grade, 0)
+        proposed_i = self.grade_idx.get(proposed, 0)
+
+        if self.last_stable_grade == "None" and proposed != "None":
+            needed = self.confirm_frames + self.none_exit_extra_confirm
+            if info is not None:
+                info.append(f"NoneExit: need {needed} frames")
+            if self.candidate_count < needed:
+                proposed = "None"
+                proposed_i = self.grade_idx.get(proposed, 0)
+            else:
+                proposed = self.entry
+                proposed_i = self.grade_idx.get(proposed, 0)
+
+        if proposed_i > stable_i:
+            if self.ramp_target is None or proposed_i > self.ramp_target_idx:
+                self.ramp_target = proposed
+                self.ramp_target_idx = proposed_i
+            self.ramp_last_seen_time = now
+
+            if self.ramp_target is not None and (now - self.ramp_last_seen_time) > self.ramp_hold_sec:
+                self.ramp_target = None
+                self.ramp_target_idx = None
+
+            if self.ramp_target is not None and (now - self.last_step_time) >= self.step_interval_sec:
+                next_i = min(stable_i + 1, self.ramp_target_idx)
+                if next_i != stable_i:
+                    prev = self.last_stable_grade
+                    self.last_stable_grade = self.ladder[next_i]
+                    self.last_step_time = now
+
+                    sent = self._send()
+
+                    if self.last_stable_grade == self.top and prev != self.top:
+                        self.s_enter_time = now
+
+            if info is not None:
+                info.append(f"RAMP target={self.ramp_target} -> stable={self.last_stable_grade}")
+
+        elif proposed_i < stable_i:
+            dist_down = stable_i - proposed_i
+            self.ramp_target = None
+            self.ramp_target_idx = None
+
+            if self.last_stable_grade == self.top and proposed == "None":
+                if self.s_enter_time is None:
+                    self.s_enter_time = now
+                remain = self.top_guard_sec - (now - self.s_enter_time)
+                if remain > 0:
+                    if info is not None:
+                        info.append(f"{self.top}->None blocked ({remain:.1f}s left)")
+                    proposed = self.top
+                    proposed_i = self.grade_idx.get(proposed, 0)
+                    dist_down = 0
+
+            if proposed_i < stable_i:
+                if dist_down >= 2:
+                    if proposed == self.drop_candidate:
+                        self.drop_count += 1
+                    else:
+                        self.drop_candidate = proposed
+                        self.drop_count = 1
+
+                    if info is not None:
+                        info.append(f"DROP? {self.drop_candidate} ({self.drop_count}/{self.drop_confirm_frames}) dist={dist_down}")
+
+                    if self.drop_count >= self.drop_confirm_frames:
+                        self.last_stable_grade = proposed
+                        self.last_step_time = now
+                        self.drop_candidate = None
+                        self.drop_count = 0
+
+                        sent = self._send()
+
+                        if self.last_stable_grade != self.top:
+                            self.s_enter_time = None
+                else:
+                    self.last_stable_grade = proposed
+                    self.last_step_time = now
+                    self.drop_candidate = None
+                    self.drop_count = 0
+
+                    sent = self._send()
+
+                    if self.last_stable_grade != self.top:
+                        self.s_enter_time = None
+            else:
+                self.drop_candidate = None
+                self.drop_count = 0
+        else:
+            self.drop_candidate = None
+            self.drop_count = 0
+
+        return sent
+
+# =============================
+# ROI debug HUD
+# =============================
+class DetectionHud:
+    """
+    ✅ ROI Debug Preview 창 = [ROI 미리보기 x3] + [성능 패널]
+    캔버스/미리보기 버퍼는 ROI 크기가 바뀔 때만 새로 만들고 재사용 (cv2.resize(dst=...)).
+    패널(FPS, 단계별 ms, HTTP, CPU, 점수 스파크라인)은 REFRESH_SEC마다만 다시 그림 -> 그 사이 프레임은 미리보기만 갱신.
+    add_frame만 감지 스레드에서 (누적 카운터 + 감지 스레드 thread_time 기록),
+    render/render_waiting은 DebugRenderer 스레드에서 -> 패널은 누적값의 차이로 계산.
+    """
+    REFRESH_SEC = 0.25
+    MIN_W = 300
+    LINE_H = 15
+    SPARK_H = 14
+    SPARK_LEN = 120
+
+    def __init__(self, score_threshold, ladder=GRADE_ORDER, name="Samira"):
+        self.score_threshold = score_threshold
+        self.name = name   # 활성 플러그인 챔피언 이름 (대기 화면 문구)
+        # 스파크라인: 플러그인 사다리의 높은 단계부터 (None 제외)
+        self.SPARK_GRADES = [g for g in reversed(ladder) if g != "None"]
+        self.panel_h = 8 + self.LINE_H * 4 + 6 + (self.SPARK_H + 2) * len(self.SPARK_GRADES) + 6
+        self.canvas = None
+        self.preview = None
+        self.waiting = None
+        self.panel_at = 0.0
+        self.scores = {g: deque(maxlen=self.SPARK_LEN) for g in self.SPARK_GRADES}
+        self.matches = 0
+        self.lock = threading.Lock()
+        # 감지 스레드가 쓰는 누적값 (frames, [capture, gray, detect] 초, 첫 프레임 이후 감지 스레드 CPU 초)
+        self.frames = 0
+        self.stage = [0.0, 0.0, 0.0]
+        self.cpu = 0.0
+        self._last_cpu = None
+        self._reset_window(time.perf_counter(), 0, (0.0, 0.0, 0.0), 0.0)
+
+    def _reset_window(self, now, frames, stage, cpu):
+        self.win_t0 = now
+        self.win_frames0 = frames
+        self.win_stage0 = stage
+        self.win_cpu0 = cpu
+
+    def add_frame(self, capture_s, gray_s, detect_s, scores):
+        cpu = time.thread_time()
+        with self.lock:
+            self.frames += 1
+            st = self.stage
+            st[0] += capture_s
+            st[1] += gray_s
+            st[2] += detect_s
+            if self._last_cpu is not None:
+                self.cpu += cpu - self._last_cpu
+            self._last_cpu = cpu
+            self.matches = scores.get("matches", 0)
+            for g, q in self.scores.items():
+                q.append(scores.get(g, -1.0))
+
+    def _snapshot(self):
+        with self.lock:
+            return self.frames, tuple(self.stage), self.cpu, self.matches, \
+                {g: list(q) for g, q in self.scores.items()}
+
+    def _ensure_canvas(self):
+        pw, ph = ROI_W * 3, ROI_H * 3
+        w, h = max(pw, self.MIN_W), ph + self.panel_h
+        if self.canvas is None or self.canvas.shape[:2] != (h, w):
+            self.canvas = np.zeros((h, w, 3), dtype=np.uint8)
+            self.preview = np.empty((ph, pw, 3), dtype=np.uint8)
+            self.panel_at = 0.0
+        return pw, ph
+
+    def render(self, frame_bgr, info_lines):
+        pw, ph = self._ensure_canvas()
+        cv2.resize(frame_bgr, (pw, ph), dst=self.preview, interpolation=cv2.INTER_NEAREST)
+        self.canvas[:ph, :pw] = self.preview
+        if pw < self.canvas.shape[1]:
+            self.canvas[:ph, pw:] = 0
+
+        y = 28
+        for line in info_lines:
+            cv2.putText(self.canvas, line, (10, y),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.65, (255, 255, 255), 2, cv2.LINE_AA)
+            y += 26
+
+        now = time.perf_counter()
+        if now - self.panel_at >= self.REFRESH_SEC:
+            self.panel_at = now
+            self._draw_panel(self.canvas[ph:], now)
+        return self.canvas
+
+    def render_waiting(self):
+        pw, ph = ROI_W * 3, ROI_H * 3
+        if self.waiting is None or self.waiting.shape[:2] != (ph, pw):
+            img = np.zeros((ph, pw, 3), dtype=np.uint8)
+            for text, y, scale, color in ((f"WAITING: {self.name} not active", 50, 0.7, (255, 255, 255)),
+                                          ("Detection paused (no screen grab)", 85, 0.6, (180, 180, 180))):
+                # 챔피언 이름 길이에 따라 미리보기 폭(ROI 3칸)에 맞게 글자 크기를 줄임
+                tw = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, scale, 2)[0][0]
+                scale *= min(1.0, (pw - 20) / max(1, tw))
+                cv2.putText(img, text, (10, y), cv2.FONT_HERSHEY_SIMPLEX, scale, color, 2, cv2.LINE_AA)
+            self.waiting = img
+        return self.waiting
+
+    def _text(self, panel, text, y, color=(210, 215, 225)):
+        cv2.putText(panel, text, (6, y), cv2.FONT_HERSHEY_SIMPLEX, 0.4, color, 1, cv2.LINE_AA)
+
+    def _draw_panel(self, panel, now):
+        panel[:] = (24, 20, 18)
+
+        total, stage, cpu_s, matches, scores = self._snapshot()
+        elapsed = max(1e-6, now - self.win_t0)
+        n = total - self.win_frames0
+        fps = n / elapsed
+        cpu = (cpu_s - self.win_cpu0) / elapsed * 100.0 if n else 0.0
+        cap_ms, gray_ms, det_ms = ((v - v0) / max(1, n) * 1000.0 for v, v0 in zip(stage, self.win_stage0))
+        self._reset_window(now, total, stage, cpu_s)
+
+        summary = latency.summary()
+        http = summary.get("http")
+        n_http = len(http_results)
+        err = (n_http - sum(http_results)) / n_http * 100.0 if n_http else 0.0
+        e2e = summary.get("e2e")
+
+        y = 8 + self.LINE_H - 4
+        self._text(panel, f"FPS {fps:5.1f}   thread CPU {cpu:5.1f}%   matches {matches}", y, (120, 255, 160))
+        y += self.LINE_H
+        self._text(panel, f"cap {cap_ms:5.2f}  gray {gray_ms:5.2f}  detect {det_ms:6.2f} ms", y)
+        y += self.LINE_H
+        if http:
+            self._text(panel, f"http p50 {http['p50_ms']:5.1f} p99 {http['p99_ms']:6.1f} ms  err {err:4.1f}% /{n_http}", y)
+        else:
+            self._text(panel, f"http --  err {err:4.1f}% /{n_http}", y)
+        y += self.LINE_H
+        if e2e:
+            self._text(panel, f"e2e p50 {e2e['p50_ms']:6.1f}  p99 {e2e['p99_ms']:6.1f} ms  (n={e2e['count']})", y)
+        else:
+            self._text(panel, "e2e --", y)
+        y += 6
+
+        # 등급별 최고 점수 스파크라인 (0~1, 회색 선 = score_threshold)
+        x0 = 22
+        sw = panel.shape[1] - x0 - 6
+        for g in self.SPARK_GRADES:
+            top = y + 2
+            self._text(panel, g, top + self.SPARK_H - 3, (165, 175, 190))
+            thr_y = top + int(round((1.0 - self.score_threshold) * self.SPARK_H))
+            cv2.line(panel, (x0, thr_y), (x0 + sw, thr_y), (70, 70, 70), 1)
+            q = scores[g]
+            if len(q) >= 2:
+                v = np.clip(np.fromiter(q, dtype=np.float32, count=len(q)), 0.0, 1.0)
+                xs = x0 + np.arange(len(v), dtype=np.float32) * (sw / (self.SPARK_LEN - 1))
+                ys = top + (1.0 - v) * self.SPARK_H
+                pts = np.stack([xs, ys], axis=1).astype(np.int32)
+                color = (120, 170, 255) if v[-1] >= self.score_threshold else (150, 150, 150)
+                cv2.polylines(panel, [pts], False, color, 1, cv2.LINE_AA)
+            y += self.SPARK_H + 2
+
+# =============================
+# Debug window renderer (감지 스레드와 분리)
+# =============================
+DEBUG_RENDER_FPS = 15.0
+DEBUG_WIN_NAME = "ROI Debug Preview"
+
+class LatestFrameSlot:
+    """
+    최신 프레임 1개만 담는 슬롯. put은 이전 프레임을 덮어쓰기만 하고 절대 기다리지 않음
+    -> 렌더러가 느려도 감지 스레드는 막히지 않고, 렌더러는 깨어날 때마다 가장 최근 것만 그림
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+        self.item = None
+        self.dropped = 0     # 그려지기 전에 덮어쓴 프레임 수 (= 프레임 솎아내기)
+
+    def put(self, item):
+        with self.lock:
+            if self.item is not None:
+                self.dropped += 1
+            self.item = item
+        self.ready.set()
+
+    def take(self, timeout):
+        """timeout 안에 새 프레임이 없으면 None"""
+        if not self.ready.wait(timeout):
+            return None
+        with self.lock:
+            item = self.item
+            self.item = None
+            self.ready.clear()
+        return item
+
+class DebugRenderer:
+    """
+    ✅ ROI Debug Preview 창 전용 스레드.
+    감지 스레드는 submit()으로 (hud, 프레임, 문구)를 슬롯에 넣기만 하고,
+    resize/putText/imshow/waitKey는 여기서 최대 DEBUG_RENDER_FPS로 (그 사이 프레임은 버림).
+    HighGUI 창 생성/그리기/파괴는 모두 이 스레드에서만.
+    """
+    def __init__(self, fps=DEBUG_RENDER_FPS):
+        self.interval = 1.0 / fps
+        self.slot = LatestFrameSlot()
+        self.running = False
+        self.rendered = 0
+        self.window = False
+        self.failed = False
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._main, daemon=True, name="debug-render")
+        self._thread.start()
+
+    def stop(self):
+        self.running = False
+        self.slot.ready.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def submit(self, hud, frame_bgr=None, info_lines=None):
+        """감지 스레드에서 호출. frame_bgr=None이면 대기 화면"""
+        self.slot.put((hud, frame_bgr, info_lines))
+
+    def _show(self, hud, frame_bgr, info_lines):
+        if not self.window:
+            cv2.namedWindow(DEBUG_WIN_NAME, cv2.WINDOW_NORMAL)
+            cv2.setWindowProperty(DEBUG_WIN_NAME, cv2.WND_PROP_TOPMOST, 1)
+            self.window = True
+        img = hud.render_waiting() if frame_bgr is None else hud.render(frame_bgr, info_lines)
+        cv2.imshow(DEBUG_WIN_NAME, img)
+        self.rendered += 1
+
+    def _destroy(self):
+        if self.window:
+            try:
+                cv2.destroyWindow(DEBUG_WIN_NAME)
+            except:
+                pass
+            self.window = False
+
+    def _main(self):
+        while self.running:
+            with det_ctl.lock:
+                on = det_ctl.debug_window
+            if not on:
+                # 꺼져 있는 동안 들어온 프레임은 버림, 다시 켜면 오류 상태도 초기화
+                self._destroy()
+                self.failed = False
+                self.slot.take(0.1)
+                continue
+
+            item = self.slot.take(0.1)
+            if item is None or self.failed:
+                if self.window:
+                    cv2.waitKey(1)
+                continue
+
+            t0 = time.perf_counter()
+            try:
+                self._show(*item)
+                cv2.waitKey(1)
+            except Exception as e:
+                # 창을 못 여는 환경 (디스플레이 없음 등): 감지는 그대로, 창만 끔
+                print("[DEBUG VIEW ERROR]", e)
+                self.failed = True
+                continue
+            # 프레임 상한: 남은 시간 동안 감지 스레드가 넣는 프레임은 덮어써져 최신 것만 남음
+            rest = self.interval - (time.perf_counter() - t0)
+            if rest > 0:
+                time.sleep(rest)
+
+        self._destroy()
+
+debug_view = DebugRenderer()
+
+def detection_thread_main():
+    plugin = current_plugin
+    score_threshold = plugin.score_threshold
+    machine = GradeStateMachine(ladder=plugin.ladder, top_guard_sec=plugin.top_guard_sec)
 
     last_event_id = -1
     penta_played = False
+    match_table = None
 
     samira_active = False
     last_samira_poll = 0.0
     SAMIRA_POLL_INTERVAL = 0.35
 
-    sct = mss()
-
-    win_name = "ROI Debug Preview"
-    window_created = False
+    hud = DetectionHud(score_threshold, plugin.ladder, plugin.name)
+    grade_scores = {}
 
-    def ensure_window():
-        nonlocal window_created
-        if window_created:
-            return
-        cv2.namedWindow(win_name, cv2.WINDOW_NORMAL)
-        cv2.setWindowProperty(win_name, cv2.WND_PROP_TOPMOST, 1)
-        window_created = True
+    # 템플릿/OpenCV가 준비될 때까지 대기 (UI는 먼저 떠 있음)
+    backend_ready.wait()
+    if backend_error is not None:
+        return
 
-    def destroy_window():
-        nonlocal window_created
-        if window_created:
-            try:
-                cv2.destroyWindow(win_name)
-            except:
-                pass
-            window_created = False
+    from mss import mss
+    sct = mss()
 
     def poll_pentakill():
-        """
-        ✅ 펜타 이벤트는 '내가 킬한 것'만 재생:
-        Multikill 이벤트에서 KillerName(또는 유사 필드)이 activePlayer와 일치할 때만 큐에 넣음
-        """
+        """펜타는 게임당 한 번만: 내가 한 펜타킬이 보이면 이벤트 발행"""
         nonlocal last_event_id, penta_played
-        if penta_played:
+        if penta_played or not plugin.penta:
             return
 
         try:
-            data = requests.get(LIVE_URL, verify=False, timeout=0.2).json()
-            active_name = data.get("activePlayer", {}).get("summonerName", None)
-
-            if not active_name:
-                return
-
-            for e in data.get("events", {}).get("Events", []):
-                eid = e.get("EventID", -1)
-                if eid <= last_event_id:
-                    continue
-                last_event_id = max(last_event_id, eid)
-
-                if e.get("EventName") == "Multikill" and e.get("KillStreak") == 5:
-                    killer = e.get("KillerName", None)  # 보통 이 키로 들어옴
-                    # 혹시 키가 다르면 보조로 몇 개 더 시도 (환경마다 다를 수 있음)
-                    if killer is None:
-                        killer = e.get("Killer", None) or e.get("PlayerName", None)
-
-                    # ✅ 내 닉이면 재생, 타인이면 무시
-                    if killer == active_name:
-                        penta_played = True
-                        event_q.put(("PENTA", None))
-                    else:
-                        # 타인이 펜타한 것 -> 재생 X
-                        pass
-
+            poll_t = time.perf_counter()
+            data = live_get_json(0.2)
+            found, last_event_id = scan_pentakill(data, last_event_id)
+            if found:
+                penta_played = True
+                event_bus.publish(PentaEvent(capture_t=poll_t, detect_t=time.perf_counter()))
         except:
             pass
 
-    def reset_detection_state():
-        nonlocal last_stable_grade, last_step_time, candidate_grade, candidate_count
-        nonlocal ramp_target, ramp_target_idx, ramp_last_seen_time
-        nonlocal drop_candidate, drop_count
-        nonlocal s_enter_time
-        nonlocal current_sent_grade
-
-        last_stable_grade = "None"
-        last_step_time = 0.0
-        candidate_grade = None
-        candidate_count = 0
-        ramp_target = None
-        ramp_target_idx = None
-        ramp_last_seen_time = 0.0
-        drop_candidate = None
-        drop_count = 0
-        s_enter_time = None
-        current_sent_grade = None
-
     while True:
         with det_ctl.lock:
             if not det_ctl.running:
@@ -1040,173 +3694,77 @@ def detection_thread_main():
 
         if (now - last_samira_poll) >= SAMIRA_POLL_INTERVAL:
             last_samira_poll = now
-            new_active = is_active_player_samira(timeout_sec=0.2)
+            poll_t = time.perf_counter()
+            new_plugin = active_player_plugin(timeout_sec=0.2)
+            # 다른 플러그인 챔피언이면 그 템플릿만 로드 (실패하면 감지 안 함)
+            if new_plugin is not None and new_plugin is not plugin:
+                if activate_plugin(new_plugin):
+                    plugin = new_plugin
+                    score_threshold = plugin.score_threshold
+                    machine = GradeStateMachine(ladder=plugin.ladder, top_guard_sec=plugin.top_guard_sec)
+                    hud = DetectionHud(score_threshold, plugin.ladder, plugin.name)
+                    samira_active = False   # 아래에서 새 플러그인으로 SAMIRA_ACTIVE 다시 발행
+                else:
+                    new_plugin = None
+            new_active = new_plugin is not None
+
+            # 새 매치(플레이어 표가 새로 만들어짐) -> 펜타 1회 제한/이벤트 위치 초기화
+            if _player_table is not match_table:
+                match_table = _player_table
+                last_event_id = -1
+                penta_played = False
 
             if new_active != samira_active:
                 samira_active = new_active
                 if not samira_active:
-                    reset_detection_state()
-                    event_q.put(("SAMIRA_ACTIVE", False))
-                else:
-                    event_q.put(("SAMIRA_ACTIVE", True))
+                    machine.reset()
+                event_bus.publish(SamiraActiveEvent(capture_t=poll_t, detect_t=time.perf_counter(),
+                                                    active=samira_active, plugin=plugin.id))
 
         if not samira_active:
             if dbg_on:
-                ensure_window()
-                img = np.zeros((ROI_H * 3, ROI_W * 3, 3), dtype=np.uint8)
-                cv2.putText(img, "WAITING: Samira not active", (10, 50),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2, cv2.LINE_AA)
-                cv2.putText(img, "Detection paused (no screen grab)", (10, 85),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (180, 180, 180), 2, cv2.LINE_AA)
-                cv2.imshow(win_name, img)
-                cv2.waitKey(1)
-            else:
-                destroy_window()
+                debug_view.submit(hud)
 
             time.sleep(0.05)
             continue
 
+        capture_t = time.perf_counter()
         frame = np.array(sct.grab(monitor_local))
+        gray_t = time.perf_counter()
         frame_bgr = frame[:, :, :3]
         roi_gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
-
-        raw_grade, raw_score = detect_grade_fn(roi_gray)
+        detect_t0 = time.perf_counter()
+
+        raw_grade, raw_score = detect_grade_fn(roi_gray, grade_scores)
+        detect_t1 = time.perf_counter()
+        latency.record("capture", gray_t - capture_t)
+        latency.record("gray", detect_t0 - gray_t)
+        latency.record("detect", detect_t1 - detect_t0)
+        hud.add_frame(gray_t - capture_t, detect_t0 - gray_t, detect_t1 - detect_t0, grade_scores)
         if raw_grade is None or raw_score < score_threshold:
             raw_grade = "None"
 
-        if raw_grade == candidate_grade:
-            candidate_count += 1
-        else:
-            candidate_grade = raw_grade
-            candidate_count = 1
-
-        info_lines = [
-            f"SamiraActive=TRUE",
-            f"raw={raw_grade} score={raw_score:.3f}",
-            f"cand={candidate_grade} ({candidate_count}/{confirm_frames})",
-            f"stable={last_stable_grade}",
-        ]
-
-        if candidate_count >= confirm_frames:
-            proposed = candidate_grade
-            stable_i = idx_grade(last_stable_grade)
-            proposed_i = idx_grade(proposed)
-
-            if last_stable_grade == "None" and proposed != "None":
-                needed = confirm_frames + none_exit_extra_confirm
-                info_lines.append(f"NoneExit: need {needed} frames")
-                if candidate_count < needed:
-                    proposed = "None"
-                    proposed_i = idx_grade(proposed)
-                else:
-                    proposed = "E"
-                    proposed_i = idx_grade(proposed)
-
-            if proposed_i > stable_i:
-                if ramp_target is None or proposed_i > ramp_target_idx:
-                    ramp_target = proposed
-                    ramp_target_idx = proposed_i
-                ramp_last_seen_time = now
-
-                if ramp_target is not None and (now - ramp_last_seen_time) > ramp_hold_sec:
-                    ramp_target = None
-                    ramp_target_idx = None
-
-                if ramp_target is not None and (now - last_step_time) >= step_interval_sec:
-                    next_i = min(stable_i + 1, ramp_target_idx)
-                    if next_i != stable_i:
-                        prev = last_stable_grade
-                        last_stable_grade = GRADE_ORDER[next_i]
-                        last_step_time = now
-
-                        # ✅ 이벤트는 중복 전송 방지 (같은 등급 계속 보내면 재생이 꼬일 수 있음)
-                        if last_stable_grade != "None" and last_stable_grade != current_sent_grade:
-                            current_sent_grade = last_stable_grade
-                            event_q.put(("GRADE", current_sent_grade))
-
-                        if last_stable_grade == "S" and prev != "S":
-                            s_enter_time = now
-
-                info_lines.append(f"RAMP target={ramp_target} -> stable={last_stable_grade}")
-
-            elif proposed_i < stable_i:
-                dist_down = stable_i - proposed_i
-                ramp_target = None
-                ramp_target_idx = None
-
-                if last_stable_grade == "S" and proposed == "None":
-                    if s_enter_time is None:
-                        s_enter_time = now
-                    remain = S_TO_NONE_GUARD_SEC - (now - s_enter_time)
-                    if remain > 0:
-                        info_lines.append(f"S->None blocked ({remain:.1f}s left)")
-                        proposed = "S"
-                        proposed_i = idx_grade(proposed)
-                        dist_down = 0
-
-                if proposed_i < stable_i:
-                    if dist_down >= 2:
-                        if proposed == drop_candidate:
-                            drop_count += 1
-                        else:
-                            drop_candidate = proposed
-                            drop_count = 1
-
-                        info_lines.append(f"DROP? {drop_candidate} ({drop_count}/{drop_confirm_frames}) dist={dist_down}")
-
-                        if drop_count >= drop_confirm_frames:
-                            last_stable_grade = proposed
-                            last_step_time = now
-                            drop_candidate = None
-                            drop_count = 0
-
-                            if last_stable_grade != "None" and last_stable_grade != current_sent_grade:
-                                current_sent_grade = last_stable_grade
-                                event_q.put(("GRADE", current_sent_grade))
-
-                            if last_stable_grade != "S":
-                                s_enter_time = None
-                    else:
-                        last_stable_grade = proposed
-                        last_step_time = now
-                        drop_candidate = None
-                        drop_count = 0
-
-                        if last_stable_grade != "None" and last_stable_grade != current_sent_grade:
-                            current_sent_grade = last_stable_grade
-                            event_q.put(("GRADE", current_sent_grade))
-
-                        if last_stable_grade != "S":
-                            s_enter_time = None
-                else:
-                    drop_candidate = None
-                    drop_count = 0
-            else:
-                drop_candidate = None
-                drop_count = 0
+        sent = machine.step(raw_grade, now, capture_t=capture_t, debug=dbg_on)
+        if sent is not None:
+            # capture_t / raw_score는 확정을 일으킨 현재 프레임 값
+            detect_t = time.perf_counter()
+            latency.record("confirm", detect_t - machine.candidate_seen_t)
+            event_bus.publish(GradeEvent(capture_t=capture_t, detect_t=detect_t,
+                                         grade=sent, score=float(raw_score),
+                                         seen_t=machine.candidate_seen_t))
 
         poll_pentakill()
 
         if dbg_on:
-            ensure_window()
-            debug = cv2.resize(frame_bgr, (ROI_W * 3, ROI_H * 3), interpolation=cv2.INTER_NEAREST)
-            y = 28
-            for line in info_lines:
-                cv2.putText(debug, line, (10, y),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.65, (255, 255, 255), 2, cv2.LINE_AA)
-                y += 26
-            cv2.imshow(win_name, debug)
-            cv2.waitKey(1)
-        else:
-            destroy_window()
+            # 그리기는 debug_view 스레드에서 (여기서는 슬롯에 넣기만 -> 창 때문에 감지가 늦어지지 않음)
+            info_lines = [
+                f"{plugin.name}Active=TRUE",
+                f"raw={raw_grade} score={raw_score:.3f}",
+            ] + machine.info_lines
+            debug_view.submit(hud, frame_bgr, info_lines)
 
         time.sleep(0.02)
 
-    try:
-        cv2.destroyAllWindows()
-    except:
-        pass
-
 # =============================
 # State + config
 # =============================
@@ -1217,6 +3775,12 @@ state = {
     "debug_window": True,
     "samira_active": False,
     "anchor_index": 0,
+    "audio_profile": DEFAULT_MIXER_PROFILE,
+    "normalize_loudness": True,
+    "profiler": False,
+    "watch_player": "",      # "" = activePlayer(직접 플레이), 관전/리플레이에서는 Riot ID 지정
+    "plugin": "samira",      # 감지 중인 챔피언 플러그인 (오디오 스레드가 SAMIRA_ACTIVE로 갱신)
+    "slot_plugin": "samira", # 사운드 슬롯 화면에 보이는 플러그인
 }
 
 def set_volume(v):
@@ -1224,8 +3788,40 @@ def set_volume(v):
     state["volume"] = int(clamp(v, 0, 100))
     _base_music_volume_0_100 = state["volume"]
     # 덕킹 중이면 반영하지 않고, 덕킹 해제 시 복귀
-    if not _ducking:
-        set_music_volume(state["volume"])
+    with audio_lock:
+        if not _ducking:
+            set_music_volume(state["volume"])
+
+def set_debug_window(on):
+    state["debug_window"] = bool(on)
+    with det_ctl.lock:
+        det_ctl.debug_window = state["debug_window"]
+
+def set_profiler(on):
+    """샘플링 프로파일러 ON/OFF. 끌 때 collapsed-stack 파일로 내보냄"""
+    state["profiler"] = bool(on)
+    if state["profiler"]:
+        profiler.start()
+    else:
+        profiler.stop()
+
+def set_watch_player(name):
+    """감지 대상 변경 ("" = 내 챔피언). 감지 스레드는 다음 폴링부터 새 대상으로 판단"""
+    state["watch_player"] = (name or "").strip()
+    print("[WATCH]", state["watch_player"] or "(active player)")
+
+def set_audio_profile(name):
+    """mixer를 새 프로필로 다시 엶 (재생 중이던 배경음악/SFX는 끊김)"""
+    global current_music_grade
+    # mixer 재시작 ~ 이전 mixer용 Sound 폐기까지 audio_lock 한 구간
+    # -> 그 사이 오디오 스레드/미리듣기가 닫힌 mixer의 Sound를 새 SFX_CHANNEL에서 재생하지 않음
+    with audio_lock:
+        stop_music()
+        init_mixer(name)
+        sound_assets.reload_sounds()
+    current_music_grade = None
+    state["audio_profile"] = mixer_profile_name
+    set_music_volume(state["volume"])
 
 def set_anchor_index(idx, update_ui=True):
     global anchor_x, anchor_y, monitor, ROI_W, ROI_H
@@ -1234,21 +3830,29 @@ def set_anchor_index(idx, update_ui=True):
         return
 
     idx = int(clamp(idx, 0, len(anchor_presets) - 1))
-    state["anchor_index"] = idx
     preset = anchor_presets[idx]
 
-    anchor_x, anchor_y = preset["anchor"]
-
-    scale = resolution_scale(preset.get("resolution", TEMPLATE_BASE_RESOLUTION))
-    ROI_W = max(20, int(round(ROI_W_BASE * scale)))
-    ROI_H = max(20, int(round(ROI_H_BASE * scale)))
-
-    monitor = compute_monitor(anchor_x, anchor_y)
-
-    rebuild_templates(scale)
+    # UI 스레드와 감지 스레드(activate_plugin) 양쪽에서 호출 -> 앵커/ROI/템플릿 갱신은 한 번에
+    with templates_lock:
+        state["anchor_index"] = idx
+        anchor_x, anchor_y = preset["anchor"]
+        plugin = current_plugin
+
+        if "roi" in preset and preset["plugin"] == plugin.id:
+            # 학습 프로필: ROI/템플릿 모두 내 화면 픽셀 그대로
+            ROI_W, ROI_H = preset["roi"]
+            monitor = compute_monitor(anchor_x, anchor_y)
+            rebuild_templates(1.0, profile=preset)
+        else:
+            scale = resolution_scale(preset.get("resolution", TEMPLATE_BASE_RESOLUTION))
+            ROI_W = max(20, int(round(plugin.roi[0] * scale)))
+            ROI_H = max(20, int(round(plugin.roi[1] * scale)))
+            dx, dy = plugin.anchor_offset
+            monitor = compute_monitor(anchor_x + int(round(dx * scale)), anchor_y + int(round(dy * scale)))
+            rebuild_templates(scale)
 
-    with det_ctl.lock:
-        det_ctl.monitor = monitor
+        with det_ctl.lock:
+            det_ctl.monitor = monitor
 
     if update_ui and anchor_select is not None:
         anchor_select.set_index(idx)
@@ -1264,58 +3868,109 @@ samira_slots = [
 penta_slots = [
     {"title": "Pentakill", "path": ""},
 ]
+# 플러그인별 등급 사운드 슬롯 (사미라 = samira_slots, 설정 파일의 "samira" 키 그대로)
+plugin_slots = {p.id: [{"title": g, "path": ""} for g in p.slots] for p in PLUGINS}
+plugin_slots["samira"] = samira_slots
+
+def other_plugin_slots():
+    return [(pid, slots) for pid, slots in plugin_slots.items() if pid != "samira"]
+
+def sync_sound_assets():
+    """슬롯 경로가 바뀔 때마다 호출: 등급 슬롯은 배경음악, 펜타 슬롯은 SFX로 미리 확인/로드"""
+    wanted = {s["path"]: "music" for slots in plugin_slots.values() for s in slots if s.get("path")}
+    wanted.update({s["path"]: "sfx" for s in penta_slots if s.get("path")})
+    sound_assets.sync(wanted)
 
 def export_tool_config():
     return {
-        "version": 2,
+        "version": CONFIG_VERSION,
         "volume": state["volume"],
         "debug_window": state["debug_window"],
         "anchor_index": state["anchor_index"],
+        "audio_profile": state["audio_profile"],
+        "normalize_loudness": state["normalize_loudness"],
+        "profiler": state["profiler"],
+        "watch_player": state["watch_player"],
         "samira": [{"title": s["title"], "path": s.get("path", "")} for s in samira_slots],
+        "plugins": {pid: [{"title": s["title"], "path": s.get("path", "")} for s in slots]
+                    for pid, slots in other_plugin_slots()},
         "penta": [{"title": s["title"], "path": s.get("path", "")} for s in penta_slots],
     }
 
 def apply_tool_config(data):
-    if not isinstance(data, dict):
-        return
+    """data: ToolConfig 또는 JSON dict (dict면 여기서 검증/마이그레이션)"""
+    if isinstance(data, ToolConfig):
+        cfg = data
+    else:
+        try:
+            cfg = compile_tool_config(data)
+        except ConfigError as e:
+            print("[CONFIG ERROR]", e)
+            return
+        for msg in cfg.errors:
+            print("[CONFIG WARN]", msg)
 
-    v = data.get("volume", state["volume"])
-    if isinstance(v, (int, float)):
-        v = int(clamp(v, 0, 100))
-        sld_volume.value = v
-        set_volume(v)
+    if cfg.volume is not None:
+        if sld_volume is not None:
+            sld_volume.value = cfg.volume
+        set_volume(cfg.volume)
 
-    dbg = data.get("debug_window", state["debug_window"])
-    if isinstance(dbg, bool):
-        state["debug_window"] = dbg
-        with det_ctl.lock:
-            det_ctl.debug_window = dbg
+    if cfg.debug_window is not None:
+        set_debug_window(cfg.debug_window)
 
-    ai = data.get("anchor_index", state["anchor_index"])
-    if isinstance(ai, (int, float)):
-        set_anchor_index(int(ai), update_ui=False)
+    if cfg.anchor_index is not None:
+        set_anchor_index(cfg.anchor_index, update_ui=False)
         if anchor_select is not None:
             anchor_select.set_index(state["anchor_index"])
 
-    s_list = data.get("samira", [])
-    if isinstance(s_list, list) and len(s_list) > 0:
-        for i in range(min(len(samira_slots), len(s_list))):
-            path = s_list[i].get("path", "")
-            if isinstance(path, str):
-                samira_slots[i]["path"] = path
+    if cfg.audio_profile is not None and cfg.audio_profile != state["audio_profile"]:
+        set_audio_profile(cfg.audio_profile)
+
+    if cfg.normalize_loudness is not None:
+        state["normalize_loudness"] = cfg.normalize_loudness
+
+    if cfg.profiler is not None and cfg.profiler != state["profiler"]:
+        set_profiler(cfg.profiler)
 
-    p_list = data.get("penta", [])
-    if isinstance(p_list, list) and len(p_list) > 0:
-        for i in range(min(len(penta_slots), len(p_list))):
-            path = p_list[i].get("path", "")
-            if isinstance(path, str):
-                penta_slots[i]["path"] = path
+    if cfg.watch_player is not None:
+        set_watch_player(cfg.watch_player)
 
+    groups = [(samira_slots, cfg.samira), (penta_slots, cfg.penta)]
+    groups += [(plugin_slots[pid], compiled) for pid, compiled in cfg.plugins if pid in plugin_slots]
+    applied = []
+    for slots, compiled in groups:
+        for slot, c in zip(slots, compiled):
+            if c is None:
+                continue
+            slot["path"] = c[1]
+            if c[1]:
+                applied.append(slot)
+
+    schedule_loudness_analysis([s.get("path", "") for slots in plugin_slots.values() for s in slots]
+                               + [s.get("path", "") for s in penta_slots])
+    sync_sound_assets()
+    # 존재 여부는 방금 sync가 stat한 결과로만 판단 (캐시된 설정에는 없음)
+    for slot in applied:
+        asset = sound_assets.get(slot["path"])
+        if asset is None or not asset.exists:
+            print("[WARN] sound path missing:", slot["title"], slot["path"])
+
+    if slot_list is None:
+        return
     if state["mode"] == "samira":
-        slot_list.set_slots(samira_slots, header_title="SAMIRA (S~E)")
+        show_plugin_slots(state["slot_plugin"])
     elif state["mode"] == "penta":
         slot_list.set_slots(penta_slots, header_title="PENTAKILL")
 
+def load_config_file(path):
+    cfg = load_tool_config(path)
+    if cfg is None:
+        return False
+    apply_tool_config(cfg)
+    state["last_preset"] = None
+    print("[LOAD CONFIG]", path)
+    return True
+
 def apply_preset_data(data, preset_name=None):
     apply_tool_config(data)
     state["last_preset"] = preset_name
@@ -1374,18 +4029,31 @@ def build_layout(w, h):
 # =============================
 # UI create
 # =============================
-canvas_rect, sidebar_rect, bottom_rect, r_samira, r_penta, r_dbg, r_presets, r_save, r_load, r_anchor, r_sld = build_layout(W, H)
+# UI 모드에서만 build_ui()로 생성. --headless에서는 None으로 남음 (apply_tool_config 등은 None 체크)
+slot_list = None
+preset_list = None
+sld_volume = None
+ui = []
+sidebar_buttons = []
+preset_index = PresetIndex()
 
 def on_slot_play(slot):
     # ✅ 미리듣기: SFX 채널 + 덕킹
     play_sfx_one_shot(slot.get("path", ""), state["volume"], duck=True)
 
-slot_list = SoundSlotList(canvas_rect, get_volume_func=lambda: state["volume"], on_play_click=on_slot_play)
-preset_list = PresetList(canvas_rect, apply_preset_func=apply_preset_data)
+def show_plugin_slots(pid):
+    plugin = PLUGINS_BY_ID.get(pid, SAMIRA_PLUGIN)
+    state["slot_plugin"] = plugin.id
+    slot_list.set_slots(plugin_slots[plugin.id], header_title=plugin.slot_header)
 
 def open_samira():
+    # 플러그인이 여럿이면 이미 열린 상태에서 다시 누를 때 다음 플러그인 슬롯으로
+    pid = state["slot_plugin"]
+    if state["mode"] == "samira" and len(PLUGINS) > 1:
+        ids = [p.id for p in PLUGINS]
+        pid = ids[(ids.index(pid) + 1) % len(ids)] if pid in ids else ids[0]
     state["mode"] = "samira"
-    slot_list.set_slots(samira_slots, header_title="SAMIRA (S~E)")
+    show_plugin_slots(pid)
 
 def open_penta():
     state["mode"] = "penta"
@@ -1396,231 +4064,756 @@ def open_presets():
     preset_list.reload()
 
 def save_tool_json():
-    path = pick_json_save_path(default_name="tool_config.json")
-    if not path:
+    if dialogs.busy():
         return
-    safe_write_json(path, export_tool_config())
+
+    def on_picked(path):
+        if not path:
+            return
+        safe_write_json(path, export_tool_config())
+
+    pick_json_save_path(on_picked, default_name="tool_config.json")
 
 def load_tool_json():
-    path = pick_json_open_path(title="툴 설정 JSON 불러오기")
-    if not path:
+    if dialogs.busy():
         return
-    data = safe_read_json(path)
-    if data:
-        apply_tool_config(data)
-        state["last_preset"] = None
-        print("[LOAD CONFIG]", path)
 
-def toggle_debug_window():
-    state["debug_window"] = not state["debug_window"]
-    with det_ctl.lock:
-        det_ctl.debug_window = state["debug_window"]
+    def on_picked(path):
+        if not path:
+            return
+        load_config_file(path)
 
-btn_open_samira = Button(r_samira, "사미라 스타일 사운드(S ~ E)", on_click=open_samira)
-btn_open_penta  = Button(r_penta,  "펜타킬 사운드", on_click=open_penta)
-btn_debug       = Button(r_dbg,    "감지 창 ON/OFF", on_click=toggle_debug_window)
-btn_open_presets= Button(r_presets,"프리셋", on_click=open_presets)
-btn_save        = Button(r_save,   "저장", on_click=save_tool_json)
-btn_load        = Button(r_load,   "불러오기", on_click=load_tool_json)
+    pick_json_open_path(on_picked, title="툴 설정 JSON 불러오기")
+
+def toggle_debug_window():
+    set_debug_window(not state["debug_window"])
 
 def on_anchor_changed(idx):
     set_anchor_index(idx, update_ui=False)
 
-anchor_select = Select(
-    r_anchor,
-    "앵커(해상도)",
-    [p["label"] for p in anchor_presets],
-    on_change=on_anchor_changed,
-    max_drop_h=320,
-    highlight_mix=1.0,
-)
-anchor_select.set_index(state["anchor_index"])
-set_anchor_index(state["anchor_index"], update_ui=False)
-sld_volume = Slider(r_sld, "Volume", 0, 100, state["volume"], on_change=set_volume)
-ui = [btn_open_samira, btn_open_penta, btn_debug, btn_open_presets, btn_save, btn_load, anchor_select, sld_volume]
+def build_ui():
+    global canvas_rect, sidebar_rect, bottom_rect, r_samira, r_penta, r_dbg, r_presets, r_save, r_load, r_anchor, r_sld
+    global slot_list, preset_list, anchor_select, sld_volume, ui, sidebar_buttons
+    global btn_open_samira, btn_open_penta, btn_debug, btn_open_presets, btn_save, btn_load
+
+    canvas_rect, sidebar_rect, bottom_rect, r_samira, r_penta, r_dbg, r_presets, r_save, r_load, r_anchor, r_sld = build_layout(W, H)
+
+    slot_list = SoundSlotList(canvas_rect, get_volume_func=lambda: state["volume"], on_play_click=on_slot_play)
+    preset_list = PresetList(canvas_rect, apply_preset_func=apply_preset_data, index=preset_index)
+
+    btn_open_samira = Button(r_samira, "사미라 스타일 사운드(S ~ E)", on_click=open_samira)
+    btn_open_penta  = Button(r_penta,  "펜타킬 사운드", on_click=open_penta)
+    btn_debug       = Button(r_dbg,    "감지 창 ON/OFF", on_click=toggle_debug_window)
+    btn_open_presets= Button(r_presets,"프리셋", on_click=open_presets)
+    btn_save        = Button(r_save,   "저장", on_click=save_tool_json)
+    btn_load        = Button(r_load,   "불러오기", on_click=load_tool_json)
+
+    anchor_select = Select(
+        r_anchor,
+        "앵커(해상도)",
+        [p["label"] for p in anchor_presets],
+        on_change=on_anchor_changed,
+        max_drop_h=320,
+        highlight_mix=1.0,
+    )
+    anchor_select.set_index(state["anchor_index"])
+    sld_volume = Slider(r_sld, "Volume", 0, 100, state["volume"], on_change=set_volume)
+    ui = [btn_open_samira, btn_open_penta, btn_debug, btn_open_presets, btn_save, btn_load, anchor_select, sld_volume]
+    sidebar_buttons = [btn_open_samira, btn_open_penta, btn_debug, btn_open_presets, btn_save, btn_load]
 
-# 시작 볼륨 적용
-set_music_volume(state["volume"])
-
-# =============================
-# Start detection thread
-# =============================
-t = threading.Thread(target=detection_thread_main, daemon=True)
-t.start()
 
 # =============================
 # Grade -> sound mapping (UI slots: S~E)
 # =============================
-grade_to_slot_index = {
-    "S": 0,
-    "A": 1,
-    "B": 2,
-    "C": 3,
-    "D": 4,
-    "E": 5
-}
+# 등급 -> 슬롯 번호는 플러그인의 slots 순서 (사미라: S=0 ... E=5)
 
-def handle_detection_events():
+def handle_detection_event(ev):
     global current_music_grade
-    while True:
-        try:
-            typ, payload = event_q.get_nowait()
-        except queue.Empty:
-            break
+    typ = ev.kind
+    if typ == "SAMIRA_ACTIVE":
+        prev_plugin = state["plugin"]
+        state["samira_active"] = ev.active
+        state["plugin"] = ev.plugin or prev_plugin
+        print("[SAMIRA_ACTIVE]", state["samira_active"], state["plugin"])
+
+        if not state["samira_active"] or state["plugin"] != prev_plugin:
+            # 감지 대상이 아니거나 다른 플러그인 챔피언이면 배경음악도 끔
+            stop_music()
+            current_music_grade = None
+
+    elif typ == "GRADE":
+        g = ev.grade
+        print("[GRADE EVENT]", g, "current_music=", current_music_grade, "samira_active=", state["samira_active"])
+
+        if not state["samira_active"]:
+            return
 
-        if typ == "SAMIRA_ACTIVE":
-            state["samira_active"] = bool(payload)
-            print("[SAMIRA_ACTIVE]", state["samira_active"])
+        if g == "None":
+            # None은 "아무 것도 안함(음악 유지)" 원칙
+            return
 
-            if not state["samira_active"]:
-                # 사미라가 아니면 배경음악도 끔
-                stop_music()
-                current_music_grade = None
+        plugin = PLUGINS_BY_ID.get(state["plugin"], SAMIRA_PLUGIN)
+        idxi = plugin.slot_idx.get(g, None)
+        if idxi is None:
+            return
 
-        elif typ == "GRADE":
-            g = payload
-            print("[GRADE EVENT]", g, "current_music=", current_music_grade, "samira_active=", state["samira_active"])
+        path = plugin_slots[plugin.id][idxi].get("path", "")
+        asset = sound_assets.get(path)
+        if asset is None or not asset.exists:
+            print("[WARN] sound path missing:", g, path)
+            return
 
-            if not state["samira_active"]:
-                continue
+        # ✅ 등급 배경음악: 한 번만 재생 (반복 X), 같은 등급이면 재시작 X
+        t0 = time.perf_counter()
+        play_music_for_grade(g, path, state["volume"])
+        t1 = time.perf_counter()
+        latency.record("play", t1 - t0)
+        latency.record("e2e", t1 - ev.seen_t)
 
-            if g == "None":
-                # None은 "아무 것도 안함(음악 유지)" 원칙
-                continue
+    elif typ == "PENTA":
+        print("[PENTA EVENT] samira_active=", state["samira_active"])
 
-            idxi = grade_to_slot_index.get(g, None)
-            if idxi is None:
-                continue
+        if not state["samira_active"]:
+            return
 
-            path = samira_slots[idxi].get("path", "")
-            if not (path and os.path.exists(path)):
-                print("[WARN] sound path missing:", g, path)
-                continue
+        path = penta_slots[0].get("path", "")
+        asset = sound_assets.get(path)
+        if asset is not None and asset.exists:
+            # ✅ 펜타는 SFX 채널로 + 덕킹
+            t0 = time.perf_counter()
+            play_sfx_one_shot(path, state["volume"], duck=True)
+            t1 = time.perf_counter()
+            latency.record("play", t1 - t0)
+            latency.record("e2e", t1 - ev.capture_t)
+        else:
+            print("[WARN] penta path missing:", path)
 
-            # ✅ 등급 배경음악: 한 번만 재생 (반복 X), 같은 등급이면 재시작 X
-            play_music_for_grade(g, path, state["volume"])
+AUDIO_IDLE_POLL_SEC = 0.02
 
-        elif typ == "PENTA":
-            print("[PENTA EVENT] samira_active=", state["samira_active"])
+# GRADE는 밀려 있으면 최신 것만 (연속 GRADE 합침)
+audio_events = event_bus.subscribe("audio", coalesce=("GRADE",))
 
-            if not state["samira_active"]:
-                continue
+def audio_thread_main():
+    """
+    ✅ 감지 이벤트 전용 오디오 스레드:
+    자기 구독 큐를 직접 block-get 하므로 UI 루프(파일 대화상자, 창 드래그, 느린 redraw)와 무관하게
+    이벤트 도착 즉시 재생. 타임아웃마다 덕킹 복귀도 여기서 처리.
+    """
+    while True:
+        ev = audio_events.get(timeout=AUDIO_IDLE_POLL_SEC)
+        if ev is None:
+            if audio_events.closed:
+                break
+            update_ducking(state["volume"])
+            continue
 
-            path = penta_slots[0].get("path", "")
-            if path and os.path.exists(path):
-                # ✅ 펜타는 SFX 채널로 + 덕킹
-                play_sfx_one_shot(path, state["volume"], duck=True)
-            else:
-                print("[WARN] penta path missing:", path)
+        t0 = time.perf_counter()
+        latency.record("queue", t0 - ev.detect_t)
+        try:
+            handle_detection_event(ev)
+        except Exception as e:
+            print("[AUDIO ERROR]", ev.kind, e)
+        latency.record("handle", time.perf_counter() - t0)
+
+        update_ducking(state["volume"])
+
+audio_thread = threading.Thread(target=audio_thread_main, daemon=True, name="audio")
+
+class EventRecorder:
+    """--record-events: 모든 감지 이벤트를 JSON Lines로 기록 (재생/지연 분석용)"""
+    def __init__(self, path):
+        self.path = path
+        self.sub = None
+        self.thread = None
+
+    def start(self):
+        self.sub = event_bus.subscribe("recorder")
+        self.thread = threading.Thread(target=self._main, daemon=True, name="event-recorder")
+        self.thread.start()
+
+    def stop(self):
+        if self.sub is not None:
+            event_bus.unsubscribe(self.sub)
+            self.thread.join(timeout=1.0)
+
+    def _main(self):
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                while True:
+                    ev = self.sub.get()
+                    if ev is None:
+                        if self.sub.closed:
+                            break
+                        continue
+                    f.write(json.dumps(ev.to_dict(), ensure_ascii=False) + "\n")
+                    f.flush()
+        except OSError as e:
+            print("[RECORD ERROR]", self.path, e)
+
+event_recorder = None
 
 # =============================
-# Main loop
+# Local IPC (--headless / --ipc)
 # =============================
-running = True
-while running:
-    dt = clock.tick(60) / 1000.0
+IPC_REPLY_TIMEOUT_SEC = 5.0
 
-    # 감지 이벤트 처리(메인에서 오디오 실행)
-    handle_detection_events()
+class IpcConnection:
+    """클라이언트 소켓 하나. publish(오디오 스레드)와 응답(클라이언트 스레드)이 동시에 쓰므로 send에 lock"""
+    def __init__(self, sock):
+        self.sock = sock
+        self.lock = threading.Lock()
 
-    # ✅ SFX가 끝났는지 체크해서 덕킹 자동 복귀
-    update_ducking(state["volume"])
+    def send(self, msg):
+        line = (json.dumps(msg, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        with self.lock:
+            self.sock.sendall(line)
 
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
 
-        if event.type == pygame.VIDEORESIZE:
-            W, H = event.w, event.h
-            screen = pygame.display.set_mode((W, H), pygame.RESIZABLE)
-
-            canvas_rect, sidebar_rect, bottom_rect, r_samira, r_penta, r_dbg, r_presets, r_save, r_load, r_anchor, r_sld = build_layout(W, H)
-
-            btn_open_samira.set_rect(r_samira)
-            btn_open_penta.set_rect(r_penta)
-            btn_debug.set_rect(r_dbg)
-            btn_open_presets.set_rect(r_presets)
-            btn_save.set_rect(r_save)
-            btn_load.set_rect(r_load)
-            anchor_select.set_rect(r_anchor)
-            sld_volume.set_rect(r_sld)
-
-            slot_list.set_rect(canvas_rect)
-            preset_list.set_rect(canvas_rect)
-
-        if anchor_select.opened and event.type in (
-            pygame.MOUSEBUTTONDOWN,
-            pygame.MOUSEBUTTONUP,
-            pygame.MOUSEMOTION,
-            pygame.KEYDOWN,
-        ):
-            anchor_select.handle_event(event)
-            continue
+class IpcServer:
+    """
+    ✅ 로컬 전용 제어/이벤트 API: 127.0.0.1 TCP, 한 줄 = JSON 객체 하나
+      요청   {"id": 1, "cmd": "set_volume", "value": 40}
+      응답   {"id": 1, "ok": true, "result": {...}}  /  {"id": 1, "ok": false, "error": "..."}
+      이벤트 {"event": "GRADE", "value": "S", "t": 1712345678.125, "detect_ms": 3.1, "score": 0.81}   (subscribe한 연결에만)
+    명령은 IPC_COMMANDS에 등록된 것만. 실행은 소유 스레드(UI 메인 루프 / headless 메인)의 run_pending()에서
+    -> state / 위젯 / mixer를 UI 버튼과 같은 스레드에서 만짐
+    """
+    def __init__(self, port=IPC_DEFAULT_PORT):
+        self.port = port
+        self.sock = None
+        self.running = False
+        self.pending = queue.Queue()
+        self.subscribers = set()
+        self.sub_lock = threading.Lock()
+        self.events = None
+
+    def start(self):
+        self.sock = socket.create_server((IPC_HOST, self.port))
+        self.running = True
+        self.events = event_bus.subscribe("ipc")
+        threading.Thread(target=self._accept_main, daemon=True, name="ipc-accept").start()
+        threading.Thread(target=self._event_main, daemon=True, name="ipc-events").start()
+        print(f"[IPC] listening on {IPC_HOST}:{self.port}")
+
+    def stop(self):
+        self.running = False
+        if self.events is not None:
+            event_bus.unsubscribe(self.events)
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+        with self.sub_lock:
+            subs = list(self.subscribers)
+            self.subscribers.clear()
+        for conn in subs:
+            conn.close()
+        # 응답 대기 중인 클라이언트가 타임아웃까지 붙잡혀 있지 않도록
+        while True:
+            try:
+                _, _, fut = self.pending.get_nowait()
+            except queue.Empty:
+                break
+            fut.set_exception(RuntimeError("shutting down"))
 
-        if state["mode"] in ("samira", "penta"):
-            slot_list.handle_event(event)
-        elif state["mode"] == "preset":
-            preset_list.handle_event(event)
+    def _accept_main(self):
+        while self.running:
+            try:
+                sock, _ = self.sock.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._client_main, args=(IpcConnection(sock),), daemon=True, name="ipc-client").start()
 
-        for e in ui:
-            e.handle_event(event)
+    def _client_main(self, conn):
+        try:
+            for raw in conn.sock.makefile("rb"):
+                raw = raw.strip()
+                if not raw:
+                    continue
+                try:
+                    msg = json.loads(raw)
+                    if not isinstance(msg, dict):
+                        raise ValueError("request must be a JSON object")
+                except ValueError as e:
+                    conn.send({"ok": False, "error": f"bad request: {e}"})
+                    continue
+                conn.send(self._handle(conn, msg))
+        except OSError:
+            pass
+        finally:
+            with self.sub_lock:
+                self.subscribers.discard(conn)
+            conn.close()
+
+    def _handle(self, conn, msg):
+        reply = {"id": msg.get("id"), "ok": True}
+        cmd = msg.get("cmd")
+        if cmd == "subscribe":
+            with self.sub_lock:
+                self.subscribers.add(conn)
+            reply["result"] = None
+            return reply
+        if cmd == "unsubscribe":
+            with self.sub_lock:
+                self.subscribers.discard(conn)
+            reply["result"] = None
+            return reply
+
+        if cmd not in IPC_COMMANDS:
+            reply.update(ok=False, error=f"unknown cmd: {cmd}")
+            return reply
+
+        fut = Future()
+        self.pending.put((cmd, msg, fut))
+        wake_ui()
+        try:
+            reply["result"] = fut.result(timeout=IPC_REPLY_TIMEOUT_SEC)
+        except Exception as e:
+            reply.update(ok=False, error=str(e) or e.__class__.__name__)
+        return reply
 
-    if state["mode"] in ("samira", "penta"):
-        slot_list.update(dt)
-    elif state["mode"] == "preset":
-        preset_list.update(dt)
+    def run_pending(self, timeout=None):
+        """소유 스레드에서 호출. timeout이 있으면 명령이 올 때까지 최대 timeout초 대기"""
+        try:
+            item = self.pending.get(timeout=timeout) if timeout else self.pending.get_nowait()
+        except queue.Empty:
+            return
+        while True:
+            cmd, msg, fut = item
+            try:
+                fut.set_result(IPC_COMMANDS[cmd](msg))
+            except Exception as e:
+                fut.set_exception(e)
+            try:
+                item = self.pending.get_nowait()
+            except queue.Empty:
+                return
 
-    for e in ui:
-        e.update(dt)
+    def _event_main(self):
+        while True:
+            ev = self.events.get()
+            if ev is None:
+                if self.events.closed:
+                    break
+                continue
+            self.publish(ev.to_dict())
 
-    # draw
-    screen.fill(THEME.bg)
+    def publish(self, msg):
+        with self.sub_lock:
+            subs = list(self.subscribers)
+        if not subs:
+            return
+        for conn in subs:
+            try:
+                conn.send(msg)
+            except OSError:
+                with self.sub_lock:
+                    self.subscribers.discard(conn)
 
-    if state["mode"] is None:
-        draw_shadow_card(screen, canvas_rect, THEME.panel, radius=16, shadow_alpha=90)
-        ttxt = FONT_16.render("CANVAS", True, THEME.text)
-        screen.blit(ttxt, (canvas_rect.x + 16, canvas_rect.y + 16))
-        guide = FONT_14.render("오른쪽에서 '사운드' 또는 '프리셋'을 선택하세요.", True, THEME.subtext)
-        screen.blit(guide, (canvas_rect.x + 16, canvas_rect.y + 60))
-    elif state["mode"] in ("samira", "penta"):
-        slot_list.draw(screen)
-    elif state["mode"] == "preset":
-        preset_list.draw(screen)
+def ipc_status(msg=None):
+    return {
+        "volume": state["volume"],
+        "anchor_index": state["anchor_index"],
+        "anchor": anchor_presets[state["anchor_index"]]["label"],
+        "debug_window": state["debug_window"],
+        "samira_active": state["samira_active"],
+        "audio_profile": state["audio_profile"],
+        "watch_player": state["watch_player"],
+        "plugin": state["plugin"],
+        "music_grade": current_music_grade,
+        "backend": "loading" if not backend_ready.is_set() else ("error" if backend_error is not None else "ready"),
+        "headless": ARGS.headless,
+    }
+
+def ipc_set_anchor(msg):
+    set_anchor_index(int(msg["value"]))
+    return ipc_status()
+
+def ipc_set_volume(msg):
+    v = int(clamp(msg["value"], 0, 100))
+    if sld_volume is not None:
+        sld_volume.value = v
+    set_volume(v)
+    return ipc_status()
+
+def ipc_set_debug(msg):
+    set_debug_window(bool(msg["value"]))
+    return ipc_status()
+
+def ipc_set_watch(msg):
+    set_watch_player(str(msg.get("value") or ""))
+    return ipc_status()
+
+def ipc_load_config(msg):
+    if not load_config_file(str(msg["value"])):
+        raise ValueError("config not found or invalid")
+    return ipc_status()
+
+def ipc_latency(msg=None):
+    return latency.summary()
+
+def ipc_profile(msg):
+    """value 생략: 현재 집계만, true/false: 켜기/끄기(끌 때 파일 저장)"""
+    if "value" in msg:
+        set_profiler(bool(msg["value"]))
+    return profiler.summary()
+
+def ipc_shutdown(msg):
+    shutdown_requested.set()
+    wake_ui()
+    return None
+
+IPC_COMMANDS = {
+    "status": ipc_status,
+    "set_anchor": ipc_set_anchor,
+    "set_volume": ipc_set_volume,
+    "set_debug": ipc_set_debug,
+    "set_watch": ipc_set_watch,
+    "load_config": ipc_load_config,
+    "latency": ipc_latency,
+    "profile": ipc_profile,
+    "shutdown": ipc_shutdown,
+}
+
+ipc_server = None
+shutdown_requested = threading.Event()
 
-    draw_shadow_card(screen, sidebar_rect, THEME.panel, radius=16, shadow_alpha=90)
-    st = FONT_16.render("SOUNDS", True, THEME.text)
-    screen.blit(st, (sidebar_rect.x + 16, sidebar_rect.y + 16))
+# =============================
+# Main loop
+# =============================
+# ✅ 변경된 영역만 다시 그림 (display.update(rects)),
+# ✅ 입력/애니메이션이 없으면 event.wait로 대기 -> idle CPU 거의 0
+IDLE_WAIT_MS = 250
 
+def region_rects():
+    """그림자(아래쪽 offset)까지 포함한 영역. 서로 겹치지 않음"""
+    return {
+        "canvas": pygame.Rect(canvas_rect.x, canvas_rect.y, canvas_rect.w, canvas_rect.h + SHADOW_PAD),
+        "sidebar": pygame.Rect(sidebar_rect.x, sidebar_rect.y, sidebar_rect.w, sidebar_rect.h + SHADOW_PAD),
+        # Select 드롭다운이 패널 아래로 내려가므로 창 끝까지
+        "bottom": pygame.Rect(bottom_rect.x, bottom_rect.y, bottom_rect.w, max(bottom_rect.h + SHADOW_PAD, H - bottom_rect.y)),
+    }
+
+def canvas_element():
+    if state["mode"] in ("samira", "penta"):
+        return slot_list
+    if state["mode"] == "preset":
+        return preset_list
+    return None
+
+def sidebar_hint():
     dbg_txt = "ON" if state["debug_window"] else "OFF"
-    sam_txt = "Samira" if state["samira_active"] else "Not Samira"
-    si = FONT_12.render(f"감지 창: {dbg_txt} / 감지 조건: {sam_txt}", True, THEME.subtext)
-    screen.blit(si, (sidebar_rect.x + 16, sidebar_rect.y + 40))
-
-    btn_open_samira.draw(screen)
-    btn_open_penta.draw(screen)
-    btn_debug.draw(screen)
-    btn_open_presets.draw(screen)
-    btn_save.draw(screen)
-    btn_load.draw(screen)
-
-    draw_shadow_card(screen, bottom_rect, THEME.panel, radius=16, shadow_alpha=90)
+    if not backend_ready.is_set():
+        sam_txt = "Loading..."
+    elif backend_error is not None:
+        sam_txt = "Error"
+    else:
+        name = PLUGINS_BY_ID.get(ui_plugin, SAMIRA_PLUGIN).name
+        sam_txt = name if ui_samira_active else f"Not {name}" if len(PLUGINS) == 1 else "Not detected"
+    hint = f"감지 창: {dbg_txt} / 감지 조건: {sam_txt}"
+    if state["profiler"]:
+        hint += " / 프로파일링"
+    return hint
+
+def region_signature(name):
+    if name == "canvas":
+        el = canvas_element()
+        return (state["mode"], el.render_key() if el is not None else None)
+    if name == "sidebar":
+        return (sidebar_hint(),) + tuple(b.render_key() for b in sidebar_buttons)
+    return (anchor_select.render_key(), sld_volume.render_key(), state["last_preset"])
+
+def draw_canvas_region():
+    el = canvas_element()
+    if el is None:
+        draw_panel(screen, canvas_rect, "CANVAS")
+        guide = render_text(FONT_14, "오른쪽에서 '사운드' 또는 '프리셋'을 선택하세요.", THEME.subtext)
+        screen.blit(guide, (canvas_rect.x + 16, canvas_rect.y + 60))
+    else:
+        el.draw(screen)
+
+def draw_sidebar_region():
+    draw_panel(screen, sidebar_rect, "SOUNDS", sidebar_hint())
+    for b in sidebar_buttons:
+        b.draw(screen)
+
+def draw_bottom_region():
+    draw_panel(screen, bottom_rect, None)
     anchor_select.draw(screen)
     sld_volume.draw(screen)
 
     if state["last_preset"]:
-        info = FONT_12.render(f"Preset: {state['last_preset']}", True, THEME.subtext)
+        preset_txt = f"Preset: {state['last_preset']}"
+        info = render_text(FONT_12, preset_txt, THEME.subtext)
         screen.blit(info, (bottom_rect.x + 20, bottom_rect.y + 72))
 
+REGION_DRAW = {
+    "canvas": draw_canvas_region,
+    "sidebar": draw_sidebar_region,
+    "bottom": draw_bottom_region,
+}
+
+def redraw(full=False):
+    """signature가 바뀐 영역만 배경부터 다시 그림 -> 갱신한 rect 목록 반환"""
+    if full:
+        screen.fill(THEME.bg)
+        region_sigs.clear()
+
+    dirty = []
+    for name, rect in region_rects().items():
+        sig = region_signature(name)
+        if not full and region_sigs.get(name) == sig:
+            continue
+        region_sigs[name] = sig
+
+        screen.set_clip(rect)
+        screen.fill(THEME.bg, rect)
+        REGION_DRAW[name]()
+        screen.set_clip(None)
+        dirty.append(rect)
+    return dirty
+
+region_sigs = {}
+frame_stats = FrameStats() if ARGS.frame_stats else None
+# UI는 사이드바 표시용 SAMIRA_ACTIVE만 구독 (오디오 스레드의 state 갱신 순서와 무관하게 자기 값으로 그림)
+ui_events = None
+ui_samira_active = False
+ui_plugin = "samira"
+
+# =============================
+# Startup / shutdown (UI, headless 공통)
+# =============================
+def start_pipeline():
+    """오디오 -> 백그라운드 로딩 -> 감지/오디오 스레드 (+ 이벤트 기록, IPC)"""
+    global ipc_server, event_recorder
+
+    # 시작 오디오 프로필 + 볼륨 적용
+    _t = time.perf_counter()
+    init_mixer(ARGS.audio_profile or state["audio_profile"], force_calibration=ARGS.recalibrate_audio)
+    state["audio_profile"] = mixer_profile_name
+    set_music_volume(state["volume"])
+    startup_mark("mixer", _t)
+
+    set_anchor_index(state["anchor_index"], update_ui=False)
+    if ARGS.config:
+        load_config_file(ARGS.config)
+    if ARGS.profile:
+        set_profiler(True)
+    if ARGS.watch_player is not None:
+        set_watch_player(ARGS.watch_player)
+
+    sync_sound_assets()
+    sound_assets.start()
+
+    threading.Thread(target=load_backend, daemon=True, name="backend-loader").start()
+    threading.Thread(target=detection_thread_main, daemon=True, name="detection").start()
+    debug_view.start()
+    audio_thread.start()
+
+    if ARGS.record_events:
+        event_recorder = EventRecorder(ARGS.record_events)
+        event_recorder.start()
+
+    if ARGS.headless or ARGS.ipc:
+        ipc_server = IpcServer(ARGS.ipc_port or IPC_DEFAULT_PORT)
+        try:
+            ipc_server.start()
+        except OSError as e:
+            print("[IPC ERROR]", e)
+            ipc_server = None
+
+def stop_pipeline():
+    with det_ctl.lock:
+        det_ctl.running = False
+
+    if ipc_server is not None:
+        ipc_server.stop()
+    debug_view.stop()
+    sound_assets.stop()
+    if event_recorder is not None:
+        event_recorder.stop()
+    event_bus.close()
+    audio_thread.join(timeout=1.0)
+
+    if ARGS.latency_report:
+        latency.export(ARGS.latency_report)
+        print("[LATENCY] saved", ARGS.latency_report)
+    profiler.stop()
+
+    stop_music()
+    try:
+        SFX_CHANNEL.stop()
+    except:
+        pass
+
+    pygame.mixer.quit()
+    pygame.quit()
+
+# =============================
+# Main loop (UI)
+# =============================
+def run_ui():
+    global W, H, screen, ui_events, ui_samira_active, ui_plugin
+    global canvas_rect, sidebar_rect, bottom_rect, r_samira, r_penta, r_dbg, r_presets, r_save, r_load, r_anchor, r_sld
+
+    # 창 먼저 -> 오디오 -> 백그라운드 로딩
+    ui_events = event_bus.subscribe("ui", kinds=("SAMIRA_ACTIVE",), notify=wake_ui)
+    init_display()
+    init_fonts()
+    build_ui()
+    startup_mark("ui built")
+    redraw(full=True)
     pygame.display.flip()
+    startup_mark("first frame")
+
+    start_pipeline()
+    preset_index.start()
+    dialogs.start()
+
+    startup_report_pending = ARGS.startup_profile
+
+    running = True
+    full_redraw = False
+    idle = False
+    while running:
+        dt = clock.tick(60) / 1000.0
+
+        if startup_report_pending and backend_ready.is_set():
+            startup_report_pending = False
+            print_startup_profile()
+
+        # 감지 이벤트 처리/덕킹 복귀는 audio_thread에서 (UI 프레임과 분리)
+        # 파일 대화상자 결과는 여기서 메인 스레드 콜백으로 처리
+        dialogs.poll()
+        # IPC 명령도 메인 스레드에서 (UI 버튼과 같은 경로)
+        if ipc_server is not None:
+            ipc_server.run_pending()
+        for ev in ui_events.drain():
+            ui_samira_active = ev.active
+            ui_plugin = ev.plugin or ui_plugin
+        if shutdown_requested.is_set():
+            running = False
 
-with det_ctl.lock:
-    det_ctl.running = False
+        events = pygame.event.get()
+        if idle and not events:
+            first = pygame.event.wait(IDLE_WAIT_MS)
+            if first.type != pygame.NOEVENT:
+                events = [first] + pygame.event.get()
+
+        for event in events:
+            if event.type == pygame.QUIT:
+                running = False
+
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                full_redraw = True
+
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F9:
+                set_profiler(not state["profiler"])
+
+            if event.type == pygame.VIDEORESIZE:
+                W, H = event.w, event.h
+                screen = pygame.display.set_mode((W, H), pygame.RESIZABLE)
+
+                canvas_rect, sidebar_rect, bottom_rect, r_samira, r_penta, r_dbg, r_presets, r_save, r_load, r_anchor, r_sld = build_layout(W, H)
+
+                btn_open_samira.set_rect(r_samira)
+                btn_open_penta.set_rect(r_penta)
+                btn_debug.set_rect(r_dbg)
+                btn_open_presets.set_rect(r_presets)
+                btn_save.set_rect(r_save)
+                btn_load.set_rect(r_load)
+                anchor_select.set_rect(r_anchor)
+                sld_volume.set_rect(r_sld)
+
+                slot_list.set_rect(canvas_rect)
+                preset_list.set_rect(canvas_rect)
+
+                # 크기 기반 캐시는 모두 무효 (글자 렌더는 크기와 무관하므로 유지)
+                UI_CACHE.invalidate()
+                full_redraw = True
+
+            if anchor_select.opened and event.type in (
+                pygame.MOUSEBUTTONDOWN,
+                pygame.MOUSEBUTTONUP,
+                pygame.MOUSEMOTION,
+                pygame.KEYDOWN,
+            ):
+                anchor_select.handle_event(event)
+                continue
 
-stop_music()
-try:
-    SFX_CHANNEL.stop()
-except:
-    pass
+            if state["mode"] in ("samira", "penta"):
+                slot_list.handle_event(event)
+            elif state["mode"] == "preset":
+                preset_list.handle_event(event)
+
+            for e in ui:
+                e.handle_event(event)
+
+        if state["mode"] in ("samira", "penta"):
+            slot_list.update(dt)
+        elif state["mode"] == "preset":
+            preset_list.update(dt)
+
+        for e in ui:
+            e.update(dt)
+
+        # draw
+        frame_t0 = time.perf_counter()
+        if full_redraw:
+            redraw(full=True)
+            pygame.display.flip()
+            full_redraw = False
+        else:
+            dirty = redraw()
+            if dirty:
+                pygame.display.update(dirty)
+
+        if frame_stats is not None:
+            frame_stats.add((time.perf_counter() - frame_t0) * 1000.0)
+
+        el = canvas_element()
+        animating = any(e.is_animating() for e in ui) or (el is not None and el.is_animating())
+        idle = not events and not animating
+
+    preset_index.stop()
+    dialogs.stop()
+    stop_pipeline()
+
+# =============================
+# Headless (--headless): 감지 + 오디오 + IPC만
+# =============================
+def run_headless():
+    # 감지 창은 기본 OFF (IPC set_debug / --config로 켤 수 있음)
+    set_debug_window(False)
+    start_pipeline()
+    print("[HEADLESS] running. Ctrl+C or IPC {\"cmd\": \"shutdown\"} to stop")
+
+    startup_report_pending = ARGS.startup_profile
+    try:
+        while not shutdown_requested.is_set():
+            if ipc_server is not None:
+                ipc_server.run_pending(timeout=0.25)
+            else:
+                shutdown_requested.wait(0.25)
+            if startup_report_pending and backend_ready.is_set():
+                startup_report_pending = False
+                print_startup_profile()
+    except KeyboardInterrupt:
+        pass
+
+    stop_pipeline()
+
+def main():
+    if ARGS.headless:
+        run_headless()
+    else:
+        run_ui()
 
-pygame.mixer.quit()
-pygame.quit()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,434 @@
+"""
+Live Client Data API 대역 서버 (실제 게임 없이 폴링/지연/에러 처리 테스트용)
+
+  python mock_live_server.py                         # 기본 시나리오(samira_penta)를 http://127.0.0.1:2999 에서 반복
+  python main.py --live-url http://127.0.0.1:2999/liveclientdata/allgamedata
+
+  python mock_live_server.py --scenario restart --latency-ms 30 --jitter-ms 20 --error-rate 0.05
+  python mock_live_server.py --scenario my_timeline.json --filler-events 2000   # payload 크기 키우기
+  python mock_live_server.py --replay game.jsonl     # record로 저장한 실제 응답을 시간 순서대로 재생
+  python mock_live_server.py record --out game.jsonl # 실제 클라이언트(https://127.0.0.1:2999)를 폴링해 저장
+  python mock_live_server.py --https                 # 자체 서명 인증서로 https (openssl 필요, --cert/--key로 지정 가능)
+
+시나리오(JSON): {"player": "...", "spectator": false, "duration": 60, "loop": true, "steps": [{"at": 초, ...}, ...]}
+  "spectator": true -> 관전/리플레이처럼 activePlayer가 {"error": ...} (main.py --watch-player Player0#KR1로 테스트)
+  {"phase": "offline"}                      연결을 바로 끊음 (게임 밖 / 클라이언트 재시작)
+  {"phase": "loading"}                      404 RESOURCE_NOT_FOUND (로딩 화면)
+  {"phase": "game", "champion": "Samira"}   200 allgamedata (offline/loading에서 들어오면 새 게임: EventID 0부터)
+  {"event": "Multikill", "killer": "self" | "other" | 이름, "streak": 5}
+  {"event": "ChampionKill", "killer": ...}
+"""
+import os
+import sys
+import ssl
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import subprocess
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+ALLGAMEDATA_PATH = "/liveclientdata/allgamedata"
+REAL_CLIENT_URL = "https://127.0.0.1:2999" + ALLGAMEDATA_PATH
+STATS_INTERVAL_SEC = 5.0
+
+SCENARIOS = {
+    # 챔프 선택 -> 로딩 -> 사미라로 게임, 내 펜타 + 남의 펜타, 게임 종료
+    "samira_penta": {
+        "duration": 60, "loop": True,
+        "steps": [
+            {"at": 0, "phase": "offline"},
+            {"at": 4, "phase": "loading"},
+            {"at": 8, "phase": "game", "champion": "Samira"},
+            {"at": 14, "event": "ChampionKill", "killer": "self"},
+            {"at": 20, "event": "Multikill", "killer": "other", "streak": 5},
+            {"at": 30, "event": "Multikill", "killer": "self", "streak": 5},
+            {"at": 50, "phase": "offline"},
+        ],
+    },
+    # 다른 챔피언 -> 감지/펜타 모두 꺼져 있어야 함
+    "other_champion": {
+        "duration": 40, "loop": True,
+        "steps": [
+            {"at": 0, "phase": "loading"},
+            {"at": 3, "phase": "game", "champion": "Ahri"},
+            {"at": 15, "event": "Multikill", "killer": "self", "streak": 5},
+            {"at": 35, "phase": "offline"},
+        ],
+    },
+    # 게임 중 클라이언트 재시작 -> EventID가 0부터 다시 시작
+    "restart": {
+        "duration": 60, "loop": True,
+        "steps": [
+            {"at": 0, "phase": "game", "champion": "Samira"},
+            {"at": 8, "event": "ChampionKill", "killer": "self"},
+            {"at": 15, "phase": "offline"},
+            {"at": 20, "phase": "loading"},
+            {"at": 24, "phase": "game", "champion": "Samira"},
+            {"at": 32, "event": "Multikill", "killer": "self", "streak": 5},
+            {"at": 55, "phase": "offline"},
+        ],
+    },
+    # 관전/리플레이: activePlayer 없음 -> watch_player로 지정한 플레이어(Player0)만 감지
+    "spectate": {
+        "duration": 40, "loop": True, "spectator": True,
+        "steps": [
+            {"at": 0, "phase": "loading"},
+            {"at": 3, "phase": "game", "champion": "Samira"},
+            {"at": 10, "event": "Multikill", "killer": "other", "streak": 5},
+            {"at": 20, "event": "Multikill", "killer": "self", "streak": 5},
+            {"at": 35, "phase": "offline"},
+        ],
+    },
+    # 게임 밖에서 오래 대기 (폴러 에러 경로 부하용)
+    "champ_select": {
+        "duration": 20, "loop": True,
+        "steps": [
+            {"at": 0, "phase": "offline"},
+            {"at": 10, "phase": "loading"},
+        ],
+    },
+}
+
+OTHER_NAMES = ["Ahri", "LeeSin", "Thresh", "Jinx", "Garen", "Lux", "Yasuo", "Ezreal", "Leona"]
+
+# =============================
+# Game state
+# =============================
+class Timeline:
+    """시나리오 steps를 경과 시간에 맞춰 적용한 게임 상태 (steps가 바뀔 때만 다시 계산)"""
+    def __init__(self, scenario, filler_events=0):
+        self.player = scenario.get("player", "Player0")
+        self.spectator = scenario.get("spectator", False)
+        self.steps = sorted(scenario.get("steps", []), key=lambda s: s["at"])
+        self.duration = scenario.get("duration") or ((self.steps[-1]["at"] + 5) if self.steps else 10)
+        self.loop = scenario.get("loop", True)
+        self.filler_events = filler_events
+        self._key = None
+        self._state = None
+        self._lock = threading.Lock()
+
+    def state_at(self, t):
+        if self.loop and self.duration > 0:
+            cycle, t = divmod(t, self.duration)
+        else:
+            cycle = 0
+        n = sum(1 for s in self.steps if s["at"] <= t)
+        key = (cycle, n)
+        with self._lock:
+            if key != self._key:
+                self._key = key
+                self._state = self._build(self.steps[:n])
+            return self._state, t
+
+    def _build(self, steps):
+        st = {"phase": "offline", "champion": "Samira", "events": [], "game_start": 0.0}
+        for s in steps:
+            phase = s.get("phase")
+            if phase is not None:
+                if phase == "game" and st["phase"] != "game":
+                    st["events"] = self._new_game_events()
+                    st["game_start"] = s["at"]
+                st["phase"] = phase
+                st["champion"] = s.get("champion", st["champion"])
+            ev = s.get("event")
+            if ev is not None and st["phase"] == "game":
+                killer = s.get("killer", "self")
+                if killer == "self":
+                    killer = self.player
+                elif killer == "other":
+                    killer = "Player3"
+                e = {"EventID": len(st["events"]), "EventName": ev,
+                     "EventTime": float(s["at"] - st["game_start"]), "KillerName": killer}
+                if ev == "Multikill":
+                    e["KillStreak"] = s.get("streak", 5)
+                else:
+                    e["VictimName"] = "Player7"
+                    e["Assisters"] = []
+                st["events"].append(e)
+        return st
+
+    def _new_game_events(self):
+        events = [{"EventID": 0, "EventName": "GameStart", "EventTime": 0.0}]
+        for i in range(self.filler_events):
+            events.append({"EventID": len(events), "EventName": "MinionsSpawning", "EventTime": 0.0 + i * 0.001})
+        return events
+
+    def payload(self, st, t):
+        game_time = max(0.0, t - st["game_start"])
+        players = []
+        for i in range(10):
+            name = self.player if i == 0 else f"Player{i}"
+            champ = st["champion"] if i == 0 else OTHER_NAMES[(i - 1) % len(OTHER_NAMES)]
+            players.append({
+                "summonerName": name,
+                "riotId": f"{name}#KR1",
+                "riotIdGameName": name,
+                "riotIdTagLine": "KR1",
+                "championName": champ,
+                "rawChampionName": f"game_character_displayname_{champ}",
+                "team": "ORDER" if i < 5 else "CHAOS",
+                "level": min(18, 1 + int(game_time // 60)),
+                "isDead": False,
+                "items": [],
+                "scores": {"kills": 0, "deaths": 0, "assists": 0, "creepScore": 0, "wardScore": 0.0},
+            })
+        if self.spectator:
+            active = {"error": "Spectator mode doesn't currently support this feature"}
+        else:
+            active = {"summonerName": self.player, "riotId": f"{self.player}#KR1",
+                      "riotIdGameName": self.player, "riotIdTagLine": "KR1", "level": players[0]["level"]}
+        return {
+            "activePlayer": active,
+            "allPlayers": players,
+            "events": {"Events": st["events"]},
+            "gameData": {"gameMode": "CLASSIC", "gameTime": round(game_time, 3), "mapName": "Map11"},
+        }
+
+class Replay:
+    """record로 저장한 JSON Lines ({"t", "status", "body"}) 를 시간 순서대로"""
+    def __init__(self, path, loop=True):
+        with open(path, "r", encoding="utf-8") as f:
+            self.frames = [json.loads(line) for line in f if line.strip()]
+        if not self.frames:
+            raise ValueError(f"empty recording: {path}")
+        self.duration = self.frames[-1]["t"] + 1.0
+        self.loop = loop
+
+    def frame_at(self, t):
+        if self.loop:
+            t = t % self.duration
+        cur = self.frames[0]
+        for fr in self.frames:
+            if fr["t"] > t:
+                break
+            cur = fr
+        return cur
+
+# =============================
+# Server
+# =============================
+class MockStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.bytes = 0
+
+    def add(self, kind, nbytes=0):
+        with self.lock:
+            self.counts[kind] = self.counts.get(kind, 0) + 1
+            self.bytes += nbytes
+
+    def take(self):
+        with self.lock:
+            counts, nbytes = self.counts, self.bytes
+            self.counts, self.bytes = {}, 0
+        return counts, nbytes
+
+class MockHandler(BaseHTTPRequestHandler):
+    server_version = "MockLiveClient/1.0"
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send_json(self, status, obj):
+        body = json.dumps(obj, separators=(",", ":")).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        return len(body)
+
+    def _drop(self):
+        self.close_connection = True
+        try:
+            self.connection.close()
+        except OSError:
+            pass
+
+    def do_GET(self):
+        srv = self.server
+        opts = srv.opts
+
+        delay = (opts.latency_ms + random.uniform(-opts.jitter_ms, opts.jitter_ms)) / 1000.0
+        if delay > 0:
+            time.sleep(delay)
+
+        if not self.path.startswith("/liveclientdata/"):
+            srv.stats.add("404")
+            self._send_json(404, {"errorCode": "RESOURCE_NOT_FOUND", "httpStatus": 404, "message": "unknown path"})
+            return
+
+        if random.random() < opts.drop_rate:
+            srv.stats.add("drop")
+            self._drop()
+            return
+        if random.random() < opts.error_rate:
+            srv.stats.add("500")
+            self._send_json(500, {"errorCode": "INTERNAL_ERROR", "httpStatus": 500, "message": "injected"})
+            return
+
+        t = (time.perf_counter() - srv.started) * opts.speed
+
+        if srv.replay is not None:
+            # 녹화는 allgamedata만 담고 있음
+            if self.path.split("?")[0] != ALLGAMEDATA_PATH:
+                srv.stats.add("404")
+                self._send_json(404, {"errorCode": "RESOURCE_NOT_FOUND", "httpStatus": 404, "message": "not recorded"})
+                return
+            fr = srv.replay.frame_at(t)
+            status = fr.get("status", 200)
+            if status == "offline":
+                srv.stats.add("offline")
+                self._drop()
+                return
+            srv.stats.add(str(status), self._send_json(int(status), fr.get("body", {})))
+            return
+
+        st, local_t = srv.timeline.state_at(t)
+        if st["phase"] == "offline":
+            srv.stats.add("offline")
+            self._drop()
+            return
+        if st["phase"] == "loading":
+            srv.stats.add("404")
+            self._send_json(404, {"errorCode": "RESOURCE_NOT_FOUND", "httpStatus": 404,
+                                  "message": "Resource not found"})
+            return
+
+        data = srv.timeline.payload(st, local_t)
+        sub = self.path[len("/liveclientdata/"):].split("?")[0]
+        if sub == "allgamedata":
+            obj = data
+        elif sub == "activeplayername":
+            obj = data["activePlayer"].get("riotId", "")
+        elif sub == "activeplayer":
+            obj = data["activePlayer"]
+        elif sub == "playerlist":
+            obj = data["allPlayers"]
+        elif sub == "eventdata":
+            obj = data["events"]
+        elif sub == "gamestats":
+            obj = data["gameData"]
+        else:
+            srv.stats.add("404")
+            self._send_json(404, {"errorCode": "RESOURCE_NOT_FOUND", "httpStatus": 404, "message": sub})
+            return
+        srv.stats.add("200", self._send_json(200, obj))
+
+def self_signed_cert():
+    """openssl로 127.0.0.1용 자체 서명 인증서 생성 -> (cert, key)"""
+    d = tempfile.mkdtemp(prefix="mock_live_")
+    cert, key = os.path.join(d, "cert.pem"), os.path.join(d, "key.pem")
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "7",
+                    "-subj", "/CN=127.0.0.1", "-keyout", key, "-out", cert],
+                   check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return cert, key
+
+def load_scenario(name_or_path):
+    if name_or_path in SCENARIOS:
+        return SCENARIOS[name_or_path]
+    with open(name_or_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def serve(args):
+    srv = ThreadingHTTPServer((args.host, args.port), MockHandler)
+    srv.daemon_threads = True
+    srv.opts = args
+    srv.stats = MockStats()
+    srv.replay = Replay(args.replay) if args.replay else None
+    srv.timeline = None if srv.replay else Timeline(load_scenario(args.scenario), filler_events=args.filler_events)
+
+    scheme = "http"
+    if args.https:
+        cert, key = (args.cert, args.key) if args.cert else self_signed_cert()
+        ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        ctx.load_cert_chain(cert, key)
+        srv.socket = ctx.wrap_socket(srv.socket, server_side=True)
+        scheme = "https"
+
+    srv.started = time.perf_counter()
+    threading.Thread(target=srv.serve_forever, daemon=True, name="mock-live").start()
+    source = args.replay or args.scenario
+    print(f"[MOCK] {scheme}://{args.host}:{args.port}{ALLGAMEDATA_PATH}  ({source})")
+
+    try:
+        while True:
+            time.sleep(STATS_INTERVAL_SEC)
+            counts, nbytes = srv.stats.take()
+            total = sum(counts.values())
+            t = (time.perf_counter() - srv.started) * args.speed
+            phase = srv.timeline.state_at(t)[0]["phase"] if srv.timeline else "replay"
+            ok = counts.get("200", 0)
+            avg = nbytes // ok if ok else 0
+            print(f"[MOCK] t={t:6.1f}s phase={phase:8} {total / STATS_INTERVAL_SEC:6.1f} req/s  "
+                  + " ".join(f"{k}={v}" for k, v in sorted(counts.items()))
+                  + f"  avg body {avg} B")
+    except KeyboardInterrupt:
+        pass
+    srv.shutdown()
+
+def record(args):
+    """실제 클라이언트 응답을 JSON Lines로 저장 (연결 실패는 status "offline")"""
+    ctx = ssl.create_default_context()
+    ctx.check_hostname = False
+    ctx.verify_mode = ssl.CERT_NONE
+    t0 = time.perf_counter()
+    print(f"[RECORD] {args.url} -> {args.out} (Ctrl+C to stop)")
+    with open(args.out, "w", encoding="utf-8") as f:
+        try:
+            while True:
+                t = round(time.perf_counter() - t0, 3)
+                try:
+                    with urllib.request.urlopen(args.url, timeout=1.0, context=ctx) as resp:
+                        rec = {"t": t, "status": resp.status, "body": json.loads(resp.read())}
+                except urllib.error.HTTPError as e:
+                    try:
+                        body = json.loads(e.read())
+                    except ValueError:
+                        body = {}
+                    rec = {"t": t, "status": e.code, "body": body}
+                except (OSError, ValueError):
+                    rec = {"t": t, "status": "offline"}
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                f.flush()
+                time.sleep(args.interval)
+        except KeyboardInterrupt:
+            pass
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock League Live Client Data server")
+    sub = parser.add_subparsers(dest="command")
+    p_rec = sub.add_parser("record", help="실제 클라이언트 응답을 JSON Lines로 저장")
+    p_rec.add_argument("--url", default=REAL_CLIENT_URL)
+    p_rec.add_argument("--out", default="live_recording.jsonl")
+    p_rec.add_argument("--interval", type=float, default=0.5)
+
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2999)
+    parser.add_argument("--scenario", default="samira_penta",
+                        help="내장 시나리오 이름 (" + " / ".join(SCENARIOS) + ") 또는 JSON 경로")
+    parser.add_argument("--replay", default=None, help="record로 저장한 JSON Lines")
+    parser.add_argument("--speed", type=float, default=1.0, help="타임라인 재생 배속")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="HTTP 500 비율 (0~1)")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="응답 없이 연결 끊는 비율 (0~1)")
+    parser.add_argument("--filler-events", type=int, default=0, help="게임 시작 시 채울 더미 이벤트 수 (payload 크기)")
+    parser.add_argument("--https", action="store_true")
+    parser.add_argument("--cert", default=None)
+    parser.add_argument("--key", default=None)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record(args)
+    else:
+        serve(args)
+
+if __name__ == "__main__":
+    sys.exit(main())